@@ -2,12 +2,11 @@ from typing import Generator, Optional
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
 from pydantic import ValidationError
 from sqlalchemy.orm import Session
 
 from app import models, schemas
-from app.core import security
+from app.core import security, tracing
 from app.core.config import settings
 from app.db.session import SessionLocal
 
@@ -24,9 +23,12 @@ def get_db() -> Generator:
         db.close()
 
 
+@tracing.traced("auth.get_current_user")
 def get_current_user(
     db: Session = Depends(get_db), token: str = Depends(reusable_oauth2)
 ) -> models.User:
+    from jose import JWTError, jwt  # Imported on first use, see security.create_access_token
+
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.api.v1.endpoints import login, users, pgs, tenants, rents
+from app.api.v1.endpoints import login, users, pgs, tenants, rents, jobs, exports, backup, profiles
 
 api_router = APIRouter()
 
@@ -9,3 +9,7 @@ api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(pgs.router, prefix="/pgs", tags=["pgs"])
 api_router.include_router(tenants.router, prefix="/tenants", tags=["tenants"])
 api_router.include_router(rents.router, prefix="/rents", tags=["rents"])
+api_router.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
+api_router.include_router(exports.router, prefix="/export", tags=["export"])
+api_router.include_router(backup.router, tags=["backup"])
+api_router.include_router(profiles.router, prefix="/profiles", tags=["profiles"])
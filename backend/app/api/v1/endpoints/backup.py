@@ -0,0 +1,57 @@
+import gzip
+from datetime import date
+from typing import Any
+
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app import models
+from app.api import deps
+from app.core import backup, streaming
+from app.core.tracing import TracedRoute
+
+router = APIRouter(route_class=TracedRoute)
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+@router.get("/export/backup")
+def export_backup(
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Download a gzipped JSON Lines backup of your PGs, rooms, beds, tenants,
+    rent records and payments.
+    """
+    filename = f"pgkhata-backup-{date.today().isoformat()}.jsonl.gz"
+    return StreamingResponse(
+        streaming.gzip_chunks(backup.dump_lines(db, current_user.id)),
+        media_type="application/gzip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.post("/import/restore")
+def restore_backup(
+    *,
+    db: Session = Depends(deps.get_db),
+    file: UploadFile = File(..., description="Backup from GET /export/backup (.jsonl or .jsonl.gz)"),
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Restore a backup into your account as new records. Rows are inserted in
+    chunks, each committed on its own; if a line is rejected, the chunks
+    before it stay restored.
+    """
+    compressed = file.file.read(2) == GZIP_MAGIC
+    file.file.seek(0)
+    lines = gzip.GzipFile(fileobj=file.file, mode="rb") if compressed else file.file
+
+    try:
+        counts = backup.restore_lines(db, current_user.id, lines)
+    except (backup.RestoreError, OSError, EOFError) as exc:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=f"Restore stopped: {exc}")
+    return {"message": "Backup restored", "restored": counts}
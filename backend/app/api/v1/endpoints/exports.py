@@ -0,0 +1,61 @@
+import tempfile
+from datetime import date
+from typing import Any, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app import models
+from app.api import deps
+from app.core import snapshots
+from app.core.tracing import TracedRoute
+
+router = APIRouter(route_class=TracedRoute)
+
+SPOOL_BYTES = 16 * 1024 * 1024
+
+
+def _file_chunks(f, size: int = 64 * 1024):
+    try:
+        while chunk := f.read(size):
+            yield chunk
+    finally:
+        f.close()
+
+
+@router.get("/snapshot/{table}")
+def export_snapshot(
+    *,
+    db: Session = Depends(deps.get_db),
+    table: str,
+    format: str = Query("parquet", pattern="^(parquet|arrow)$"),
+    since: Optional[date] = Query(None, description="Only rows updated on or after this day (YYYY-MM-DD)"),
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Export one of your tables (pgs, rooms, beds, tenants, rent_records) as
+    Parquet or an Arrow IPC stream, with typed date and money columns.
+    """
+    if table not in snapshots.TABLES:
+        raise HTTPException(status_code=404, detail=f"Unknown table '{table}'")
+    try:
+        snapshots.arrow_schema(table)
+    except snapshots.PyArrowMissing as exc:
+        raise HTTPException(status_code=501, detail=str(exc))
+
+    filename = f"{table}-{since or 'full'}.{snapshots.FORMATS[format]}"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    if format == "arrow":
+        return StreamingResponse(
+            snapshots.arrow_stream_chunks(db, table, current_user.id, since),
+            media_type="application/vnd.apache.arrow.stream",
+            headers=headers,
+        )
+
+    # Parquet is only readable once its footer is written, so build it first
+    # (in memory up to SPOOL_BYTES, then on disk) and stream the file
+    f = tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES)
+    snapshots.parquet_file(db, table, f, current_user.id, since)
+    f.seek(0)
+    return StreamingResponse(_file_chunks(f), media_type="application/vnd.apache.parquet", headers=headers)
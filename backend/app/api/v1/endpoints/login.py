@@ -9,8 +9,9 @@ from app import models, schemas
 from app.api import deps
 from app.core import security
 from app.core.config import settings
+from app.core.tracing import TracedRoute
 
-router = APIRouter()
+router = APIRouter(route_class=TracedRoute)
 
 
 @router.post("/login/access-token", response_model=schemas.Token)
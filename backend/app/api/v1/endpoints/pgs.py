@@ -1,13 +1,15 @@
 from typing import Any, List, Optional
 from datetime import date
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
 from app import models, schemas
 from app.api import deps
+from app.core import layout, pricing
+from app.core.tracing import TracedRoute
 
-router = APIRouter()
+router = APIRouter(route_class=TracedRoute)
 
 @router.get("/", response_model=List[schemas.PG])
 def read_pgs(
@@ -182,6 +184,64 @@ def create_room(
     return room
 
 
+@router.put("/{pg_id}/layout", response_model=schemas.LayoutChanges)
+def sync_pg_layout(
+    *,
+    db: Session = Depends(deps.get_db),
+    pg_id: int,
+    layout_in: schemas.PGLayout,
+    dry_run: bool = Query(False, description="Only report what would change"),
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Set a PG's rooms and beds in one call, from a full structure or a
+    generator spec. Only the differences are written; rooms and beds missing
+    from the layout are removed, unless a bed is occupied.
+    """
+    pg = db.query(models.PG).filter(models.PG.id == pg_id, models.PG.owner_id == current_user.id).first()
+    if not pg:
+        raise HTTPException(status_code=404, detail="PG not found")
+
+    try:
+        changes = layout.sync_layout(db, pg_id, layout.expand(layout_in), dry_run=dry_run)
+    except layout.LayoutConflict as exc:
+        db.rollback()
+        raise HTTPException(status_code=409, detail=str(exc))
+    except layout.LayoutError as exc:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    db.commit()
+    return changes
+
+
+@router.post("/{pg_id}/price-revision", response_model=schemas.PriceRevisionResult)
+def revise_pg_prices(
+    *,
+    db: Session = Depends(deps.get_db),
+    pg_id: int,
+    revision_in: schemas.PriceRevision,
+    dry_run: bool = Query(False, description="Only preview the totals"),
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Raise or lower bed prices across a PG (optionally one room type or floor)
+    and re-price pending rent from the effective month on.
+    """
+    pg = db.query(models.PG).filter(models.PG.id == pg_id, models.PG.owner_id == current_user.id).first()
+    if not pg:
+        raise HTTPException(status_code=404, detail="PG not found")
+
+    try:
+        result = pricing.revise_prices(db, pg_id, revision_in, dry_run=dry_run)
+    except pricing.PriceRevisionError as exc:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    db.commit()
+    return result
+
+
 @router.put("/rooms/{room_id}", response_model=schemas.Room)
 def update_room(
     *,
@@ -0,0 +1,34 @@
+from typing import Any, List, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import FileResponse
+
+from app import schemas
+from app.core import profiler
+from app.core.tracing import TracedRoute
+
+router = APIRouter(route_class=TracedRoute)
+
+
+def require_profiler_token(x_profile_token: Optional[str] = Header(None)) -> None:
+    if not profiler.token_ok(x_profile_token):
+        raise HTTPException(status_code=403, detail="Profiling is off or the X-Profile-Token header is wrong")
+
+
+@router.get("/", response_model=List[schemas.ProfileSummary], dependencies=[Depends(require_profiler_token)])
+def read_profiles() -> Any:
+    """
+    List the saved request profiles of this worker's profile directory, newest first.
+    """
+    return profiler.list_profiles()
+
+
+@router.get("/{profile_id}", dependencies=[Depends(require_profiler_token)])
+def download_profile(profile_id: str) -> Any:
+    """
+    Download a profile as folded stacks (flamegraph.pl / speedscope input).
+    """
+    path = profiler.folded_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain", filename=f"profile-{profile_id}.folded")
@@ -1,21 +1,37 @@
 from typing import Any, List, Optional
 from datetime import date
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, UploadFile
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import bindparam, insert, select, update
 from sqlalchemy.orm import Session
 
 from app import models, schemas
 from app.api import deps
+from app.core import billing, jobs, ledger, reconcile, streaming, tenant_import
+from app.core.config import settings
+from app.core.rent_cycle import generate_rents, month_range
+from app.core.tracing import TracedRoute
 
-router = APIRouter()
+router = APIRouter(route_class=TracedRoute)
+
+MAX_GENERATE_MONTHS = 120
+DEFAULT_FORECAST_MONTHS = 6
+EXPORT_COLUMNS = [
+    "rent_id", "month", "pg", "room", "floor", "bed", "tenant", "phone",
+    "amount_due", "amount_paid", "status", "payment_date",
+]
 
 @router.get("/", response_model=List[schemas.RentRecord])
 def read_rents(
+    request: Request,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
     curr_month: Optional[date] = None,
     status: Optional[str] = None,
+    stream: bool = Query(False, description="Stream the list as it is read (also enabled by Accept: application/x-ndjson)"),
     current_user: models.User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
@@ -27,73 +43,304 @@ def read_rents(
         query = query.filter(models.RentRecord.month == curr_month)
     if status:
         query = query.filter(models.RentRecord.status == status)
-        
-    rents = query.offset(skip).limit(limit).all()
+    query = query.order_by(models.RentRecord.id).offset(skip).limit(limit)
+
+    if stream or streaming.wants_ndjson(request):
+        result = db.execute(query.statement.execution_options(yield_per=streaming.YIELD_PER)).scalars()
+        return streaming.model_stream(request, result, schemas.RentRecord)
+
+    rents = query.all()
     return rents
 
 @router.post("/generate")
 def generate_monthly_rent(
     db: Session = Depends(deps.get_db),
     current_user: models.User = Depends(deps.get_current_active_user),
-    target_month: Optional[date] = Query(None, description="Target month (YYYY-MM-DD), defaults to current month")
+    target_month: Optional[date] = Query(None, description="Target month (YYYY-MM-DD), defaults to current month"),
+    from_month: Optional[date] = Query(None, alias="from", description="First month to generate (YYYY-MM-DD)"),
+    to_month: Optional[date] = Query(None, alias="to", description="Last month to generate (YYYY-MM-DD), defaults to current month"),
+    background: bool = Query(False, description="Queue the work and return 202 with a job to poll"),
 ) -> Any:
     """
-    Generate rent records for all active tenants for the specified month.
-    If no target_month is provided, uses current month.
+    Generate missing rent records for all active tenants, for the specified month
+    or for every month from `from` to `to` (backfill or advance generation).
+    If no month is provided, uses current month.
     """
-    # Determine target month
-    if target_month:
-        month_start = date(target_month.year, target_month.month, 1)
+    today = date.today()
+    if from_month:
+        first, last = from_month, to_month or today
     else:
-        today = date.today()
-        month_start = date(today.year, today.month, 1)
+        first = last = target_month or to_month or today
 
-    # Get all active tenants for this user's PGs
-    tenants = db.query(models.Tenant).join(models.PG).filter(
-        models.PG.owner_id == current_user.id,
-        models.Tenant.status == "active",
-        # Only include tenants who checked in before or during target month
-        models.Tenant.check_in_date <= month_start
-    ).all()
+    months = month_range(first, last)
+    if not months:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+    if len(months) > MAX_GENERATE_MONTHS:
+        raise HTTPException(status_code=400, detail=f"Cannot generate more than {MAX_GENERATE_MONTHS} months at once")
+
+    if background:
+        job = jobs.enqueue(
+            db, "rents.generate", {"months": [m.isoformat() for m in months]}, owner_id=current_user.id
+        )
+        db.commit()
+        return JSONResponse(
+            status_code=202,
+            content=jsonable_encoder(schemas.Job.model_validate(job)),
+            headers={"Location": f"{settings.API_V1_STR}/jobs/{job.id}"},
+        )
 
-    created_count = 0
-    skipped_count = 0
-
-    for tenant in tenants:
-        # Check if rent record exists
-        exists = db.query(models.RentRecord).filter(
-            models.RentRecord.tenant_id == tenant.id,
-            models.RentRecord.month == month_start
-        ).first()
-
-        if not exists:
-            # Get bed price
-            bed = db.query(models.Bed).filter(models.Bed.id == tenant.bed_id).first()
-            if bed:
-                rent_record = models.RentRecord(
-                    tenant_id=tenant.id,
-                    pg_id=tenant.pg_id,
-                    month=month_start,
-                    amount_due=bed.monthly_price,
-                    status="pending"
-                )
-                db.add(rent_record)
-                created_count += 1
-            else:
-                skipped_count += 1
-        else:
-            skipped_count += 1
+    created_count, skipped_count, tenant_ids = generate_rents(db, months, [current_user.id])
 
+    ledger.settle_new_rents(db, tenant_ids, months[0])
     db.commit()
 
+    if len(months) == 1:
+        period = months[0].strftime('%B %Y')
+    else:
+        period = f"{months[0].strftime('%B %Y')} - {months[-1].strftime('%B %Y')}"
+
     result = {
-        "message": f"Generated {created_count} rent records for {month_start.strftime('%B %Y')}",
+        "message": f"Generated {created_count} rent records for {period}",
         "created_count": created_count,
         "skipped_count": skipped_count,
-        "month": month_start.strftime('%Y-%m-%d')
+        "month": months[0].strftime('%Y-%m-%d'),
+        "months": [m.strftime('%Y-%m-%d') for m in months],
     }
     return result
 
+@router.get("/forecast", response_model=List[schemas.RentForecast])
+def read_rent_forecast(
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(deps.get_current_active_user),
+    from_month: Optional[date] = Query(None, alias="from", description="First month (YYYY-MM-DD), defaults to current month"),
+    to_month: Optional[date] = Query(None, alias="to", description="Last month (YYYY-MM-DD), defaults to six months in total"),
+) -> Any:
+    """
+    Expected rent per month from the current active tenants and bed prices,
+    prorated for known check-in and check-out dates.
+    """
+    first = from_month or date.today()
+    if to_month:
+        months = month_range(first, to_month)
+    else:
+        months = month_range(first, date(first.year + 1, first.month, 1))[:DEFAULT_FORECAST_MONTHS]
+    if not months:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+    if len(months) > MAX_GENERATE_MONTHS:
+        raise HTTPException(status_code=400, detail=f"Cannot forecast more than {MAX_GENERATE_MONTHS} months at once")
+
+    stays = db.query(
+        models.Tenant.check_in_date, models.Tenant.check_out_date, models.Bed.monthly_price
+    ).join(models.PG).join(models.Bed, models.Bed.id == models.Tenant.bed_id).filter(
+        models.PG.owner_id == current_user.id,
+        models.Tenant.status == "active"
+    ).all()
+
+    due = billing.bill_grid(
+        [s.check_in_date for s in stays],
+        [s.check_out_date for s in stays],
+        [s.monthly_price or 0.0 for s in stays],
+        months,
+    )
+    return [
+        schemas.RentForecast(
+            month=month,
+            expected_rent=round(float(due[:, i].sum()), 2),
+            billed_tenants=int((due[:, i] > 0).sum()),
+        )
+        for i, month in enumerate(months)
+    ]
+
+@router.get("/export.csv")
+def export_rents_csv(
+    request: Request,
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(deps.get_current_active_user),
+    from_month: Optional[date] = Query(None, alias="from", description="First month (YYYY-MM-DD)"),
+    to_month: Optional[date] = Query(None, alias="to", description="Last month (YYYY-MM-DD)"),
+    pg_id: Optional[int] = None,
+) -> Any:
+    """
+    Export rent records with tenant, room and bed details as CSV, streamed from
+    a server-side cursor and gzipped when the client accepts it.
+    """
+    if from_month and to_month and from_month > to_month:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+
+    stmt = (
+        select(
+            models.RentRecord.id,
+            models.RentRecord.month,
+            models.PG.name,
+            models.Room.room_number,
+            models.Room.floor,
+            models.Bed.bed_number,
+            models.Tenant.name,
+            models.Tenant.phone,
+            models.RentRecord.amount_due,
+            models.RentRecord.amount_paid,
+            models.RentRecord.status,
+            models.RentRecord.payment_date,
+        )
+        .join(models.PG, models.PG.id == models.RentRecord.pg_id)
+        .join(models.Tenant, models.Tenant.id == models.RentRecord.tenant_id)
+        .outerjoin(models.Bed, models.Bed.id == models.Tenant.bed_id)
+        .outerjoin(models.Room, models.Room.id == models.Bed.room_id)
+        .where(models.PG.owner_id == current_user.id)
+        .order_by(models.RentRecord.month, models.RentRecord.id)
+    )
+    if from_month:
+        stmt = stmt.where(models.RentRecord.month >= from_month.replace(day=1))
+    if to_month:
+        stmt = stmt.where(models.RentRecord.month <= to_month)
+    if pg_id is not None:
+        stmt = stmt.where(models.RentRecord.pg_id == pg_id)
+
+    result = db.execute(stmt.execution_options(yield_per=streaming.YIELD_PER))
+    row_batches = (
+        [
+            (
+                row[0], row[1], streaming.safe_text(row[2]), streaming.safe_text(row[3]), row[4],
+                streaming.safe_text(row[5]), streaming.safe_text(row[6]), *row[7:],
+            )
+            for row in batch
+        ]
+        for batch in streaming.batches(result)
+    )
+    body = streaming.csv_chunks(EXPORT_COLUMNS, row_batches)
+
+    filename = f"rents-{from_month or 'start'}-{to_month or 'latest'}.csv"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"', "Vary": "Accept-Encoding"}
+    if streaming.accepts_gzip(request):
+        body = streaming.gzip_chunks(body)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(body, media_type="text/csv", headers=headers)
+
+@router.patch("/bulk", response_model=List[schemas.RentRecordBulkResult])
+def bulk_update_rents(
+    *,
+    db: Session = Depends(deps.get_db),
+    rents_in: List[schemas.RentRecordBulkUpdate],
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Update many rent records (e.g. mark a batch as paid) in a single transaction.
+    """
+    rent_ids = [item.rent_id for item in rents_in]
+
+    # One ownership check for the whole batch
+    owned = {
+        row.id: row._asdict()
+        for row in db.query(
+            models.RentRecord.id,
+            models.RentRecord.tenant_id,
+            models.RentRecord.pg_id,
+            models.RentRecord.month,
+            models.RentRecord.amount_due,
+            models.RentRecord.amount_paid,
+            models.RentRecord.status,
+            models.RentRecord.payment_date,
+        ).join(models.PG).filter(
+            models.RentRecord.id.in_(rent_ids),
+            models.PG.owner_id == current_user.id
+        )
+    }
+
+    results = []
+    params = []
+    payments = []
+    seen = set()
+    for item in rents_in:
+        if item.rent_id in seen:
+            results.append(schemas.RentRecordBulkResult(
+                rent_id=item.rent_id, updated=False, detail="Duplicate rent_id in request"
+            ))
+            continue
+        seen.add(item.rent_id)
+
+        current = owned.get(item.rent_id)
+        if current is None:
+            results.append(schemas.RentRecordBulkResult(
+                rent_id=item.rent_id, updated=False, detail="Rent record not found"
+            ))
+            continue
+
+        update_data = item.dict(exclude_unset=True, exclude={"rent_id"})
+        # Same auto-fill rule as update_rent
+        if update_data.get("status") == "paid" and "amount_paid" not in update_data:
+            update_data["amount_paid"] = current["amount_due"]
+
+        delta = (update_data.get("amount_paid") or 0.0) - (current["amount_paid"] or 0.0) if "amount_paid" in update_data else 0.0
+        current.update(update_data)
+        if delta and current["tenant_id"] is not None:
+            payments.append({
+                "tenant_id": current["tenant_id"],
+                "pg_id": current["pg_id"],
+                "rent_record_id": current["id"],
+                "amount": round(delta, 2),
+                "payment_date": current["payment_date"] or date.today(),
+                "mode": "manual",
+            })
+        params.append({
+            "b_id": current["id"],
+            "b_status": current["status"],
+            "b_amount_paid": current["amount_paid"],
+            "b_payment_date": current["payment_date"],
+        })
+        results.append(schemas.RentRecordBulkResult(
+            rent_id=item.rent_id, updated=True, rent=schemas.RentRecord(**current)
+        ))
+
+    if params:
+        rents = models.RentRecord.__table__
+        stmt = update(rents).where(rents.c.id == bindparam("b_id")).values(
+            status=bindparam("b_status"),
+            amount_paid=bindparam("b_amount_paid"),
+            payment_date=bindparam("b_payment_date"),
+        )
+        # executemany: one round trip for the whole batch
+        db.execute(stmt, params)
+        if payments:
+            db.execute(insert(models.Payment), payments)
+        ledger.refresh_balances(db, [current["tenant_id"] for current in owned.values() if current["tenant_id"]])
+        db.commit()
+
+    return results
+
+@router.post("/reconcile", response_model=schemas.ReconcileResult)
+def reconcile_statement(
+    *,
+    db: Session = Depends(deps.get_db),
+    file: UploadFile = File(..., description="Bank/UPI statement as CSV or .xlsx with date, credit/amount and narration columns"),
+    pg_id: Optional[int] = Query(None, description="Only match rent records of this PG"),
+    auto_apply: bool = Query(False, description="Record confident matches as UPI payments"),
+    min_confidence: float = Query(0.7, ge=0, le=1, description="Lowest confidence applied with auto_apply"),
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Match the credits of a bank statement to open rent records by amount,
+    date and the tenant's phone or name in the narration. Matches come with a
+    confidence score; with auto_apply the confident ones are recorded.
+    """
+    if pg_id is not None and not db.query(models.PG.id).filter(
+        models.PG.id == pg_id, models.PG.owner_id == current_user.id
+    ).first():
+        raise HTTPException(status_code=404, detail="PG not found")
+
+    try:
+        rows = tenant_import.read_rows(file.file, file.filename or "")
+        result = reconcile.reconcile(
+            db, current_user.id, rows, pg_id=pg_id, auto_apply=auto_apply, min_confidence=min_confidence
+        )
+    except (tenant_import.ImportFileError, UnicodeDecodeError) as exc:
+        db.rollback()
+        detail = "File is not UTF-8 text" if isinstance(exc, UnicodeDecodeError) else str(exc)
+        raise HTTPException(status_code=400, detail=detail)
+
+    if result.applied:
+        db.commit()
+    return result
+
 @router.put("/{rent_id}", response_model=schemas.RentRecord)
 def update_rent(
     *,
@@ -119,10 +366,20 @@ def update_rent(
     if update_data.get("status") == "paid" and "amount_paid" not in update_data:
         update_data["amount_paid"] = rent.amount_due
 
+    # Keep the ledger in step with manual edits to amount_paid
+    delta = (update_data.get("amount_paid") or 0.0) - (rent.amount_paid or 0.0) if "amount_paid" in update_data else 0.0
+
     for field, value in update_data.items():
         setattr(rent, field, value)
         
     db.add(rent)
+    if rent.tenant_id is not None:
+        if delta:
+            ledger.add_payment(
+                db, rent.tenant_id, rent.pg_id, round(delta, 2), rent.payment_date or date.today(), "manual", rent.id
+            )
+        db.flush()
+        ledger.refresh_balances(db, [rent.tenant_id])
     db.commit()
     db.refresh(rent)
     return rent
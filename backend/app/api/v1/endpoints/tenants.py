@@ -1,55 +1,47 @@
 from typing import Any, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, UploadFile
+from sqlalchemy import and_, case, func
+from sqlalchemy.orm import Session, selectinload
 from datetime import date, timedelta
-import calendar
 
 from app import models, schemas
 from app.api import deps
+from app.core import ledger, streaming, tenant_import
+from app.core.rent_cycle import calculate_prorated_rent, rent_for_month
+from app.db.upsert import insert_for
+from app.core.tracing import TracedRoute
 
-router = APIRouter()
+router = APIRouter(route_class=TracedRoute)
 
 
-def calculate_prorated_rent(check_in_date: date, monthly_rent: float) -> float:
-    """
-    Calculate prorated rent for partial month based on check-in date.
-    Args:
-        check_in_date: The date tenant checks in
-        monthly_rent: The full monthly rent amount
-    Returns:
-        Prorated rent amount for the remaining days in the month
-    """
-    # Get total days in the month
-    year = check_in_date.year
-    month = check_in_date.month
-    total_days = calendar.monthrange(year, month)[1]
-
-    # Calculate remaining days (including check-in day)
-    remaining_days = total_days - check_in_date.day + 1
-
-    # Calculate prorated amount
-    daily_rate = monthly_rent / total_days
-    prorated_amount = daily_rate * remaining_days
-
-    return round(prorated_amount, 2)
-
 @router.get("/", response_model=List[schemas.Tenant])
 def read_tenants(
+    request: Request,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
     pg_id: Optional[int] = None,
+    stream: bool = Query(False, description="Stream the list as it is read (also enabled by Accept: application/x-ndjson)"),
     current_user: models.User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Retrieve tenants.
     """
-    query = db.query(models.Tenant).join(models.PG).filter(models.PG.owner_id == current_user.id)
+    query = db.query(models.Tenant).join(models.PG).filter(models.PG.owner_id == current_user.id).options(
+        selectinload(models.Tenant.rent_records),
+        selectinload(models.Tenant.bed).selectinload(models.Bed.room),
+        selectinload(models.Tenant.pg),
+    )
     if pg_id:
         query = query.filter(models.Tenant.pg_id == pg_id)
-    
-    tenants = query.offset(skip).limit(limit).all()
+    query = query.order_by(models.Tenant.id).offset(skip).limit(limit)
+
+    if stream or streaming.wants_ndjson(request):
+        result = db.execute(query.statement.execution_options(yield_per=streaming.YIELD_PER)).scalars()
+        return streaming.model_stream(request, result, schemas.Tenant)
+
+    tenants = query.all()
     return tenants
 
 
@@ -132,11 +124,42 @@ def create_tenant(
         status="pending"
     )
     db.add(rent_record)
+    db.flush()
+    ledger.refresh_balances(db, [tenant.id])
     
     db.commit()
     db.refresh(tenant)
     return tenant
 
+@router.post("/import", response_model=schemas.TenantImportResult)
+def import_tenants(
+    *,
+    db: Session = Depends(deps.get_db),
+    pg_id: int = Query(..., description="PG to add the tenants to"),
+    file: UploadFile = File(..., description="CSV or .xlsx with a header row: name, phone, check_in_date, room_number, bed_number, ..."),
+    dry_run: bool = Query(False, description="Only validate and report errors"),
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Add many tenants from a spreadsheet. Each row's bed is given by room and
+    bed number; valid rows get their tenant, first-month rent record and
+    occupied bed, invalid rows are listed with their errors.
+    """
+    pg = db.query(models.PG).filter(models.PG.id == pg_id, models.PG.owner_id == current_user.id).first()
+    if not pg:
+        raise HTTPException(status_code=404, detail="PG not found")
+
+    try:
+        rows = tenant_import.read_rows(file.file, file.filename or "")
+        result = tenant_import.import_tenants(db, pg, rows, dry_run=dry_run)
+    except (tenant_import.ImportFileError, UnicodeDecodeError) as exc:
+        db.rollback()
+        detail = "File is not UTF-8 text" if isinstance(exc, UnicodeDecodeError) else str(exc)
+        raise HTTPException(status_code=400, detail=detail)
+
+    db.commit()
+    return result
+
 @router.post("/{tenant_id}/checkout", response_model=schemas.Tenant)
 def checkout_tenant(
     *,
@@ -173,6 +196,199 @@ def checkout_tenant(
     return tenant
 
 
+@router.post("/{tenant_id}/payments", response_model=schemas.RentRecord)
+def record_payment(
+    *,
+    db: Session = Depends(deps.get_db),
+    tenant_id: int,
+    payment_in: schemas.PaymentCreate,
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Record a rent payment for a tenant's month, creating the rent record if needed.
+    """
+    if payment_in.amount is not None and payment_in.amount <= 0:
+        raise HTTPException(status_code=400, detail="Payment amount must be positive")
+
+    target = payment_in.month or date.today()
+    month_start = date(target.year, target.month, 1)
+
+    # Payments for one tenant run one at a time, so what this call adds to the ledger is
+    # worked out from the month's record as any earlier payment left it (e.g. a double click)
+    db.query(models.Tenant.id).filter(models.Tenant.id == tenant_id).with_for_update().first()
+
+    # Ownership check, bed price and the month's existing record in one query
+    row = db.query(
+        models.Tenant,
+        models.Bed.monthly_price,
+        models.RentRecord.amount_due,
+        models.RentRecord.amount_paid,
+        models.RentRecord.status,
+    ).join(models.PG, models.PG.id == models.Tenant.pg_id).outerjoin(
+        models.Bed, models.Bed.id == models.Tenant.bed_id
+    ).outerjoin(
+        models.RentRecord,
+        and_(models.RentRecord.tenant_id == models.Tenant.id, models.RentRecord.month == month_start)
+    ).filter(
+        models.Tenant.id == tenant_id,
+        models.PG.owner_id == current_user.id
+    ).first()
+
+    if not row:
+        raise HTTPException(status_code=404, detail="Tenant not found")
+
+    tenant, monthly_price, existing_due, existing_paid, existing_status = row
+    check_in = tenant.check_in_date
+    payment_date = payment_in.payment_date or date.today()
+
+    # Amount due only matters when the month's record doesn't exist yet; the same as
+    # generate_rents would bill, prorated in the check-in and check-out months
+    amount_due = rent_for_month(month_start, check_in, tenant.check_out_date, monthly_price or 0.0)
+
+    if payment_in.amount is None:
+        amount_paid = amount_due
+    else:
+        amount_paid = payment_in.amount
+
+    # What this call actually adds to the ledger
+    if payment_in.amount is not None:
+        received = payment_in.amount
+    elif existing_due is None:
+        received = amount_due
+    elif existing_status == "paid" and not existing_paid:
+        received = 0.0
+    else:
+        received = max(existing_due - (existing_paid or 0.0), 0.0)
+
+    rents = models.RentRecord.__table__
+    insert = insert_for(db.get_bind())
+    stmt = insert(models.RentRecord).values(
+        tenant_id=tenant.id,
+        pg_id=tenant.pg_id,
+        month=month_start,
+        amount_due=amount_due,
+        amount_paid=amount_paid,
+        status="paid" if amount_paid >= amount_due else "partial",
+        payment_date=payment_date,
+    )
+
+    # Existing record: a full payment settles it, a partial one adds to what was paid
+    if payment_in.amount is None:
+        new_paid = rents.c.amount_due
+    else:
+        new_paid = func.coalesce(rents.c.amount_paid, 0.0) + stmt.excluded.amount_paid
+
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[rents.c.tenant_id, rents.c.month],
+        set_={
+            "amount_paid": new_paid,
+            "status": case((new_paid >= rents.c.amount_due, "paid"), else_="partial"),
+            "payment_date": stmt.excluded.payment_date,
+            "updated_at": func.now(),
+        },
+    ).returning(models.RentRecord)
+
+    rent = db.scalars(stmt, execution_options={"populate_existing": True}).one()
+    # Serialize before commit so the response needs no refresh query
+    result = schemas.RentRecord.model_validate(rent)
+
+    if received > 0:
+        ledger.add_payment(db, tenant.id, tenant.pg_id, round(received, 2), payment_date, payment_in.mode, rent.id)
+        db.flush()
+        ledger.refresh_balances(db, [tenant.id])
+    db.commit()
+    return result
+
+
+@router.post("/{tenant_id}/payments/lump-sum", response_model=schemas.PaymentAllocation)
+def record_lump_sum_payment(
+    *,
+    db: Session = Depends(deps.get_db),
+    tenant_id: int,
+    payment_in: schemas.LumpSumPaymentCreate,
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Record a lump-sum or advance payment, applied to outstanding months oldest first.
+    Whatever is left over is kept as credit for future months.
+    """
+    tenant = db.query(models.Tenant).join(models.PG).filter(
+        models.Tenant.id == tenant_id,
+        models.PG.owner_id == current_user.id
+    ).first()
+
+    if not tenant:
+        raise HTTPException(status_code=404, detail="Tenant not found")
+
+    if payment_in.amount <= 0:
+        raise HTTPException(status_code=400, detail="Payment amount must be positive")
+
+    payment_date = payment_in.payment_date or date.today()
+    payment = ledger.add_payment(db, tenant.id, tenant.pg_id, payment_in.amount, payment_date, payment_in.mode)
+    rents, remaining = ledger.allocate_fifo(db, tenant.id, payment_in.amount, payment_date)
+    db.flush()
+    ledger.refresh_balances(db, [tenant.id])
+    if remaining > 0:
+        ledger.add_credit(db, tenant.id, remaining)
+
+    db.commit()
+    balance = db.query(models.TenantBalance).filter(models.TenantBalance.tenant_id == tenant.id).one()
+    return schemas.PaymentAllocation(
+        payment=schemas.Payment.model_validate(payment),
+        rents=[schemas.RentRecord.model_validate(r) for r in rents],
+        balance=schemas.TenantBalance.model_validate(balance),
+    )
+
+
+@router.get("/{tenant_id}/payments", response_model=List[schemas.Payment])
+def read_payments(
+    *,
+    db: Session = Depends(deps.get_db),
+    tenant_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Retrieve a tenant's payment history, newest first.
+    """
+    payments = db.query(models.Payment).join(
+        models.Tenant, models.Tenant.id == models.Payment.tenant_id
+    ).join(models.PG, models.PG.id == models.Tenant.pg_id).filter(
+        models.Payment.tenant_id == tenant_id,
+        models.PG.owner_id == current_user.id
+    ).order_by(models.Payment.payment_date.desc(), models.Payment.id.desc()).offset(skip).limit(limit).all()
+    return payments
+
+
+@router.get("/{tenant_id}/balance", response_model=schemas.TenantBalance)
+def read_balance(
+    *,
+    db: Session = Depends(deps.get_db),
+    tenant_id: int,
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Get a tenant's outstanding balance from the cached snapshot.
+    """
+    row = db.query(models.Tenant.id, models.TenantBalance).join(models.PG).outerjoin(
+        models.TenantBalance, models.TenantBalance.tenant_id == models.Tenant.id
+    ).filter(
+        models.Tenant.id == tenant_id,
+        models.PG.owner_id == current_user.id
+    ).first()
+
+    if not row:
+        raise HTTPException(status_code=404, detail="Tenant not found")
+
+    if row.TenantBalance is None:
+        # Tenants from before the ledger get their snapshot built on first read
+        ledger.refresh_balances(db, [tenant_id])
+        db.commit()
+        return db.query(models.TenantBalance).filter(models.TenantBalance.tenant_id == tenant_id).one()
+    return row.TenantBalance
+
+
 @router.put("/{tenant_id}", response_model=schemas.Tenant)
 def update_tenant(
     *,
@@ -9,8 +9,9 @@ from app import models, schemas
 from app.api import deps
 from app.core.config import settings
 from app.core.security import get_password_hash
+from app.core.tracing import TracedRoute
 
-router = APIRouter()
+router = APIRouter(route_class=TracedRoute)
 
 
 @router.post("/", response_model=schemas.User)
@@ -0,0 +1,195 @@
+"""
+Owner backups as JSON Lines.
+
+A backup is one header line followed by one line per row, parents before
+children:
+
+    {"format": "pgkhata-backup", "version": 1, ...}
+    {"table": "pgs", "row": {"id": 3, "name": "Sunrise PG", ...}}
+    {"table": "rooms", "row": {"id": 11, "pg_id": 3, ...}}
+
+Restoring inserts the rows under the restoring owner with new ids. Rows are
+bulk-inserted a chunk at a time with RETURNING, which maps each old id to
+its new one for the foreign keys of later rows; every chunk is committed in
+its own transaction.
+"""
+import json
+from datetime import date, datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List
+
+from sqlalchemy import Date, DateTime, insert, select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core.ownership import owner_filter
+
+FORMAT = "pgkhata-backup"
+VERSION = 1
+CHUNK_ROWS = 1000
+
+# Restore order; each table's foreign keys and the table whose ids they hold
+TABLES = {
+    "pgs": (models.PG, {}),
+    "rooms": (models.Room, {"pg_id": "pgs"}),
+    "beds": (models.Bed, {"room_id": "rooms"}),
+    "tenants": (models.Tenant, {"pg_id": "pgs", "bed_id": "beds"}),
+    "rent_records": (models.RentRecord, {"tenant_id": "tenants", "pg_id": "pgs"}),
+    "payments": (models.Payment, {"tenant_id": "tenants", "pg_id": "pgs", "rent_record_id": "rent_records"}),
+    "tenant_balances": (models.TenantBalance, {"tenant_id": "tenants"}),
+}
+
+
+class RestoreError(ValueError):
+    pass
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Cannot encode {type(value).__name__}")
+
+
+def dump_lines(db: Session, owner_id: int) -> Iterator[bytes]:
+    """
+    The owner's data as JSON Lines, one chunk of lines per fetched batch.
+    """
+    header = {
+        "format": FORMAT,
+        "version": VERSION,
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "tables": list(TABLES),
+    }
+    yield (json.dumps(header) + "\n").encode()
+
+    for table, (model, _) in TABLES.items():
+        columns = model.__table__.columns
+        key = list(model.__table__.primary_key.columns)
+        result = db.execute(
+            select(*columns).where(owner_filter(model, owner_id)).order_by(*key)
+            .execution_options(yield_per=CHUNK_ROWS)
+        )
+        try:
+            for rows in result.partitions():
+                yield "".join(
+                    json.dumps({"table": table, "row": dict(row._mapping)}, default=_encode) + "\n"
+                    for row in rows
+                ).encode()
+        finally:
+            result.close()
+
+
+def _decoder(model) -> Dict[str, Any]:
+    decode = {}
+    for column in model.__table__.columns:
+        if isinstance(column.type, DateTime):
+            decode[column.name] = datetime.fromisoformat
+        elif isinstance(column.type, Date):
+            decode[column.name] = date.fromisoformat
+        else:
+            decode[column.name] = None
+    return decode
+
+
+class Restore:
+    """
+    Feed parsed backup lines in file order; call finish() at the end.
+    """
+
+    def __init__(self, db: Session, owner_id: int):
+        self.db = db
+        self.owner_id = owner_id
+        self.id_map: Dict[str, Dict[int, int]] = {table: {} for table in TABLES}
+        self.counts: Dict[str, int] = {table: 0 for table in TABLES}
+        self.decoders = {table: _decoder(model) for table, (model, _) in TABLES.items()}
+        self.table: str = ""
+        self.pending: List[Dict[str, Any]] = []
+        self.header_seen = False
+        self.line_no = 0
+
+    def feed(self, line: Dict[str, Any]) -> None:
+        self.line_no += 1
+        if not self.header_seen:
+            if line.get("format") != FORMAT or line.get("version") != VERSION:
+                raise RestoreError("Not a pgkhata backup (bad or missing header line)")
+            self.header_seen = True
+            return
+
+        table = line.get("table")
+        if table not in TABLES:
+            raise RestoreError(f"Line {self.line_no}: unknown table '{table}'")
+        if table != self.table:
+            if list(TABLES).index(table) < list(TABLES).index(self.table or "pgs"):
+                raise RestoreError(f"Line {self.line_no}: '{table}' rows must come before '{self.table}' rows")
+            self.flush()
+            self.table = table
+        row = line.get("row") or {}
+        if not isinstance(row, dict):
+            raise RestoreError(f"Line {self.line_no}: row is not a JSON object")
+        self.pending.append(self._decode(table, row))
+        if len(self.pending) >= CHUNK_ROWS:
+            self.flush()
+
+    def _decode(self, table: str, row: Dict[str, Any]) -> Dict[str, Any]:
+        decoders = self.decoders[table]
+        out = {}
+        for name, value in row.items():
+            if name not in decoders:
+                continue  # Column from a newer schema
+            decode = decoders[name]
+            out[name] = decode(value) if decode and value is not None else value
+        return out
+
+    def flush(self) -> None:
+        if not self.pending:
+            return
+        table, rows = self.table, self.pending
+        self.pending = []
+        model, foreign_keys = TABLES[table]
+
+        old_ids = []
+        for row in rows:
+            for column, parent in foreign_keys.items():
+                old = row.get(column)
+                if old is None:
+                    continue
+                if old not in self.id_map[parent]:
+                    raise RestoreError(f"{table} row {row.get('id')} references unknown {parent} id {old}")
+                row[column] = self.id_map[parent][old]
+            if model is models.PG:
+                row["owner_id"] = self.owner_id
+            if "id" in model.__table__.columns:
+                old_ids.append(row.pop("id", None))
+
+        if old_ids:
+            new_ids = self.db.scalars(
+                insert(model).returning(model.id, sort_by_parameter_order=True), rows
+            ).all()
+            self.id_map[table].update((old, new) for old, new in zip(old_ids, new_ids) if old is not None)
+        else:
+            self.db.execute(insert(model), rows)
+        self.db.commit()
+        self.counts[table] += len(rows)
+
+    def finish(self) -> Dict[str, int]:
+        if not self.header_seen:
+            raise RestoreError("Backup is empty")
+        self.flush()
+        return self.counts
+
+
+def restore_lines(db: Session, owner_id: int, lines: Iterable[bytes]) -> Dict[str, int]:
+    """
+    Restore a backup from its raw lines. Returns rows inserted per table.
+    """
+    restore = Restore(db, owner_id)
+    for raw in lines:
+        if not raw.strip():
+            continue
+        try:
+            line = json.loads(raw)
+        except ValueError:
+            raise RestoreError(f"Line {restore.line_no + 1}: not valid JSON")
+        if not isinstance(line, dict):
+            raise RestoreError(f"Line {restore.line_no + 1}: not a JSON object")
+        restore.feed(line)
+    return restore.finish()
@@ -0,0 +1,86 @@
+"""
+Batched rent billing.
+
+Computes the rent due for many (tenant, month) combinations at once with
+NumPy instead of one Python call per tenant and month. A month is billed in
+full unless the stay starts or ends inside it, in which case it is prorated
+by the days stayed (check-in and check-out days included).
+"""
+from datetime import date
+from typing import Optional, Sequence
+
+import numpy as np
+
+# date.toordinal() of 1970-01-01, the datetime64 epoch
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+# Stand-in for "no check-out date"
+_OPEN_ENDED = date(9999, 12, 31)
+
+
+def _as_days(values: Sequence[Optional[date]]) -> np.ndarray:
+    # Going through ordinals is much faster than letting NumPy parse date objects
+    ordinals = np.fromiter(
+        ((value or _OPEN_ENDED).toordinal() for value in values), dtype=np.int64, count=len(values)
+    )
+    return (ordinals - _EPOCH_ORDINAL).astype("datetime64[D]")
+
+
+def _as_months(values: Sequence[date]) -> np.ndarray:
+    months = np.fromiter(
+        ((value.year - 1970) * 12 + value.month - 1 for value in values), dtype=np.int64, count=len(values)
+    )
+    return months.astype("datetime64[M]")
+
+
+def _due(
+    check_in: np.ndarray, check_out: np.ndarray, monthly_price: np.ndarray, months: np.ndarray
+) -> np.ndarray:
+    """
+    Element-wise (broadcasting) rent due. Dates are datetime64[D], months are
+    datetime64[M].
+    """
+    month_start = months.astype("datetime64[D]")
+    next_month = (months + 1).astype("datetime64[D]")
+    days_in_month = (next_month - month_start).astype(np.int64)
+
+    first = np.maximum(check_in, month_start)
+    last = np.minimum(check_out, next_month - 1)
+    days = np.clip((last - first).astype(np.int64) + 1, 0, None)
+
+    prorated = np.round(monthly_price / days_in_month * days, 2)
+    return np.where(days == days_in_month, monthly_price, prorated)
+
+
+def bill_pairs(
+    check_in: Sequence[date],
+    check_out: Sequence[Optional[date]],
+    monthly_price: Sequence[float],
+    months: Sequence[date],
+) -> np.ndarray:
+    """
+    Rent due for each (stay, month) pair; all arguments have the same length.
+    """
+    return _due(
+        _as_days(check_in),
+        _as_days(check_out),
+        np.asarray(monthly_price, dtype=np.float64),
+        _as_months(months),
+    )
+
+
+def bill_grid(
+    check_in: Sequence[date],
+    check_out: Sequence[Optional[date]],
+    monthly_price: Sequence[float],
+    months: Sequence[date],
+) -> np.ndarray:
+    """
+    Rent due for every stay in every month, as an array of shape
+    (len(check_in), len(months)). Months outside a stay are 0.
+    """
+    return _due(
+        _as_days(check_in)[:, None],
+        _as_days(check_out)[:, None],
+        np.asarray(monthly_price, dtype=np.float64)[:, None],
+        _as_months(months)[None, :],
+    )
@@ -1,6 +1,6 @@
 from pydantic import field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import Any
+from typing import Any, Optional
 
 class Settings(BaseSettings):
     PROJECT_NAME: str = "PGKhata Management System"
@@ -11,6 +11,57 @@ class Settings(BaseSettings):
     ADMIN_PASSWORD: str
     BACKEND_CORS_ORIGINS: list[str] = ["http://localhost:5173", "http://localhost:3000"]
 
+    # Month rollover scheduler (python -m app.scheduler)
+    ROLLOVER_TIMEZONE: str = "Asia/Kolkata"
+    ROLLOVER_PROCESSES: int = 4
+    ROLLOVER_CHUNK_SIZE: int = 100  # Owners per transaction
+
+    # Slow query log (app/core/slow_query.py); 0 turns it off
+    SLOW_QUERY_MS: int = 200
+    SLOW_QUERY_LOG_FILE: str = "logs/slow_queries.jsonl"
+    SLOW_QUERY_LOG_MAX_BYTES: int = 10 * 1024 * 1024
+    SLOW_QUERY_LOG_BACKUPS: int = 5
+    SLOW_QUERY_EXPLAIN_SAMPLE: float = 0.1  # Share of slow statements explained, Postgres only
+    SLOW_QUERY_EXPLAIN_INTERVAL: int = 600  # Seconds before the same statement is explained again
+
+    # Bearer token for scraping GET /metrics (app/core/metrics.py); an empty token turns it off
+    METRICS_TOKEN: str = ""
+
+    # Per-request profiling (app/core/profiler.py); an empty token turns it off
+    PROFILER_TOKEN: str = ""
+    PROFILE_DIR: str = "profiles"
+    PROFILE_KEEP: int = 50
+    PROFILE_INTERVAL_MS: float = 5.0
+
+    # Ping each pooled connection before handing it out. Off, that round trip is saved and a
+    # connection found closed on its first statement is replaced and retried (app/db/reconnect.py)
+    DB_PRE_PING: bool = True
+
+    # Connections each worker keeps (app/db/session.py); unset, 5 + 10 overflow in production and
+    # 10 + 20 otherwise. 0 opens a connection per checkout and closes it after (NullPool)
+    DB_POOL_SIZE: Optional[int] = None
+    DB_MAX_OVERFLOW: Optional[int] = None
+    # Behind a transaction-mode pooler (PgBouncer pool_mode=transaction), which owns the server
+    # connections: workers default to NullPool and drivers don't prepare statements server-side
+    DB_TRANSACTION_POOLER: bool = False
+    # Set with SET LOCAL at the start of every transaction on Postgres (app/db/timeouts.py); 0 keeps
+    # the server's default
+    DB_STATEMENT_TIMEOUT_MS: int = 0
+    DB_IDLE_IN_TRANSACTION_TIMEOUT_MS: int = 0
+
+    # Seconds between the database probes behind GET /readyz (app/core/health.py)
+    HEALTH_CHECK_INTERVAL: float = 10.0
+
+    # Create missing tables in the background when a worker starts (app/db/schema.py); turn off
+    # where the schema is managed separately, and workers are ready without checking it
+    CREATE_TABLES_ON_STARTUP: bool = True
+    # How long an API request waits for that check before it is answered 503
+    SCHEMA_WAIT_SECONDS: float = 5.0
+
+    # Request tracing (app/core/tracing.py); spans are appended to TRACE_FILE, empty turns it off
+    TRACE_FILE: str = ""
+    TRACE_SAMPLE: float = 1.0  # Share of requests traced unless the caller sent a traceparent
+
     @field_validator("DATABASE_URL", mode="before")
     @classmethod
     def assemble_db_url(cls, v: Any) -> Any:
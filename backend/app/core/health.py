@@ -0,0 +1,130 @@
+"""
+Liveness and readiness endpoints.
+
+GET /healthz answers from the process alone: a worker that can run it is
+alive. GET /readyz says whether the worker can serve real requests: the
+schema check has finished (app/db/schema.py) and the database answered the
+last probe. The probe (SELECT 1) runs on a background thread every
+HEALTH_CHECK_INTERVAL seconds, so however often a load balancer polls, it
+never waits on the database or adds queries to it. A result older than
+three intervals counts as a failure, as the probe thread is stuck.
+
+Until the schema check has finished, SchemaReadyMiddleware holds API requests
+for up to SCHEMA_WAIT_SECONDS and then answers them 503, so no query runs
+against tables that are still being created or upgraded.
+"""
+import asyncio
+import logging
+import threading
+import time
+from typing import NamedTuple, Optional
+
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+from app.core.config import settings
+from app.db import schema
+from app.db.session import engine
+
+logger = logging.getLogger(__name__)
+
+STALE_AFTER_INTERVALS = 3
+SCHEMA_POLL_SECONDS = 0.05
+
+
+class DatabaseStatus(NamedTuple):
+    ok: bool
+    checked_at: Optional[float] = None  # time.monotonic() of the last probe
+    latency_ms: Optional[float] = None
+    error: Optional[str] = None
+
+
+# Replaced as a whole by the probe, so readers need no lock
+status = DatabaseStatus(ok=False, error="not checked yet")
+_thread: Optional[threading.Thread] = None
+_stop = threading.Event()
+_lock = threading.Lock()
+
+
+def probe() -> DatabaseStatus:
+    """
+    Run SELECT 1 on a pooled connection and record the outcome.
+    """
+    global status
+    start = time.perf_counter()
+    try:
+        with engine.connect() as conn:
+            conn.exec_driver_sql("SELECT 1")
+    except Exception as exc:
+        if status.ok:
+            logger.warning("Database health probe failed: %s", exc)
+        first_line = (str(exc).splitlines() or [""])[0]
+        status = DatabaseStatus(ok=False, checked_at=time.monotonic(), error=f"{type(exc).__name__}: {first_line}")
+    else:
+        latency_ms = round((time.perf_counter() - start) * 1000, 2)
+        status = DatabaseStatus(ok=True, checked_at=time.monotonic(), latency_ms=latency_ms)
+    return status
+
+
+def _run() -> None:
+    while not _stop.is_set():
+        probe()
+        _stop.wait(settings.HEALTH_CHECK_INTERVAL)
+
+
+def start() -> None:
+    """
+    Probe the database in the background, once per process.
+    """
+    global _thread
+    with _lock:
+        if _thread is None or not _thread.is_alive():
+            _stop.clear()
+            _thread = threading.Thread(target=_run, name="db-health", daemon=True)
+            _thread.start()
+
+
+def stop() -> None:
+    _stop.set()
+
+
+def _database_ready(current: DatabaseStatus) -> bool:
+    if not current.ok or current.checked_at is None:
+        return False
+    return time.monotonic() - current.checked_at <= STALE_AFTER_INTERVALS * settings.HEALTH_CHECK_INTERVAL
+
+
+async def healthz(request: Request) -> JSONResponse:
+    return JSONResponse({"status": "ok"})
+
+
+async def readyz(request: Request) -> JSONResponse:
+    current = status
+    checks = {"schema": schema.ready.is_set(), "database": _database_ready(current)}
+    age = None if current.checked_at is None else round(time.monotonic() - current.checked_at, 1)
+    body = {
+        "status": "ok" if all(checks.values()) else "unavailable",
+        "checks": checks,
+        "database": {"checked_seconds_ago": age, "latency_ms": current.latency_ms, "error": current.error},
+    }
+    return JSONResponse(body, status_code=200 if all(checks.values()) else 503)
+
+
+class SchemaReadyMiddleware:
+    """
+    Hold API requests until the schema check has finished.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].startswith(settings.API_V1_STR) and not schema.ready.is_set():
+            deadline = time.monotonic() + settings.SCHEMA_WAIT_SECONDS
+            while not schema.ready.is_set() and time.monotonic() < deadline:
+                await asyncio.sleep(SCHEMA_POLL_SECONDS)
+            if not schema.ready.is_set():
+                response = JSONResponse({"detail": "Starting up"}, status_code=503, headers={"Retry-After": "1"})
+                await response(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
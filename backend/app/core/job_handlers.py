@@ -0,0 +1,34 @@
+"""
+Handlers for background job kinds. Imported by the worker so they register.
+"""
+from datetime import date
+
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core import jobs, ledger
+from app.core.rent_cycle import generate_rents
+
+
+@jobs.handler("rents.generate")
+def generate_rent_job(db: Session, job: models.Job) -> dict:
+    """
+    Generate an owner's missing rent records, committing one month at a time
+    so progress is visible and a retry resumes where the last attempt stopped.
+    """
+    months = [date.fromisoformat(m) for m in job.payload["months"]]
+    created_count = 0
+    skipped_count = 0
+    for done, month in enumerate(months, start=1):
+        created, skipped, tenant_ids = generate_rents(db, [month], [job.owner_id])
+        ledger.settle_new_rents(db, tenant_ids, month)
+        created_count += created
+        skipped_count += skipped
+        jobs.set_progress(db, job, done / len(months))
+        db.commit()
+
+    return {
+        "created_count": created_count,
+        "skipped_count": skipped_count,
+        "months": job.payload["months"],
+    }
@@ -0,0 +1,164 @@
+"""
+Durable background jobs stored in the `jobs` table.
+
+Endpoints enqueue work and return straight away; `python -m app.worker`
+processes claims one job at a time. On Postgres a claim uses
+SELECT ... FOR UPDATE SKIP LOCKED so concurrent workers never wait on each
+other; the claim itself is a conditional UPDATE, which also keeps SQLite
+(no row locks) from handing one job to two workers. Failed jobs are retried
+with exponential backoff, and jobs whose worker died are reclaimed once
+their lease expires, unless that was their last attempt: a job that kills
+its worker (e.g. runs out of memory) is marked failed instead of being run
+again forever.
+"""
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.orm import Session
+
+from app import models
+
+logger = logging.getLogger(__name__)
+
+RETRY_BASE_SECONDS = 30
+RETRY_MAX_SECONDS = 60 * 60
+LEASE_SECONDS = 15 * 60
+
+Handler = Callable[[Session, models.Job], Any]
+HANDLERS: Dict[str, Handler] = {}
+
+
+def handler(kind: str) -> Callable[[Handler], Handler]:
+    """
+    Register the function that runs jobs of the given kind. It receives the
+    session and the job, may commit along the way (e.g. after each chunk), and
+    returns a JSON-serialisable result.
+    """
+    def register(fn: Handler) -> Handler:
+        HANDLERS[kind] = fn
+        return fn
+    return register
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def enqueue(
+    db: Session, kind: str, payload: Dict[str, Any], owner_id: Optional[int] = None, max_attempts: int = 5
+) -> models.Job:
+    """
+    Add a job to the queue. The caller commits.
+    """
+    job = models.Job(
+        kind=kind,
+        payload=payload,
+        owner_id=owner_id,
+        status="queued",
+        attempts=0,
+        max_attempts=max_attempts,
+        progress=0.0,
+        run_after=utcnow(),
+    )
+    db.add(job)
+    return job
+
+
+def backoff(attempts: int) -> timedelta:
+    return timedelta(seconds=min(RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0), RETRY_MAX_SECONDS))
+
+
+def claim(db: Session, worker_id: str) -> Optional[models.Job]:
+    """
+    Claim the next runnable job for this worker, or return None if there is none.
+    """
+    now = utcnow()
+    # Running jobs whose worker stopped renewing the lease
+    expired = and_(models.Job.status == "running", models.Job.locked_at < now - timedelta(seconds=LEASE_SECONDS))
+    db.execute(
+        update(models.Job).where(expired, models.Job.attempts >= models.Job.max_attempts).values(
+            status="failed",
+            error="Worker stopped during the last attempt",
+            locked_by=None,
+            locked_at=None,
+        ).execution_options(synchronize_session=False)
+    )
+    runnable = or_(
+        and_(models.Job.status == "queued", models.Job.run_after <= now),
+        and_(expired, models.Job.attempts < models.Job.max_attempts),
+    )
+    job_id = db.scalar(
+        select(models.Job.id).where(runnable).order_by(models.Job.run_after, models.Job.id)
+        .limit(1).with_for_update(skip_locked=True)
+    )
+    if job_id is None:
+        db.commit()
+        return None
+
+    claimed = db.execute(
+        update(models.Job).where(models.Job.id == job_id, runnable).values(
+            status="running",
+            locked_by=worker_id,
+            locked_at=now,
+            attempts=models.Job.attempts + 1,
+        ).execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    if not claimed:
+        # Another worker got there first
+        return None
+    return db.get(models.Job, job_id, populate_existing=True)
+
+
+def set_progress(db: Session, job: models.Job, progress: float) -> None:
+    """
+    Record progress and renew the lease; committed with the handler's work.
+    """
+    job.progress = round(min(max(progress, 0.0), 1.0), 4)
+    job.locked_at = utcnow()
+
+
+def run(db: Session, job: models.Job) -> None:
+    """
+    Run a claimed job and record its outcome, scheduling a retry on failure.
+    """
+    fn = HANDLERS.get(job.kind)
+    try:
+        if fn is None:
+            raise LookupError(f"No handler registered for job kind '{job.kind}'")
+        result = fn(db, job)
+    except Exception as exc:
+        db.rollback()
+        logger.exception("Job %s (%s) failed on attempt %s", job.id, job.kind, job.attempts)
+        job = db.get(models.Job, job.id, populate_existing=True)
+        job.error = f"{type(exc).__name__}: {exc}"
+        job.locked_by = None
+        job.locked_at = None
+        if job.attempts < job.max_attempts:
+            job.status = "queued"
+            job.run_after = utcnow() + backoff(job.attempts)
+        else:
+            job.status = "failed"
+        db.commit()
+        return
+
+    job.status = "succeeded"
+    job.progress = 1.0
+    job.result = result
+    job.error = None
+    job.locked_by = None
+    job.locked_at = None
+    db.commit()
+
+
+def run_next(db: Session, worker_id: str) -> bool:
+    """
+    Claim and run one job. Returns False when the queue had nothing runnable.
+    """
+    job = claim(db, worker_id)
+    if job is None:
+        return False
+    run(db, job)
+    return True
@@ -0,0 +1,174 @@
+"""
+Declarative PG layouts: diff a desired room/bed structure against the
+database and apply only the differences with bulk statements.
+
+Rooms are matched by room_number and beds by (room_number, bed_number).
+Beds that are occupied or have an active tenant are never removed; a layout
+that would remove one is refused as a whole.
+"""
+from typing import Dict, List, Tuple
+
+from sqlalchemy import bindparam, delete, insert, select, update
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+
+MAX_LAYOUT_BEDS = 5000
+
+
+class LayoutError(ValueError):
+    pass
+
+
+class LayoutConflict(LayoutError):
+    pass
+
+
+def expand(layout: schemas.PGLayout) -> List[schemas.LayoutRoom]:
+    """
+    The layout's rooms, generating them from the spec if one was given.
+    """
+    if layout.rooms is not None:
+        return layout.rooms
+    spec = layout.generate
+    if spec.floor_to < spec.floor_from:
+        raise LayoutError("'floor_to' must not be below 'floor_from'")
+    if len(set(spec.bed_labels)) != len(spec.bed_labels):
+        raise LayoutError("Bed labels must be unique")
+    if (spec.floor_to - spec.floor_from + 1) * spec.rooms_per_floor * len(spec.bed_labels) > MAX_LAYOUT_BEDS:
+        raise LayoutError(f"A layout can have at most {MAX_LAYOUT_BEDS} beds")
+
+    rooms = []
+    for floor in range(spec.floor_from, spec.floor_to + 1):
+        for number in range(1, spec.rooms_per_floor + 1):
+            room_number = f"{floor}{number:02d}"
+            rooms.append(schemas.LayoutRoom(
+                room_number=room_number,
+                floor=floor,
+                type=spec.type,
+                beds=[
+                    schemas.LayoutBed(bed_number=f"{room_number}-{label}", monthly_price=spec.monthly_price)
+                    for label in spec.bed_labels
+                ],
+            ))
+    return rooms
+
+
+def sync_layout(
+    db: Session, pg_id: int, rooms: List[schemas.LayoutRoom], dry_run: bool = False
+) -> schemas.LayoutChanges:
+    """
+    Make the PG's rooms and beds match `rooms`. Nothing is committed.
+    """
+    desired: Dict[str, schemas.LayoutRoom] = {}
+    for room in rooms:
+        if room.room_number in desired:
+            raise LayoutError(f"Room {room.room_number} is listed twice")
+        if len({bed.bed_number for bed in room.beds}) != len(room.beds):
+            raise LayoutError(f"Room {room.room_number} lists a bed twice")
+        desired[room.room_number] = room
+    if sum(len(room.beds) for room in rooms) > MAX_LAYOUT_BEDS:
+        raise LayoutError(f"A layout can have at most {MAX_LAYOUT_BEDS} beds")
+
+    current_rooms = {
+        row.room_number: row
+        for row in db.execute(
+            select(models.Room.id, models.Room.room_number, models.Room.floor, models.Room.type)
+            .where(models.Room.pg_id == pg_id)
+        )
+    }
+    current_beds: Dict[Tuple[str, str], object] = {
+        (row.room_number, row.bed_number): row
+        for row in db.execute(
+            select(models.Room.room_number, models.Bed.id, models.Bed.bed_number, models.Bed.monthly_price,
+                   models.Bed.is_occupied)
+            .join(models.Room, models.Room.id == models.Bed.room_id)
+            .where(models.Room.pg_id == pg_id)
+        )
+    }
+    active_beds = set(db.scalars(
+        select(models.Tenant.bed_id).where(models.Tenant.pg_id == pg_id, models.Tenant.status == "active")
+    ))
+
+    room_updates = [
+        {"b_id": current.id, "b_floor": room.floor, "b_type": room.type}
+        for number, room in desired.items()
+        if (current := current_rooms.get(number)) and (current.floor, current.type) != (room.floor, room.type)
+    ]
+    new_rooms = [room for number, room in desired.items() if number not in current_rooms]
+    old_rooms = [current.id for number, current in current_rooms.items() if number not in desired]
+
+    wanted_beds = {
+        (room.room_number, bed.bed_number): bed for room in desired.values() for bed in room.beds
+    }
+    bed_updates = [
+        {"b_id": current.id, "b_price": wanted_beds[key].monthly_price}
+        for key, current in current_beds.items()
+        if key in wanted_beds and current.monthly_price != wanted_beds[key].monthly_price
+    ]
+    new_beds = [key for key in wanted_beds if key not in current_beds]
+    old_beds = [(key, current) for key, current in current_beds.items() if key not in wanted_beds]
+
+    refused = [
+        f"Bed {bed_number} in room {room_number}"
+        for (room_number, bed_number), current in old_beds
+        if current.is_occupied or current.id in active_beds
+    ]
+    if refused:
+        raise LayoutConflict("Cannot remove occupied beds: " + ", ".join(refused))
+
+    changes = schemas.LayoutChanges(
+        dry_run=dry_run,
+        rooms_created=len(new_rooms),
+        rooms_updated=len(room_updates),
+        rooms_deleted=len(old_rooms),
+        beds_created=len(new_beds),
+        beds_updated=len(bed_updates),
+        beds_deleted=len(old_beds),
+    )
+    if dry_run:
+        return changes
+
+    rooms_table = models.Room.__table__
+    beds_table = models.Bed.__table__
+    room_ids = {number: current.id for number, current in current_rooms.items()}
+    if new_rooms:
+        ids = db.scalars(
+            insert(models.Room).returning(models.Room.id, sort_by_parameter_order=True),
+            [{"pg_id": pg_id, "room_number": r.room_number, "floor": r.floor, "type": r.type} for r in new_rooms],
+        ).all()
+        room_ids.update(zip((r.room_number for r in new_rooms), ids))
+    if room_updates:
+        db.execute(
+            update(rooms_table).where(rooms_table.c.id == bindparam("b_id"))
+            .values(floor=bindparam("b_floor"), type=bindparam("b_type")),
+            room_updates,
+        )
+    if new_beds:
+        db.execute(insert(models.Bed), [
+            {
+                "room_id": room_ids[room_number],
+                "bed_number": bed_number,
+                "monthly_price": wanted_beds[(room_number, bed_number)].monthly_price,
+                "is_occupied": False,
+            }
+            for room_number, bed_number in new_beds
+        ])
+    if bed_updates:
+        db.execute(
+            update(beds_table).where(beds_table.c.id == bindparam("b_id")).values(monthly_price=bindparam("b_price")),
+            bed_updates,
+        )
+    if old_beds:
+        bed_ids = [current.id for _, current in old_beds]
+        # Checked-out tenants lose the bed reference, as when a bed is deleted on its own
+        db.execute(
+            update(models.Tenant).where(models.Tenant.bed_id.in_(bed_ids)).values(bed_id=None)
+            .execution_options(synchronize_session=False)
+        )
+        db.execute(delete(models.Bed).where(models.Bed.id.in_(bed_ids)).execution_options(synchronize_session=False))
+    if old_rooms:
+        db.execute(
+            delete(models.Room).where(models.Room.id.in_(old_rooms)).execution_options(synchronize_session=False)
+        )
+    return changes
@@ -0,0 +1,168 @@
+from datetime import date
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import case, func, or_
+from sqlalchemy.orm import Session
+
+from app import models
+from app.db.upsert import insert_for
+
+
+def settle_status(amount_paid: float, amount_due: float) -> str:
+    if amount_paid >= amount_due:
+        return "paid"
+    return "partial" if amount_paid > 0 else "pending"
+
+
+def add_payment(
+    db: Session,
+    tenant_id: int,
+    pg_id: int,
+    amount: float,
+    payment_date: date,
+    mode: str = "cash",
+    rent_record_id: Optional[int] = None,
+) -> models.Payment:
+    """
+    Append a payment to the ledger. Callers apply it to rent records themselves.
+    """
+    payment = models.Payment(
+        tenant_id=tenant_id,
+        pg_id=pg_id,
+        rent_record_id=rent_record_id,
+        amount=amount,
+        payment_date=payment_date,
+        mode=mode,
+    )
+    db.add(payment)
+    return payment
+
+
+def allocate_fifo(
+    db: Session, tenant_id: int, amount: float, payment_date: date
+) -> Tuple[List[models.RentRecord], float]:
+    """
+    Apply an amount to the tenant's outstanding months, oldest first.
+    Returns the rent records that changed and the unallocated remainder.
+    """
+    outstanding = db.query(models.RentRecord).filter(
+        models.RentRecord.tenant_id == tenant_id,
+        models.RentRecord.status != "paid",
+        or_(
+            models.RentRecord.amount_paid.is_(None),
+            models.RentRecord.amount_paid < models.RentRecord.amount_due,
+        ),
+    ).order_by(models.RentRecord.month).with_for_update().all()
+
+    touched = []
+    remaining = amount
+    for rent in outstanding:
+        if remaining <= 0:
+            break
+        paid = rent.amount_paid or 0.0
+        applied = min(remaining, rent.amount_due - paid)
+        rent.amount_paid = round(paid + applied, 2)
+        rent.status = settle_status(rent.amount_paid, rent.amount_due)
+        rent.payment_date = payment_date
+        remaining = round(remaining - applied, 2)
+        touched.append(rent)
+
+    return touched, remaining
+
+
+def add_credit(db: Session, tenant_id: int, amount: float) -> None:
+    """
+    Add an unallocated advance to the tenant's balance snapshot.
+    """
+    balances = models.TenantBalance.__table__
+    insert = insert_for(db.get_bind())
+    stmt = insert(balances).values(
+        tenant_id=tenant_id, total_due=0.0, total_paid=0.0, credit=amount, balance=-amount
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[balances.c.tenant_id],
+        set_={
+            "credit": balances.c.credit + amount,
+            "balance": balances.c.balance - amount,
+        },
+    )
+    db.execute(stmt)
+
+
+def apply_credit(db: Session, tenant_ids: Iterable[int], payment_date: date) -> None:
+    """
+    Spend any advance the given tenants hold on their outstanding months.
+    """
+    tenant_ids = list(tenant_ids)
+    if not tenant_ids:
+        return
+    holders = db.query(models.TenantBalance).filter(
+        models.TenantBalance.tenant_id.in_(tenant_ids),
+        models.TenantBalance.credit > 0,
+    ).all()
+    for holder in holders:
+        _, remaining = allocate_fifo(db, holder.tenant_id, holder.credit, payment_date)
+        holder.credit = remaining
+
+
+def refresh_balances(db: Session, tenant_ids: Iterable[int]) -> None:
+    """
+    Recompute the cached totals of the given tenants in one grouped query and
+    upsert their snapshots. Pending changes must be flushed first.
+    """
+    tenant_ids = list(set(tenant_ids))
+    if not tenant_ids:
+        return
+
+    amount_paid = func.coalesce(models.RentRecord.amount_paid, 0.0)
+    # Legacy records were marked paid without setting amount_paid
+    effective_paid = case(
+        ((models.RentRecord.status == "paid") & (amount_paid <= 0), models.RentRecord.amount_due),
+        else_=amount_paid,
+    )
+    totals = {
+        row.tenant_id: (row.total_due or 0.0, row.total_paid or 0.0)
+        for row in db.query(
+            models.RentRecord.tenant_id,
+            func.sum(models.RentRecord.amount_due).label("total_due"),
+            func.sum(effective_paid).label("total_paid"),
+        ).filter(
+            models.RentRecord.tenant_id.in_(tenant_ids)
+        ).group_by(models.RentRecord.tenant_id)
+    }
+
+    balances = models.TenantBalance.__table__
+    insert = insert_for(db.get_bind())
+    stmt = insert(balances)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[balances.c.tenant_id],
+        set_={
+            "total_due": stmt.excluded.total_due,
+            "total_paid": stmt.excluded.total_paid,
+            "balance": stmt.excluded.total_due - stmt.excluded.total_paid - balances.c.credit,
+            "updated_at": func.now(),
+        },
+    )
+    rows = []
+    for tenant_id in tenant_ids:
+        total_due, total_paid = totals.get(tenant_id, (0.0, 0.0))
+        rows.append({
+            "tenant_id": tenant_id,
+            "total_due": round(total_due, 2),
+            "total_paid": round(total_paid, 2),
+            "credit": 0.0,
+            "balance": round(total_due - total_paid, 2),
+        })
+    db.execute(stmt, rows)
+
+
+def settle_new_rents(db: Session, tenant_ids: Iterable[int], as_of: date) -> None:
+    """
+    After new rent records were added: spend the tenants' advance credit on
+    them and refresh their balance snapshots.
+    """
+    tenant_ids = list(tenant_ids)
+    db.flush()
+    apply_credit(db, tenant_ids, as_of)
+    db.flush()
+    refresh_balances(db, tenant_ids)
@@ -0,0 +1,154 @@
+"""
+Prometheus metrics, served at /metrics.
+
+Under gunicorn every worker is its own process, so prometheus_client runs in
+multiprocess mode: gunicorn.conf.py points PROMETHEUS_MULTIPROC_DIR at an
+empty directory before the workers start, each worker writes its values
+there and a scrape of any worker aggregates all of them. Without that
+variable (tests, `uvicorn --reload`) the default in-process registry is used.
+
+Values that only exist inside one worker (pool usage, AnyIO threadpool
+usage) are pushed into gauges when they change rather than read at scrape
+time, so the scraped worker can report them for every worker.
+
+Scrapes authenticate with `Authorization: Bearer <METRICS_TOKEN>`; without a
+token configured the endpoint is off and answers 404.
+"""
+import hmac
+import os
+import time
+
+from anyio import to_thread
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess,
+)
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.core.config import settings
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+REQUESTS = Counter("http_requests_total", "HTTP requests by route and status", ["method", "route", "status"])
+LATENCY = Histogram(
+    "http_request_duration_seconds", "Time to serve HTTP requests", ["method", "route"], buckets=LATENCY_BUCKETS
+)
+# The route is only known once the router has matched, so this one is per method
+IN_PROGRESS = Gauge("http_requests_in_progress", "HTTP requests being served", ["method"], multiprocess_mode="livesum")
+
+POOL_CHECKED_OUT = Gauge("db_pool_checked_out", "Connections checked out of the pool", multiprocess_mode="livesum")
+POOL_OVERFLOW = Gauge("db_pool_overflow", "Connections open beyond pool_size", multiprocess_mode="livesum")
+POOL_WAIT = Histogram(
+    "db_pool_wait_seconds", "Time spent waiting for a pooled connection", buckets=LATENCY_BUCKETS
+)
+
+THREADPOOL_BUSY = Gauge(
+    "anyio_threadpool_busy", "Worker threads running sync endpoints and dependencies", multiprocess_mode="livesum"
+)
+THREADPOOL_SIZE = Gauge("anyio_threadpool_size", "AnyIO worker thread limit", multiprocess_mode="livesum")
+THREADPOOL_WAITING = Gauge(
+    "anyio_threadpool_waiting", "Tasks waiting for a free worker thread", multiprocess_mode="livesum"
+)
+
+BCRYPT_IN_PROGRESS = Gauge(
+    "bcrypt_operations_in_progress", "Password hashes being computed or checked", multiprocess_mode="livesum"
+)
+BCRYPT_DURATION = Histogram(
+    "bcrypt_duration_seconds", "Time to hash or check a password", buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+
+
+def multiprocess_dir():
+    return os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+
+
+class TimedQueuePool(QueuePool):
+    """
+    QueuePool that records how long each checkout waited for a connection.
+    """
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            POOL_WAIT.observe(time.perf_counter() - start)
+
+
+def instrument_engine(engine) -> None:
+    """
+    Keep the pool gauges in step with the engine's pool.
+    """
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return
+
+    def update(*args):
+        POOL_CHECKED_OUT.set(pool.checkedout())
+        POOL_OVERFLOW.set(max(pool.overflow(), 0))
+
+    event.listen(pool, "checkout", update)
+    event.listen(pool, "checkin", update)
+
+
+def _sample_threadpool() -> None:
+    limiter = to_thread.current_default_thread_limiter()
+    THREADPOOL_BUSY.set(limiter.borrowed_tokens)
+    THREADPOOL_SIZE.set(limiter.total_tokens)
+    THREADPOOL_WAITING.set(limiter.statistics().tasks_waiting)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording latency, status and in-flight requests per
+    route template (not per URL, which would make a series per id).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+        start = time.perf_counter()
+        _sample_threadpool()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_progress = IN_PROGRESS.labels(method)
+        in_progress.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_progress.dec()
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            LATENCY.labels(method, path).observe(time.perf_counter() - start)
+            REQUESTS.labels(method, path, str(status)).inc()
+            _sample_threadpool()
+
+
+def metrics_endpoint(request: Request) -> Response:
+    """
+    All metrics in the Prometheus text format.
+    """
+    if not settings.METRICS_TOKEN:
+        return Response("Not Found", status_code=404)
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(token.encode(), settings.METRICS_TOKEN.encode()):
+        return Response("Unauthorized", status_code=401, headers={"WWW-Authenticate": "Bearer"})
+    registry = REGISTRY
+    if multiprocess_dir():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
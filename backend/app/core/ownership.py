@@ -0,0 +1,19 @@
+from sqlalchemy import select
+
+from app import models
+
+
+def owner_filter(model, owner_id: int):
+    """
+    WHERE clause limiting a PG-scoped table to one owner's rows.
+    """
+    owner_pgs = select(models.PG.id).where(models.PG.owner_id == owner_id)
+    if model is models.PG:
+        return models.PG.owner_id == owner_id
+    if model is models.Room:
+        return models.Room.pg_id.in_(owner_pgs)
+    if model is models.Bed:
+        return models.Bed.room_id.in_(select(models.Room.id).where(models.Room.pg_id.in_(owner_pgs)))
+    if model is models.TenantBalance:
+        return models.TenantBalance.tenant_id.in_(select(models.Tenant.id).where(models.Tenant.pg_id.in_(owner_pgs)))
+    return model.pg_id.in_(owner_pgs)
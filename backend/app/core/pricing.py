@@ -0,0 +1,109 @@
+"""
+Bulk bed price revisions.
+
+A revision changes the price of every bed in a PG matching an optional room
+type and floor by a percentage or a fixed amount, in one UPDATE. Pending
+rent records from the effective month on are re-priced in one more UPDATE
+by scaling amount_due by new price / old price, which keeps check-in and
+check-out proration intact. Records that are partly or fully paid keep their
+amount.
+"""
+from typing import List
+
+from sqlalchemy import Numeric, cast, func, select, update
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.core import ledger
+
+
+class PriceRevisionError(ValueError):
+    pass
+
+
+def _money(expr):
+    # round(double precision, int) does not exist on Postgres
+    return func.round(cast(expr, Numeric), 2)
+
+
+def _new_price(revision: schemas.PriceRevision, price):
+    if revision.percent is not None:
+        return _money(price * (1 + revision.percent / 100.0))
+    return _money(price + revision.amount)
+
+
+def revise_prices(
+    db: Session, pg_id: int, revision: schemas.PriceRevision, dry_run: bool = False
+) -> schemas.PriceRevisionResult:
+    """
+    Preview or apply a revision. Nothing is committed.
+    """
+    bed_ids = (
+        select(models.Bed.id)
+        .join(models.Room, models.Room.id == models.Bed.room_id)
+        .where(models.Room.pg_id == pg_id)
+    )
+    if revision.room_type is not None:
+        bed_ids = bed_ids.where(models.Room.type == revision.room_type)
+    if revision.floor is not None:
+        bed_ids = bed_ids.where(models.Room.floor == revision.floor)
+
+    beds = db.execute(
+        select(
+            func.count(),
+            func.coalesce(func.sum(models.Bed.monthly_price), 0.0),
+            func.coalesce(func.sum(_new_price(revision, models.Bed.monthly_price)), 0.0),
+            func.min(_new_price(revision, models.Bed.monthly_price)),
+        ).where(models.Bed.id.in_(bed_ids))
+    ).one()
+    if beds[3] is not None and beds[3] < 0:
+        raise PriceRevisionError("The revision would make a bed price negative")
+
+    # Price of the tenant's bed, read before the beds are updated
+    bed_price = (
+        select(models.Bed.monthly_price)
+        .join(models.Tenant, models.Tenant.bed_id == models.Bed.id)
+        .where(models.Tenant.id == models.RentRecord.tenant_id)
+        .scalar_subquery()
+    )
+    repriced = [
+        models.RentRecord.pg_id == pg_id,
+        models.RentRecord.status == "pending",
+        models.RentRecord.month >= revision.effective_month.replace(day=1),
+        models.RentRecord.tenant_id.in_(select(models.Tenant.id).where(models.Tenant.bed_id.in_(bed_ids))),
+        bed_price > 0,
+    ]
+    new_due = _money(models.RentRecord.amount_due * _new_price(revision, bed_price) / bed_price)
+
+    rents = db.execute(
+        select(
+            func.count(),
+            func.coalesce(func.sum(models.RentRecord.amount_due), 0.0),
+            func.coalesce(func.sum(new_due), 0.0),
+        ).where(*repriced)
+    ).one()
+
+    result = schemas.PriceRevisionResult(
+        dry_run=dry_run,
+        beds=beds[0],
+        current_monthly_total=round(float(beds[1]), 2),
+        new_monthly_total=round(float(beds[2]), 2),
+        rent_records=rents[0],
+        current_rent_due=round(float(rents[1]), 2),
+        new_rent_due=round(float(rents[2]), 2),
+    )
+    if dry_run:
+        return result
+
+    tenant_ids: List[int] = list(db.scalars(select(models.RentRecord.tenant_id).where(*repriced).distinct()))
+    db.execute(
+        update(models.RentRecord).where(*repriced).values(amount_due=new_due)
+        .execution_options(synchronize_session=False)
+    )
+    db.execute(
+        update(models.Bed).where(models.Bed.id.in_(bed_ids))
+        .values(monthly_price=_new_price(revision, models.Bed.monthly_price))
+        .execution_options(synchronize_session=False)
+    )
+    ledger.refresh_balances(db, tenant_ids)
+    return result
@@ -0,0 +1,194 @@
+"""
+Opt-in per-request profiling.
+
+A request carrying `X-Profile: 1` and `X-Profile-Token: <PROFILER_TOKEN>` is
+served under a sampling profiler and answered with an `X-Profile-Id` header.
+The profile is saved to PROFILE_DIR as folded stacks (one
+`thread;frame;...;frame count` line per distinct stack, the input format of
+flamegraph.pl and speedscope) next to a small JSON summary, and the newest
+PROFILE_KEEP profiles are kept.
+
+Sync endpoints run in AnyIO worker threads, which cProfile (one thread per
+profiler) would miss, so the profiler samples the stacks of every thread and
+keeps the samples that are inside this application's code. Other requests
+the worker serves at the same time show up in the profile too.
+"""
+import hmac
+import json
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from anyio import to_thread
+
+from app.core.config import settings
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAX_DEPTH = 200
+
+
+def _frame_label(code) -> str:
+    filename = code.co_filename
+    if filename.startswith(APP_DIR):
+        filename = "app" + filename[len(APP_DIR):]
+    else:
+        filename = os.path.basename(filename)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """
+    Samples the stacks of all other threads every `interval` seconds.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            self.samples += 1
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack: List[str] = []
+                in_app = False
+                while frame is not None and len(stack) < MAX_DEPTH:
+                    in_app = in_app or frame.f_code.co_filename.startswith(APP_DIR)
+                    stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                # Idle threads (the event loop in select, workers waiting for work) are not interesting
+                if not in_app:
+                    continue
+                if thread_id not in names:
+                    names = {thread.ident: thread.name for thread in threading.enumerate()}
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.stacks[tuple(reversed(stack))] += 1
+
+    def folded(self) -> str:
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def requested(headers: Dict[bytes, bytes]) -> bool:
+    """
+    Whether the request asked for a profile with the right token.
+    """
+    if not settings.PROFILER_TOKEN or headers.get(b"x-profile") != b"1":
+        return False
+    return token_ok(headers.get(b"x-profile-token", b"").decode("latin-1"))
+
+
+def token_ok(token: Optional[str]) -> bool:
+    return bool(settings.PROFILER_TOKEN) and hmac.compare_digest((token or "").encode(), settings.PROFILER_TOKEN.encode())
+
+
+def _path(profile_id: str, suffix: str) -> str:
+    return os.path.join(settings.PROFILE_DIR, profile_id + suffix)
+
+
+def save(profile_id: str, profiler: SamplingProfiler, summary: dict) -> None:
+    os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+    with open(_path(profile_id, ".folded"), "w") as f:
+        f.write(profiler.folded())
+    with open(_path(profile_id, ".json"), "w") as f:
+        json.dump(summary, f)
+    _prune()
+
+
+def _prune() -> None:
+    for summary in list_profiles()[settings.PROFILE_KEEP:]:
+        for suffix in (".folded", ".json"):
+            try:
+                os.remove(_path(summary["id"], suffix))
+            except FileNotFoundError:
+                pass
+
+
+def list_profiles() -> List[dict]:
+    """
+    Summaries of the saved profiles, newest first.
+    """
+    if not os.path.isdir(settings.PROFILE_DIR):
+        return []
+    summaries = []
+    for name in os.listdir(settings.PROFILE_DIR):
+        if not name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(settings.PROFILE_DIR, name)) as f:
+                summaries.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return sorted(summaries, key=lambda summary: summary["created_at"], reverse=True)
+
+
+def folded_path(profile_id: str) -> Optional[str]:
+    """
+    Path of a saved profile's folded stacks, or None if there is no such profile.
+    """
+    if not re.fullmatch(r"[0-9a-f]{32}", profile_id):
+        return None
+    path = _path(profile_id, ".folded")
+    return path if os.path.exists(path) else None
+
+
+class ProfileMiddleware:
+    """
+    Profile the requests that ask for it.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not requested(dict(scope["headers"])):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = [*message.get("headers", []), (b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        profiler = SamplingProfiler(settings.PROFILE_INTERVAL_MS / 1000.0)
+        created_at = datetime.now(timezone.utc).isoformat()
+        start = time.perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.stop()
+            await to_thread.run_sync(save, profile_id, profiler, {
+                "id": profile_id,
+                "created_at": created_at,
+                "method": scope["method"],
+                "path": scope["path"],
+                "route": getattr(scope.get("route"), "path", None),
+                "status": status,
+                "duration_ms": round((time.perf_counter() - start) * 1000, 1),
+                "samples": profiler.samples,
+                "pid": os.getpid(),
+            })
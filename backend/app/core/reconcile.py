@@ -0,0 +1,317 @@
+"""
+Bank/UPI statement reconciliation.
+
+Credits from a statement are matched to open rent records without comparing
+every line with every record. The owner's open records are indexed once:
+by outstanding amount (in paise) and by tenant, each list sorted by month so
+the records inside a line's date window are found with bisect, and tenants
+by phone number, name key and pair of name keys. A line's candidates are the
+records reached through those indexes; each is scored on the amount, phone
+and name evidence and the best pairs are assigned greedily, one credit per
+record.
+"""
+import re
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from itertools import chain, combinations
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy import bindparam, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.core import ledger
+from app.core.tenant_import import ImportFileError
+
+MAX_LINES = 50000
+# A rent month can be paid from EARLY_DAYS before it starts to LATE_DAYS after
+EARLY_DAYS = 10
+LATE_DAYS = 60
+# An amount or name key shared by more candidates than this is too common to
+# bring in candidates by itself; it still counts towards their scores
+COMMON = 25
+CANDIDATES_PER_LINE = 5
+
+AMOUNT_UNIQUE = 0.5  # Amount equals the outstanding of exactly one tenant in the window
+AMOUNT_SHARED = 0.3  # Amount equals the outstanding of several tenants
+AMOUNT_PARTIAL = 0.1  # Amount is less than the outstanding
+PHONE = 0.3
+NAME = 0.2  # Scaled by the share of the tenant's name keys found
+MIN_SCORE = 0.3
+
+DATE_COLUMNS = ("date", "txn_date", "transaction_date", "value_date", "posting_date", "tran_date")
+DESCRIPTION_COLUMNS = ("description", "narration", "remarks", "particulars", "details", "transaction_details")
+CREDIT_COLUMNS = ("credit", "credit_amount", "deposit", "deposits", "deposit_amount", "cr_amount")
+TYPE_COLUMNS = ("type", "cr/dr", "dr/cr", "transaction_type", "txn_type")
+DATE_FORMATS = ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%d/%m/%y", "%d-%m-%y", "%d-%b-%Y", "%d %b %Y", "%d-%b-%y")
+
+_PHONE = re.compile(r"(?<!\d)(?:\+?91)?(\d{10})(?!\d)")
+_WORD = re.compile(r"[a-z]+")
+
+
+def _first(row: Dict[str, Any], columns) -> Any:
+    return next((row[column] for column in columns if column in row), None)
+
+
+def _parse_date(value: Any) -> Optional[date]:
+    if isinstance(value, date):
+        return value
+    text = str(value).strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def _parse_amount(value: Any) -> Optional[float]:
+    text = str(value).replace(",", "").replace("₹", "").replace("INR", "").strip()
+    sign = 1
+    if text[-2:].upper() in ("CR", "DR"):
+        sign = -1 if text[-2:].upper() == "DR" else 1
+        text = text[:-2].strip()
+    try:
+        return sign * float(text)
+    except ValueError:
+        return None
+
+
+def _paise(amount: float) -> int:
+    return int(round(amount * 100))
+
+
+def phone_key(text: str) -> Optional[str]:
+    digits = re.sub(r"\D", "", text or "")
+    return digits[-10:] if len(digits) >= 10 else None
+
+
+def name_keys(text: str) -> Set[str]:
+    # Prefixes survive the truncation and spelling drift of UPI payer names
+    return {word[:5] for word in _WORD.findall((text or "").lower()) if len(word) >= 3}
+
+
+def read_statement(rows: Iterator[Tuple[int, Dict[str, Any]]]) -> Tuple[int, List[schemas.ReconcileMatch]]:
+    """
+    The credits of a statement, from (line, row keyed by normalised header) as
+    given by tenant_import.read_rows, and the number of lines read. Debits and
+    rows without a date or amount are skipped.
+    """
+    credits = []
+    lines = 0
+    dated = False
+    for line, row in rows:
+        lines += 1
+        if lines > MAX_LINES:
+            raise ImportFileError(f"Reconcile at most {MAX_LINES} statement lines per file")
+        if _first(row, DATE_COLUMNS) is not None:
+            dated = True
+
+        raw = _first(row, CREDIT_COLUMNS)
+        if raw is None:
+            raw = row.get("amount")
+            if raw is None:
+                continue
+            kind = str(_first(row, TYPE_COLUMNS) or "").strip().lower()
+            if kind.startswith("d"):
+                continue
+        amount = _parse_amount(raw)
+        payment_date = _parse_date(_first(row, DATE_COLUMNS) or "")
+        if not amount or amount <= 0 or payment_date is None:
+            continue
+        credits.append(schemas.ReconcileMatch(
+            line=line,
+            payment_date=payment_date,
+            amount=round(amount, 2),
+            description=str(_first(row, DESCRIPTION_COLUMNS) or ""),
+        ))
+    if lines and not dated:
+        raise ImportFileError("The statement needs a date column: " + ", ".join(DATE_COLUMNS))
+    return lines, credits
+
+
+class OpenRents:
+    """
+    Index of an owner's open rent records.
+    """
+
+    def __init__(self, db: Session, owner_id: int, pg_id: Optional[int] = None):
+        outstanding = models.RentRecord.amount_due - func.coalesce(models.RentRecord.amount_paid, 0.0)
+        stmt = (
+            select(
+                models.RentRecord.id,
+                models.RentRecord.tenant_id,
+                models.RentRecord.pg_id,
+                models.RentRecord.month,
+                models.RentRecord.amount_due,
+                func.coalesce(models.RentRecord.amount_paid, 0.0).label("amount_paid"),
+                models.Tenant.name,
+                models.Tenant.phone,
+            )
+            .join(models.Tenant, models.Tenant.id == models.RentRecord.tenant_id)
+            .join(models.PG, models.PG.id == models.RentRecord.pg_id)
+            .where(models.PG.owner_id == owner_id, models.RentRecord.status != "paid", outstanding > 0)
+            .order_by(models.RentRecord.month, models.RentRecord.id)
+        )
+        if pg_id is not None:
+            stmt = stmt.where(models.RentRecord.pg_id == pg_id)
+
+        self.by_amount: Dict[int, Tuple[List[date], List[Any]]] = defaultdict(lambda: ([], []))
+        self.by_tenant: Dict[int, Tuple[List[date], List[Any]]] = defaultdict(lambda: ([], []))
+        self.by_phone: Dict[str, Set[int]] = defaultdict(set)
+        self.by_name: Dict[str, Set[int]] = defaultdict(set)
+        self.by_name_pair: Dict[Tuple[str, str], Set[int]] = defaultdict(set)
+        self.names: Dict[int, Set[str]] = {}
+        self.phones: Dict[int, Optional[str]] = {}
+        for row in db.execute(stmt):
+            for months, rents in (self.by_amount[_paise(row.amount_due - row.amount_paid)], self.by_tenant[row.tenant_id]):
+                months.append(row.month)
+                rents.append(row)
+            if row.tenant_id not in self.names:
+                self.names[row.tenant_id] = name_keys(row.name)
+                self.phones[row.tenant_id] = phone_key(row.phone)
+                for key in self.names[row.tenant_id]:
+                    self.by_name[key].add(row.tenant_id)
+                for pair in combinations(sorted(self.names[row.tenant_id]), 2):
+                    self.by_name_pair[pair].add(row.tenant_id)
+                if self.phones[row.tenant_id]:
+                    self.by_phone[self.phones[row.tenant_id]].add(row.tenant_id)
+
+    @staticmethod
+    def _window(index: Tuple[List[date], List[Any]], payment_date: date) -> List[Any]:
+        months, rents = index
+        lo = bisect_left(months, payment_date - timedelta(days=LATE_DAYS))
+        hi = bisect_right(months, payment_date + timedelta(days=EARLY_DAYS))
+        return rents[lo:hi]
+
+    def candidates(self, credit: schemas.ReconcileMatch) -> List[Tuple[float, Any]]:
+        """
+        Scored open records the credit could pay, best first.
+        """
+        paise = _paise(credit.amount)
+        same_amount = self._window(self.by_amount[paise], credit.payment_date) if paise in self.by_amount else []
+        if len(same_amount) > COMMON:
+            amount_score = AMOUNT_SHARED
+            same_amount = []
+        else:
+            amount_score = AMOUNT_UNIQUE if len({rent.tenant_id for rent in same_amount}) == 1 else AMOUNT_SHARED
+
+        phones = {match.group(1) for match in _PHONE.finditer(credit.description)}
+        keys = name_keys(credit.description)
+        tenant_ids: Set[int] = set()
+        for phone in phones:
+            tenant_ids |= self.by_phone.get(phone, set())
+        for key in chain(keys, combinations(sorted(keys), 2)):
+            holders = self.by_name_pair.get(key) if isinstance(key, tuple) else self.by_name.get(key)
+            if holders and len(holders) <= COMMON:
+                tenant_ids |= holders
+
+        rents = {rent.id: rent for rent in same_amount}
+        for tenant_id in tenant_ids:
+            for rent in self._window(self.by_tenant[tenant_id], credit.payment_date):
+                rents[rent.id] = rent
+
+        scored = []
+        for rent in rents.values():
+            outstanding = _paise(rent.amount_due - rent.amount_paid)
+            score = amount_score if paise == outstanding else AMOUNT_PARTIAL if paise < outstanding else 0.0
+            if self.phones[rent.tenant_id] in phones:
+                score += PHONE
+            tenant_keys = self.names[rent.tenant_id]
+            if tenant_keys:
+                score += NAME * len(tenant_keys & keys) / len(tenant_keys)
+            if score >= MIN_SCORE:
+                scored.append((round(min(score, 1.0), 2), rent))
+        scored.sort(key=lambda pair: (-pair[0], pair[1].month, pair[1].id))
+        return scored[:CANDIDATES_PER_LINE]
+
+
+def reconcile(
+    db: Session,
+    owner_id: int,
+    rows: Iterator[Tuple[int, Dict[str, Any]]],
+    pg_id: Optional[int] = None,
+    auto_apply: bool = False,
+    min_confidence: float = 0.7,
+) -> schemas.ReconcileResult:
+    """
+    Match a statement's credits to the owner's open rent records and, with
+    auto_apply, record the matches at or above min_confidence as UPI payments.
+    Nothing is committed.
+    """
+    lines, credits = read_statement(rows)
+    index = OpenRents(db, owner_id, pg_id)
+
+    pairs = [
+        (score, credit_no, rent)
+        for credit_no, credit in enumerate(credits)
+        for score, rent in index.candidates(credit)
+    ]
+    pairs.sort(key=lambda pair: (-pair[0], pair[2].month, pair[1]))
+    taken_rents: Set[int] = set()
+    matched: Dict[int, Tuple[float, Any]] = {}
+    for score, credit_no, rent in pairs:
+        if credit_no in matched or rent.id in taken_rents:
+            continue
+        matched[credit_no] = (score, rent)
+        taken_rents.add(rent.id)
+
+    result = schemas.ReconcileResult(lines=lines, credits=len(credits), matched=len(matched), applied=0)
+    to_apply = []
+    for credit_no, credit in enumerate(credits):
+        if credit_no not in matched:
+            result.unmatched.append(credit)
+            continue
+        score, rent = matched[credit_no]
+        credit.rent_id = rent.id
+        credit.tenant_id = rent.tenant_id
+        credit.tenant_name = rent.name
+        credit.month = rent.month
+        credit.confidence = score
+        credit.applied = auto_apply and score >= min_confidence
+        if credit.applied:
+            to_apply.append((credit, rent))
+        result.matches.append(credit)
+
+    if to_apply:
+        _apply(db, to_apply)
+        result.applied = len(to_apply)
+    return result
+
+
+def _apply(db: Session, matches: List[Tuple[schemas.ReconcileMatch, Any]]) -> None:
+    params = []
+    payments = []
+    for credit, rent in matches:
+        applied = min(credit.amount, round(rent.amount_due - rent.amount_paid, 2))
+        amount_paid = round(rent.amount_paid + applied, 2)
+        params.append({
+            "b_id": rent.id,
+            "b_status": ledger.settle_status(amount_paid, rent.amount_due),
+            "b_amount_paid": amount_paid,
+            "b_payment_date": credit.payment_date,
+        })
+        payments.append({
+            "tenant_id": rent.tenant_id,
+            "pg_id": rent.pg_id,
+            "rent_record_id": rent.id,
+            "amount": credit.amount,
+            "payment_date": credit.payment_date,
+            "mode": "upi",
+        })
+        if credit.amount > applied:
+            # Overpayment is kept as an advance, like a lump-sum payment's remainder
+            ledger.add_credit(db, rent.tenant_id, round(credit.amount - applied, 2))
+
+    rents = models.RentRecord.__table__
+    db.execute(
+        update(rents).where(rents.c.id == bindparam("b_id")).values(
+            status=bindparam("b_status"),
+            amount_paid=bindparam("b_amount_paid"),
+            payment_date=bindparam("b_payment_date"),
+        ),
+        params,
+    )
+    db.execute(insert(models.Payment), payments)
+    ledger.refresh_balances(db, [rent.tenant_id for _, rent in matches])
@@ -0,0 +1,133 @@
+import calendar
+from datetime import date
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import Date, and_, literal, or_, select, union_all
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core import billing
+from app.db.upsert import insert_for
+
+
+def calculate_prorated_rent(
+    check_in_date: date, monthly_rent: float, check_out_date: Optional[date] = None
+) -> float:
+    """
+    Calculate prorated rent for partial month based on check-in date.
+    Args:
+        check_in_date: The date tenant checks in
+        monthly_rent: The full monthly rent amount
+        check_out_date: The date tenant checks out, if in the same month
+    Returns:
+        Prorated rent amount for the remaining days in the month
+        (or the days up to and including check-out)
+    """
+    return float(billing.bill_pairs([check_in_date], [check_out_date], [monthly_rent], [check_in_date])[0])
+
+
+def month_end(month_start: date) -> date:
+    return date(month_start.year, month_start.month, calendar.monthrange(month_start.year, month_start.month)[1])
+
+
+def month_range(first: date, last: date) -> List[date]:
+    """
+    First-of-month dates from first's month through last's month, inclusive.
+    """
+    months = []
+    year, month = first.year, first.month
+    while (year, month) <= (last.year, last.month):
+        months.append(date(year, month, 1))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+def rent_for_month(
+    month_start: date, check_in: date, check_out: Optional[date], monthly_rent: float
+) -> float:
+    """
+    Rent due for one month of a stay, prorated in the check-in and check-out months.
+    """
+    return float(billing.bill_pairs([check_in], [check_out], [monthly_rent], [month_start])[0])
+
+
+def generate_rents(
+    db: Session, months: List[date], owner_ids: Iterable[int]
+) -> Tuple[int, int, List[int]]:
+    """
+    Create the missing rent records of the given owners' tenants for the months
+    of their stay among the given months, including tenants who have since
+    checked out. Missing (tenant, month) pairs are found with a single
+    set-based query and inserted with one executemany, skipping any inserted
+    meanwhile; nothing is committed.
+    Returns (created_count, skipped_count, ids of tenants that got records).
+    """
+    owner_ids = list(owner_ids)
+    if not months or not owner_ids:
+        return 0, 0, []
+
+    # Month series as an inline table: (month, month_end)
+    series = union_all(*[
+        select(literal(m, Date).label("month"), literal(month_end(m), Date).label("month_end"))
+        for m in months
+    ]).subquery("months")
+
+    rows = db.execute(
+        select(
+            models.Tenant.id,
+            models.Tenant.pg_id,
+            models.Tenant.check_in_date,
+            models.Tenant.check_out_date,
+            models.Bed.monthly_price,
+            series.c.month,
+            models.RentRecord.id.label("rent_id"),
+        )
+        .join(models.PG, models.PG.id == models.Tenant.pg_id)
+        .join(models.Bed, models.Bed.id == models.Tenant.bed_id)
+        .join(series, and_(
+            models.Tenant.check_in_date <= series.c.month_end,
+            or_(models.Tenant.check_out_date.is_(None), models.Tenant.check_out_date >= series.c.month),
+        ))
+        .outerjoin(models.RentRecord, and_(
+            models.RentRecord.tenant_id == models.Tenant.id,
+            models.RentRecord.month == series.c.month,
+        ))
+        .where(
+            models.PG.owner_id.in_(owner_ids),
+            # Checked-out tenants still owe the months up to their check-out (the join above)
+            or_(models.Tenant.status == "active", models.Tenant.check_out_date.isnot(None)),
+        )
+    ).all()
+
+    missing = [row for row in rows if row.rent_id is None]
+    skipped_count = len(rows) - len(missing)
+
+    amounts = billing.bill_pairs(
+        [row.check_in_date for row in missing],
+        [row.check_out_date for row in missing],
+        [row.monthly_price or 0.0 for row in missing],
+        [row.month for row in missing],
+    )
+    new_records = [
+        {
+            "tenant_id": row.id,
+            "pg_id": row.pg_id,
+            "month": row.month,
+            "amount_due": float(amount),
+            "amount_paid": 0.0,
+            "status": "pending",
+        }
+        for row, amount in zip(missing, amounts)
+    ]
+
+    # A concurrent run for the same owner may insert some of these first; skip those.
+    # The arbiter is uq_rent_records_tenant_month, which app.db.migrations adds to older databases
+    created = []
+    if new_records:
+        stmt = insert_for(db.get_bind())(models.RentRecord).on_conflict_do_nothing(
+            index_elements=["tenant_id", "month"]
+        ).returning(models.RentRecord.tenant_id)
+        created = db.scalars(stmt, new_records).all()
+
+    tenant_ids = sorted(set(created))
+    return len(created), skipped_count + len(new_records) - len(created), tenant_ids
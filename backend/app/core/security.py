@@ -2,14 +2,17 @@ from datetime import datetime, timedelta, timezone
 from typing import Any, Union
 
 import bcrypt
-from jose import jwt
 
 from app.core.config import settings
+from app.core.metrics import BCRYPT_DURATION, BCRYPT_IN_PROGRESS
 
 ALGORITHM = "HS256"
 
 
 def create_access_token(subject: Union[str, Any], expires_delta: timedelta = None) -> str:
+    # jose and its crypto backends are imported on first use rather than at worker start
+    from jose import jwt
+
     if expires_delta:
         expire = datetime.now(timezone.utc) + expires_delta
     else:
@@ -23,10 +26,12 @@ def create_access_token(subject: Union[str, Any], expires_delta: timedelta = Non
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     password_bytes = plain_password[:72].encode("utf-8")
     hashed_bytes = hashed_password.encode("utf-8")
-    return bcrypt.checkpw(password_bytes, hashed_bytes)
+    with BCRYPT_IN_PROGRESS.track_inprogress(), BCRYPT_DURATION.time():
+        return bcrypt.checkpw(password_bytes, hashed_bytes)
 
 
 def get_password_hash(password: str) -> str:
     password_bytes = password[:72].encode("utf-8")
     salt = bcrypt.gensalt()
-    return bcrypt.hashpw(password_bytes, salt).decode("utf-8")
+    with BCRYPT_IN_PROGRESS.track_inprogress(), BCRYPT_DURATION.time():
+        return bcrypt.hashpw(password_bytes, salt).decode("utf-8")
@@ -0,0 +1,217 @@
+"""
+Slow query log.
+
+Every statement that takes longer than SLOW_QUERY_MS is written as one JSON
+line to a rotating file with its bound parameters redacted to their types and
+the endpoint (method and route template) that issued it. On Postgres a share
+of slow statements (SLOW_QUERY_EXPLAIN_SAMPLE, and never the same statement
+twice within SLOW_QUERY_EXPLAIN_INTERVAL seconds) is also run through
+EXPLAIN on a background thread; the plan is logged as its own line with the
+same query_id.
+
+Each gunicorn worker rotates the file on its own, so a few lines can be lost
+at the moment of rotation.
+"""
+import hashlib
+import json
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+EXPLAINABLE = ("select", "with", "insert", "update", "delete")
+MAX_STATEMENT_CHARS = 10_000
+
+# The ASGI scope of the request being served; its route is set once matched
+request_scope: ContextVar[Optional[dict]] = ContextVar("request_scope", default=None)
+
+_logger: Optional[logging.Logger] = None
+_logger_lock = threading.Lock()
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        return json.dumps(record.msg, default=str)
+
+
+def get_logger() -> logging.Logger:
+    """
+    The slow query logger, writing to SLOW_QUERY_LOG_FILE. Created on first
+    use so nothing is written to disk until a slow statement happens.
+    """
+    global _logger
+    with _logger_lock:
+        if _logger is None:
+            path = settings.SLOW_QUERY_LOG_FILE
+            if os.path.dirname(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            handler = RotatingFileHandler(
+                path, maxBytes=settings.SLOW_QUERY_LOG_MAX_BYTES, backupCount=settings.SLOW_QUERY_LOG_BACKUPS
+            )
+            handler.setFormatter(JsonFormatter())
+            logger = logging.getLogger("pgkhata.slow_query")
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+            logger.addHandler(handler)
+            _logger = logger
+    return _logger
+
+
+def current_endpoint() -> Optional[str]:
+    scope = request_scope.get()
+    if scope is None:
+        return None
+    route = scope.get("route")
+    return f"{scope['method']} {getattr(route, 'path', None) or scope['path']}"
+
+
+def redact(parameters: Any) -> Any:
+    """
+    Bound parameters with every value replaced by its type name.
+    """
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [redact(value) if isinstance(value, (dict, list, tuple)) else type(value).__name__
+                for value in parameters]
+    return type(parameters).__name__
+
+
+def query_id(statement: str) -> str:
+    return hashlib.sha1(statement.encode()).hexdigest()[:12]
+
+
+class SlowQueryLog:
+    """
+    Engine event listeners timing each statement.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        threshold_ms: float,
+        explain_sample: float = 0.0,
+        explain_interval: float = 600.0,
+    ):
+        self.engine = engine
+        self.threshold = threshold_ms / 1000.0
+        self.explain_sample = explain_sample if engine.dialect.name == "postgresql" else 0.0
+        self.explain_interval = explain_interval
+        self._explained: Dict[str, float] = {}
+        self._explaining = threading.Semaphore(1)
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def install(self) -> "SlowQueryLog":
+        event.listen(self.engine, "before_cursor_execute", self.before_cursor_execute)
+        event.listen(self.engine, "after_cursor_execute", self.after_cursor_execute)
+        return self
+
+    def remove(self) -> None:
+        event.remove(self.engine, "before_cursor_execute", self.before_cursor_execute)
+        event.remove(self.engine, "after_cursor_execute", self.after_cursor_execute)
+
+    def before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        # Kept on the execution context so a failed statement leaves nothing behind
+        context.slow_query_start = time.perf_counter()
+
+    def after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        seconds = time.perf_counter() - context.slow_query_start
+        if seconds < self.threshold or conn.get_execution_options().get("slow_query_log") is False:
+            return
+
+        qid = query_id(statement)
+        get_logger().info({
+            "type": "slow_query",
+            "ts": datetime.now(timezone.utc).isoformat(),
+            "pid": os.getpid(),
+            "query_id": qid,
+            "duration_ms": round(seconds * 1000, 1),
+            "endpoint": current_endpoint(),
+            "statement": statement[:MAX_STATEMENT_CHARS],
+            "parameters": redact(parameters[0] if executemany and parameters else parameters),
+            "executemany": executemany,
+            "rowcount": cursor.rowcount,
+        })
+        if not executemany and self._should_explain(qid, statement):
+            self._explain(qid, statement, parameters)
+
+    def _should_explain(self, qid: str, statement: str) -> bool:
+        if not self.explain_sample or not statement.lstrip().lower().startswith(EXPLAINABLE):
+            return False
+        if random.random() >= self.explain_sample:
+            return False
+        now = time.monotonic()
+        if now - self._explained.get(qid, -self.explain_interval) < self.explain_interval:
+            return False
+        # One EXPLAIN at a time; a busy explainer drops new work instead of queueing it
+        if not self._explaining.acquire(blocking=False):
+            return False
+        self._explained[qid] = now
+        return True
+
+    def _explain(self, qid: str, statement: str, parameters: Any) -> None:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-query-explain")
+        self._executor.submit(self._run_explain, qid, statement, parameters)
+
+    def _run_explain(self, qid: str, statement: str, parameters: Any) -> None:
+        try:
+            with self.engine.connect() as conn:
+                conn = conn.execution_options(slow_query_log=False)
+                plan = conn.exec_driver_sql(
+                    "EXPLAIN (ANALYZE off, FORMAT JSON) " + statement, parameters
+                ).scalar()
+            get_logger().info({
+                "type": "explain",
+                "ts": datetime.now(timezone.utc).isoformat(),
+                "query_id": qid,
+                "plan": plan,
+            })
+        except Exception as exc:
+            get_logger().info({"type": "explain_error", "query_id": qid, "error": str(exc)[:500]})
+        finally:
+            self._explaining.release()
+
+
+def install(engine: Engine) -> Optional[SlowQueryLog]:
+    """
+    Log the engine's slow statements if SLOW_QUERY_MS is set.
+    """
+    if not settings.SLOW_QUERY_MS:
+        return None
+    return SlowQueryLog(
+        engine,
+        settings.SLOW_QUERY_MS,
+        explain_sample=settings.SLOW_QUERY_EXPLAIN_SAMPLE,
+        explain_interval=settings.SLOW_QUERY_EXPLAIN_INTERVAL,
+    ).install()
+
+
+class RequestContextMiddleware:
+    """
+    Make the current request's ASGI scope available to the query log.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = request_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            request_scope.reset(token)
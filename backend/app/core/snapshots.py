@@ -0,0 +1,221 @@
+"""
+Columnar (Parquet / Arrow IPC) snapshots of owner data for analytics.
+
+Rows are read from a server-side cursor (yield_per) and converted to Arrow
+record batches one chunk at a time, so memory does not grow with table size.
+Column types follow the model: dates stay dates, timestamps are UTC and money
+(every Float column in these tables) is decimal(12, 2).
+
+Partitioned snapshots are laid out hive-style by the day a row was last
+updated, e.g. rent_records/updated_date=2025-01-03/data.parquet. An
+incremental snapshot (`since`) rewrites only the partitions from that day
+on; a row that changed after an earlier snapshot can then appear in an old
+and a new partition, so readers keep the latest `updated_at` per `id`.
+
+pyarrow is optional: pip install -r requirements-optional.txt
+"""
+import io
+import json
+import os
+from itertools import groupby
+from datetime import date, datetime, time, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy import Boolean, Date, DateTime, Float, Integer, select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core.ownership import owner_filter
+
+CHUNK_ROWS = 50_000
+FORMATS = {"parquet": "parquet", "arrow": "arrow"}  # format -> file extension
+NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+TABLES = {
+    "pgs": models.PG,
+    "rooms": models.Room,
+    "beds": models.Bed,
+    "tenants": models.Tenant,
+    "rent_records": models.RentRecord,
+}
+
+
+class PyArrowMissing(RuntimeError):
+    pass
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError as exc:
+        raise PyArrowMissing(
+            "Snapshots need pyarrow: pip install -r requirements-optional.txt"
+        ) from exc
+    return pyarrow
+
+
+def _arrow_type(pa, column) -> Any:
+    if isinstance(column.type, Integer):
+        return pa.int64()
+    if isinstance(column.type, Float):
+        return pa.decimal128(12, 2)
+    if isinstance(column.type, Boolean):
+        return pa.bool_()
+    if isinstance(column.type, DateTime):
+        return pa.timestamp("us", tz="UTC")
+    if isinstance(column.type, Date):
+        return pa.date32()
+    return pa.string()
+
+
+def arrow_schema(table: str) -> Any:
+    pa = _pyarrow()
+    return pa.schema([
+        pa.field(column.name, _arrow_type(pa, column), nullable=not column.primary_key)
+        for column in TABLES[table].__table__.columns
+    ])
+
+
+def _query(table: str, owner_id: Optional[int], since: Optional[date]):
+    model = TABLES[table]
+    stmt = select(*model.__table__.columns)
+    if owner_id is not None:
+        stmt = stmt.where(owner_filter(model, owner_id))
+    if since is not None:
+        stmt = stmt.where(model.updated_at >= datetime.combine(since, time.min, tzinfo=timezone.utc))
+    return stmt.order_by(model.updated_at, model.id).execution_options(yield_per=CHUNK_ROWS)
+
+
+def _to_batch(pa, schema, rows) -> Any:
+    arrays = []
+    for i, field in enumerate(schema):
+        values = [row[i] for row in rows]
+        if pa.types.is_decimal(field.type):
+            # Float -> decimal through Arrow's cast, which rounds to the scale
+            arrays.append(pa.array(values, pa.float64()).cast(field.type))
+        else:
+            arrays.append(pa.array(values, field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def table_batches(
+    db: Session, table: str, owner_id: Optional[int] = None, since: Optional[date] = None
+) -> Iterator[Any]:
+    """
+    Arrow record batches of a table, optionally for one owner and rows
+    updated on or after `since`.
+    """
+    pa = _pyarrow()
+    schema = arrow_schema(table)
+    result = db.execute(_query(table, owner_id, since))
+    try:
+        for rows in result.partitions():
+            yield _to_batch(pa, schema, rows)
+    finally:
+        result.close()
+
+
+def _open_writer(sink: Any, schema: Any, fmt: str) -> Any:
+    pa = _pyarrow()
+    if fmt == "parquet":
+        return pa.parquet.ParquetWriter(sink, schema, compression="zstd")
+    return pa.ipc.new_file(sink, schema)
+
+
+def _partition(value: Optional[datetime]) -> str:
+    if value is None:
+        return NULL_PARTITION
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.date().isoformat()
+
+
+def write_snapshot(
+    db: Session,
+    out_dir: str,
+    fmt: str = "parquet",
+    owner_id: Optional[int] = None,
+    since: Optional[date] = None,
+    tables: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """
+    Write partitioned snapshot files under out_dir and a _manifest.json
+    describing them. Returns the manifest.
+    """
+    pa = _pyarrow()
+    manifest: Dict[str, Any] = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "format": fmt,
+        "owner_id": owner_id,
+        "since": since.isoformat() if since else None,
+        "tables": {},
+    }
+    for table in tables or list(TABLES):
+        schema = arrow_schema(table)
+        updated_at = schema.get_field_index("updated_at")
+        partitions: List[str] = []
+        writer = None
+        row_count = 0
+        result = db.execute(_query(table, owner_id, since))
+        try:
+            for rows in result.partitions():
+                # Rows come ordered by updated_at, so each partition arrives in one run and
+                # only its writer is open
+                for partition, group in groupby(rows, key=lambda row: _partition(row[updated_at])):
+                    if not partitions or partition != partitions[-1]:
+                        if writer is not None:
+                            writer.close()
+                            writer = None
+                        directory = os.path.join(out_dir, table, f"updated_date={partition}")
+                        os.makedirs(directory, exist_ok=True)
+                        path = os.path.join(directory, f"data.{FORMATS[fmt]}")
+                        writer = _open_writer(path, schema, fmt)
+                        partitions.append(partition)
+                    writer.write_batch(_to_batch(pa, schema, list(group)))
+                row_count += len(rows)
+        finally:
+            if writer is not None:
+                writer.close()
+            result.close()
+        manifest["tables"][table] = {"rows": row_count, "partitions": sorted(partitions)}
+
+    os.makedirs(out_dir, exist_ok=True)
+    with open(os.path.join(out_dir, "_manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def arrow_stream_chunks(
+    db: Session, table: str, owner_id: Optional[int] = None, since: Optional[date] = None
+) -> Iterator[bytes]:
+    """
+    One table as an Arrow IPC stream, yielded a record batch at a time.
+    """
+    pa = _pyarrow()
+    buffer = io.BytesIO()
+    writer = pa.ipc.new_stream(buffer, arrow_schema(table))
+    for batch in table_batches(db, table, owner_id, since):
+        writer.write_batch(batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    writer.close()
+    yield buffer.getvalue()
+
+
+def parquet_file(
+    db: Session, table: str, sink: Any, owner_id: Optional[int] = None, since: Optional[date] = None
+) -> None:
+    """
+    Write one table as a single Parquet file to a binary file object; Parquet
+    needs its footer before it can be read, so it cannot be streamed as it is
+    written.
+    """
+    writer = _open_writer(sink, arrow_schema(table), "parquet")
+    try:
+        for batch in table_batches(db, table, owner_id, since):
+            writer.write_batch(batch)
+    finally:
+        writer.close()
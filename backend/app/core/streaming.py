@@ -0,0 +1,111 @@
+"""
+Helpers for streaming large responses.
+
+Rows are read from a server-side cursor in batches (yield_per) and encoded
+batch by batch, so memory stays flat however many rows there are and the
+first bytes go out before the query has finished.
+"""
+import csv
+import io
+import zlib
+from typing import Any, Iterable, Iterator, Sequence, Type
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+YIELD_PER = 1000
+
+# Cells starting with these are treated as formulas by spreadsheet apps
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def accepts_gzip(request: Request) -> bool:
+    encodings = request.headers.get("accept-encoding", "")
+    return any(part.split(";")[0].strip() in ("gzip", "*") for part in encodings.split(","))
+
+
+def wants_ndjson(request: Request) -> bool:
+    return "application/x-ndjson" in request.headers.get("accept", "")
+
+
+def batches(result: Any) -> Iterator[Sequence[Any]]:
+    """
+    Rows of a result executed with yield_per, one batch at a time.
+    """
+    try:
+        yield from result.partitions()
+    finally:
+        result.close()
+
+
+def safe_text(value: Any) -> Any:
+    """
+    Neutralise user-entered text that a spreadsheet would run as a formula.
+    """
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def csv_chunks(header: Sequence[str], row_batches: Iterable[Sequence[Sequence[Any]]]) -> Iterator[bytes]:
+    """
+    Encode a header and batches of rows as CSV, one chunk per batch.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    for batch in row_batches:
+        writer.writerows(batch)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """
+    Gzip a stream of chunks. Each chunk is sync-flushed so the client can
+    decode it as soon as it arrives.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def json_array_chunks(row_batches: Iterable[Sequence[Any]], schema: Type[BaseModel]) -> Iterator[bytes]:
+    """
+    Encode batches of ORM objects through a response schema as one JSON array.
+    """
+    yield b"["
+    first = True
+    for batch in row_batches:
+        if not batch:
+            continue
+        encoded = b",".join(schema.model_validate(row).model_dump_json().encode() for row in batch)
+        yield encoded if first else b"," + encoded
+        first = False
+    yield b"]"
+
+
+def ndjson_chunks(row_batches: Iterable[Sequence[Any]], schema: Type[BaseModel]) -> Iterator[bytes]:
+    """
+    Encode batches of ORM objects through a response schema, one JSON document per line.
+    """
+    for batch in row_batches:
+        if batch:
+            yield b"".join(schema.model_validate(row).model_dump_json().encode() + b"\n" for row in batch)
+
+
+def model_stream(request: Request, result: Any, schema: Type[BaseModel]) -> StreamingResponse:
+    """
+    Stream the objects of a yield_per result as NDJSON if the client asked for
+    it, otherwise as a JSON array.
+    """
+    if wants_ndjson(request):
+        return StreamingResponse(ndjson_chunks(batches(result), schema), media_type="application/x-ndjson")
+    return StreamingResponse(json_array_chunks(batches(result), schema), media_type="application/json")
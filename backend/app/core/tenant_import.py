@@ -0,0 +1,188 @@
+"""
+Bulk tenant import from CSV or Excel.
+
+The file is read row by row and validated in chunks against
+schemas.TenantImportRow. Beds are resolved by (room_number, bed_number) from
+one lookup of the PG's beds; each chunk's valid rows are then inserted with
+one multi-row INSERT for tenants, one for their first-month rent records
+(prorated like POST /tenants/) and one UPDATE marking the beds occupied.
+Invalid rows are reported by line number and skipped.
+"""
+import csv
+import io
+from datetime import date, datetime
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.core import billing, ledger
+
+CHUNK_ROWS = 500
+MAX_ROWS = 5000
+
+
+class ImportFileError(ValueError):
+    pass
+
+
+def _header(names: List[Any]) -> List[str]:
+    return [str(name or "").strip().lower().replace(" ", "_") for name in names]
+
+
+def _csv_rows(f) -> Iterator[Dict[str, Any]]:
+    reader = csv.reader(io.TextIOWrapper(f, encoding="utf-8-sig", newline=""))
+    header = _header(next(reader, []))
+    for values in reader:
+        yield dict(zip(header, values))
+
+
+def _cell(value: Any) -> Any:
+    # Excel gives numbers and datetimes; the schema parses strings and dates
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date) or value is None:
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _xlsx_rows(f) -> Iterator[Dict[str, Any]]:
+    try:
+        import openpyxl
+    except ImportError:
+        raise ImportFileError("Excel import needs openpyxl: pip install -r requirements-optional.txt")
+    try:
+        workbook = openpyxl.load_workbook(f, read_only=True, data_only=True)
+    except Exception:
+        raise ImportFileError("Could not read the Excel file")
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = _header(list(next(rows, [])))
+        for values in rows:
+            yield dict(zip(header, (_cell(v) for v in values)))
+    finally:
+        workbook.close()
+
+
+def read_rows(f, filename: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Rows of an uploaded .csv or .xlsx file as (line, dict keyed by normalised
+    header); blank rows are skipped but still counted, so line is the row's
+    number in the file (the header is line 1).
+    """
+    if filename.lower().endswith(".xlsx"):
+        rows = _xlsx_rows(f)
+    elif filename.lower().endswith(".csv"):
+        rows = _csv_rows(f)
+    else:
+        raise ImportFileError("Upload a .csv or .xlsx file")
+
+    for line, row in enumerate(rows, start=2):
+        # Blank cells fall back to the schema defaults
+        cleaned = {key: value for key, value in row.items() if key and value not in (None, "")}
+        if cleaned:
+            yield line, cleaned
+
+
+def _validation_messages(exc: ValidationError) -> List[str]:
+    return [f"{'.'.join(str(p) for p in err['loc']) or 'row'}: {err['msg']}" for err in exc.errors()]
+
+
+def import_tenants(
+    db: Session, pg: models.PG, rows: Iterator[Tuple[int, Dict[str, Any]]], dry_run: bool = False
+) -> schemas.TenantImportResult:
+    """
+    Validate and insert tenants into the PG. Nothing is committed.
+    """
+    beds: Dict[Tuple[str, str], Any] = {
+        (bed.room_number, bed.bed_number): bed
+        for bed in db.execute(
+            select(models.Room.room_number, models.Bed.bed_number, models.Bed.id, models.Bed.is_occupied,
+                   models.Bed.monthly_price)
+            .join(models.Room, models.Room.id == models.Bed.room_id)
+            .where(models.Room.pg_id == pg.id)
+        )
+    }
+    claimed: Dict[int, int] = {}  # bed id -> line that took it
+    result = schemas.TenantImportResult(created=0, dry_run=dry_run)
+
+    read = 0
+    while chunk := list(islice(rows, CHUNK_ROWS)):
+        read += len(chunk)
+        if read > MAX_ROWS:
+            raise ImportFileError(f"Import at most {MAX_ROWS} tenants per file")
+
+        valid: List[Tuple[schemas.TenantImportRow, Any]] = []
+        for line, raw in chunk:
+            try:
+                row = schemas.TenantImportRow.model_validate(raw)
+            except ValidationError as exc:
+                result.errors.append(schemas.TenantImportError(row=line, errors=_validation_messages(exc)))
+                continue
+
+            bed = beds.get((row.room_number, row.bed_number))
+            error = None
+            if bed is None:
+                error = f"Bed {row.bed_number} in room {row.room_number} not found"
+            elif bed.is_occupied:
+                error = f"Bed {row.bed_number} in room {row.room_number} is already occupied"
+            elif bed.id in claimed:
+                error = f"Bed {row.bed_number} in room {row.room_number} is already used on line {claimed[bed.id]}"
+            if error:
+                result.errors.append(schemas.TenantImportError(row=line, errors=[error]))
+                continue
+            claimed[bed.id] = line
+            valid.append((row, bed))
+
+        if not valid or dry_run:
+            result.created += len(valid)
+            continue
+
+        tenant_ids = db.scalars(
+            insert(models.Tenant).returning(models.Tenant.id, sort_by_parameter_order=True),
+            [
+                {
+                    **row.model_dump(exclude={"room_number", "bed_number", "status"}),
+                    "status": "active",
+                    "pg_id": pg.id,
+                    "bed_id": bed.id,
+                }
+                for row, bed in valid
+            ],
+        ).all()
+
+        db.execute(
+            update(models.Bed).where(models.Bed.id.in_([bed.id for _, bed in valid])).values(is_occupied=True)
+            .execution_options(synchronize_session=False)
+        )
+
+        months = [row.check_in_date.replace(day=1) for row, _ in valid]
+        amounts = billing.bill_pairs(
+            [row.check_in_date for row, _ in valid],
+            [None] * len(valid),
+            [bed.monthly_price or 0.0 for _, bed in valid],
+            months,
+        )
+        db.execute(insert(models.RentRecord), [
+            {
+                "tenant_id": tenant_id,
+                "pg_id": pg.id,
+                "month": month,
+                "amount_due": float(amount),
+                "amount_paid": 0.0,
+                "status": "pending",
+            }
+            for tenant_id, month, amount in zip(tenant_ids, months, amounts)
+        ])
+        db.flush()
+        ledger.refresh_balances(db, tenant_ids)
+
+        result.created += len(tenant_ids)
+        result.tenant_ids.extend(tenant_ids)
+
+    return result
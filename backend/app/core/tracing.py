@@ -0,0 +1,281 @@
+"""
+Lightweight request tracing.
+
+Spans follow the OpenTelemetry data model (trace and span ids, parent span,
+kind, start/end in Unix nanoseconds, attributes, status) and an incoming W3C
+`traceparent` header continues the caller's trace, but nothing here depends
+on the OpenTelemetry SDK. Finished spans go to an exporter: JsonlExporter
+(one span per line, set up from TRACE_FILE) or InMemoryExporter in tests.
+
+A traced request gets a SERVER span from TracedRoute, with children for
+dependencies decorated with @traced (auth), the endpoint body, each SQL
+statement (from engine events) and response validation and serialization,
+so the time of a request can be split between queries issued by the endpoint
+and lazy loads triggered while building the response model.
+"""
+import functools
+import inspect
+import json
+import os
+import random
+import re
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from starlette.requests import Request
+
+from app.core.config import settings
+
+MAX_STATEMENT_CHARS = 2000
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+class Span:
+    __slots__ = (
+        "name", "kind", "trace_id", "span_id", "parent_span_id", "attributes",
+        "start_time_unix_nano", "end_time_unix_nano", "status", "error",
+    )
+
+    def __init__(self, name: str, trace_id: str, parent_span_id: Optional[str], kind: str = "INTERNAL",
+                 attributes: Optional[Dict[str, Any]] = None, start_time_unix_nano: Optional[int] = None):
+        self.name = name
+        self.kind = kind
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_span_id = parent_span_id
+        self.attributes = attributes or {}
+        self.start_time_unix_nano = start_time_unix_nano or time.time_ns()
+        self.end_time_unix_nano: Optional[int] = None
+        self.status = "UNSET"
+        self.error: Optional[str] = None
+
+    def child(self, name: str, kind: str = "INTERNAL", **attributes) -> "Span":
+        return Span(name, self.trace_id, self.span_id, kind, attributes)
+
+    def end(self, error: Optional[BaseException] = None, end_time_unix_nano: Optional[int] = None) -> None:
+        self.end_time_unix_nano = end_time_unix_nano or time.time_ns()
+        if error is not None:
+            self.status = "ERROR"
+            self.error = f"{type(error).__name__}: {error}"[:500]
+        if _exporter is not None:
+            _exporter.export(self)
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_time_unix_nano or time.time_ns()) - self.start_time_unix_nano) / 1e6
+
+    def to_dict(self) -> dict:
+        status = {"code": f"STATUS_CODE_{self.status}"}
+        if self.error:
+            status["message"] = self.error
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_span_id,
+            "name": self.name,
+            "kind": f"SPAN_KIND_{self.kind}",
+            "start_time_unix_nano": self.start_time_unix_nano,
+            "end_time_unix_nano": self.end_time_unix_nano,
+            "attributes": self.attributes,
+            "status": status,
+        }
+
+
+class InMemoryExporter:
+    def __init__(self):
+        self.spans: List[Span] = []
+
+    def export(self, span: Span) -> None:
+        self.spans.append(span)
+
+
+class JsonlExporter:
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = None
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str) + "\n"
+        with self._lock:
+            if self._file is None:
+                if os.path.dirname(self.path):
+                    os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                self._file = open(self.path, "a", buffering=1)
+            self._file.write(line)
+
+
+_exporter = None
+
+
+def set_exporter(exporter) -> None:
+    """
+    Send finished spans to `exporter`; None turns tracing off.
+    """
+    global _exporter
+    _exporter = exporter
+
+
+def configure() -> None:
+    if settings.TRACE_FILE:
+        set_exporter(JsonlExporter(settings.TRACE_FILE))
+
+
+class span:
+    """
+    Context manager running its block as a child of the current span. Without
+    a current span (tracing off, not sampled, outside a request) it does nothing.
+    """
+
+    def __init__(self, name: str, kind: str = "INTERNAL", **attributes):
+        self.name = name
+        self.kind = kind
+        self.attributes = attributes
+        self._span: Optional[Span] = None
+        self._token = None
+
+    def __enter__(self) -> Optional[Span]:
+        parent = current_span.get()
+        if parent is not None:
+            self._span = parent.child(self.name, self.kind, **self.attributes)
+            self._token = current_span.set(self._span)
+        return self._span
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._span is not None:
+            current_span.reset(self._token)
+            self._span.end(exc)
+        return False
+
+
+def traced(name: str) -> Callable:
+    """
+    Decorator running a function (e.g. a FastAPI dependency) in a span.
+    """
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def start_trace(name: str, traceparent: Optional[str] = None, **attributes) -> Optional[Span]:
+    """
+    A new root span, or None if tracing is off or the trace is not sampled.
+    """
+    if _exporter is None:
+        return None
+    match = _TRACEPARENT.match(traceparent or "")
+    if match:
+        trace_id, parent_id = match.groups()
+    else:
+        if random.random() >= settings.TRACE_SAMPLE:
+            return None
+        trace_id, parent_id = f"{random.getrandbits(128):032x}", None
+    return Span(name, trace_id, parent_id, "SERVER", attributes)
+
+
+class _TracedField:
+    """
+    Stand-in for a route's response field that runs validation (where lazy
+    loads happen) and serialization in spans.
+    """
+
+    def __init__(self, field):
+        self._field = field
+
+    def __getattr__(self, name):
+        return getattr(self._field, name)
+
+    def validate(self, *args, **kwargs):
+        with span("response.validate"):
+            return self._field.validate(*args, **kwargs)
+
+    def serialize(self, *args, **kwargs):
+        with span("response.serialize"):
+            return self._field.serialize(*args, **kwargs)
+
+
+class TracedRoute(APIRoute):
+    """
+    APIRoute whose requests are traced when an exporter is set.
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs):
+        super().__init__(path, traced("endpoint")(endpoint), **kwargs)
+
+    def get_route_handler(self):
+        # FastAPI builds the handler from the route's response field, so wrap that first
+        field = getattr(self, "secure_cloned_response_field", None)
+        if field is not None and not isinstance(field, _TracedField):
+            self.secure_cloned_response_field = _TracedField(field)
+        handler = super().get_route_handler()
+        methods = ",".join(sorted(self.methods))
+
+        async def traced_handler(request: Request):
+            root = start_trace(
+                f"{request.method} {self.path_format}",
+                request.headers.get("traceparent"),
+                **{"http.method": request.method, "http.route": self.path_format, "http.target": request.url.path},
+            )
+            if root is None:
+                return await handler(request)
+            token = current_span.set(root)
+            try:
+                response = await handler(request)
+            except BaseException as exc:
+                current_span.reset(token)
+                root.end(exc)
+                raise
+            current_span.reset(token)
+            root.attributes["http.status_code"] = response.status_code
+            root.end()
+            return response
+
+        traced_handler.__name__ = f"{methods} {self.path_format}"
+        return traced_handler
+
+
+def instrument_engine(engine) -> None:
+    """
+    Run each SQL statement issued under a traced request in a CLIENT span.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        parent = current_span.get()
+        if parent is not None:
+            context.trace_span = parent.child(
+                "SQL " + statement.split(None, 1)[0].upper() if statement.strip() else "SQL",
+                "CLIENT",
+                **{"db.system": engine.dialect.name, "db.statement": statement[:MAX_STATEMENT_CHARS]},
+            )
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        sql_span = getattr(context, "trace_span", None)
+        if sql_span is not None:
+            # context.cursor: the one that ran the statement, if app.db.reconnect retried it
+            sql_span.attributes["db.rowcount"] = context.cursor.rowcount
+            sql_span.end()
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(exception_context):
+        sql_span = getattr(exception_context.execution_context, "trace_span", None)
+        if sql_span is not None and sql_span.end_time_unix_nano is None:
+            sql_span.end(exception_context.original_exception)
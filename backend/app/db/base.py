@@ -3,4 +3,5 @@
 from app.db.base_class import Base  # noqa
 from app.models.user import User  # noqa
 from app.models.pg_structure import PG, Room, Bed  # noqa
-from app.models.tenant_management import Tenant, RentRecord  # noqa
+from app.models.tenant_management import Tenant, RentRecord, Payment, TenantBalance  # noqa
+from app.models.job import Job, RolloverCheckpoint  # noqa
@@ -0,0 +1,134 @@
+"""
+In-place upgrades for databases created by an older version of the app.
+
+create_all only creates missing tables, never alters existing ones, so each
+step here brings a table created before a constraint or column was added up
+to the models. Steps check before they change anything and are safe to run
+on every start; schema.ensure_schema runs them after create_all, in one
+transaction.
+"""
+import logging
+from typing import Callable, List
+
+from sqlalchemy import delete, func, inspect, select, update
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core import ledger
+from app.db.base import Base
+
+logger = logging.getLogger(__name__)
+
+UPDATED_AT_TABLES = ("pgs", "rooms", "beds", "tenants", "rent_records")
+# Owner and PG lookups that the hot queries' plans depend on (tests/test_query_plans.py)
+LOOKUP_INDEXES = ("ix_pgs_owner_id", "ix_rooms_pg_id", "ix_beds_room_id", "ix_tenants_pg_id",
+                  "ix_rent_records_pg_id_month")
+# Any constant; serializes the steps between workers starting at once
+_LOCK_KEY = 0x70676B68
+
+
+def _has_unique(conn: Connection, table: str, columns: List[str]) -> bool:
+    inspector = inspect(conn)
+    if any(c["column_names"] == columns for c in inspector.get_unique_constraints(table)):
+        return True
+    return any(i["unique"] and i["column_names"] == columns for i in inspector.get_indexes(table))
+
+
+def unique_rent_month(conn: Connection) -> None:
+    """
+    One rent record per tenant per month, which payment upserts and rent
+    generation (ON CONFLICT (tenant_id, month)) depend on. Duplicate records
+    are merged into the oldest: what was paid is added up, payments are moved
+    over to it and the tenants' cached balances are recomputed.
+    """
+    if _has_unique(conn, "rent_records", ["tenant_id", "month"]):
+        return
+    rents = models.RentRecord.__table__
+    payments = models.Payment.__table__
+    groups = conn.execute(
+        select(rents.c.tenant_id, rents.c.month, func.min(rents.c.id))
+        .group_by(rents.c.tenant_id, rents.c.month)
+        .having(func.count() > 1)
+    ).all()
+    for tenant_id, month, keep_id in groups:
+        records = conn.execute(
+            select(rents.c.id, rents.c.amount_paid, rents.c.payment_date)
+            .where(rents.c.tenant_id == tenant_id, rents.c.month == month)
+        ).all()
+        duplicate_ids = [r.id for r in records if r.id != keep_id]
+        amount_paid = round(sum(r.amount_paid or 0.0 for r in records), 2)
+        payment_dates = [r.payment_date for r in records if r.payment_date]
+        amount_due = conn.execute(select(rents.c.amount_due).where(rents.c.id == keep_id)).scalar_one()
+        conn.execute(
+            update(payments).where(payments.c.rent_record_id.in_(duplicate_ids)).values(rent_record_id=keep_id)
+        )
+        conn.execute(delete(rents).where(rents.c.id.in_(duplicate_ids)))
+        conn.execute(
+            update(rents).where(rents.c.id == keep_id).values(
+                amount_paid=amount_paid,
+                status=ledger.settle_status(amount_paid, amount_due),
+                payment_date=max(payment_dates, default=None),
+            )
+        )
+    if groups:
+        # Runs in this connection's transaction
+        with Session(bind=conn) as db:
+            ledger.refresh_balances(db, [tenant_id for tenant_id, _, _ in groups])
+        logger.warning("Merged duplicate rent records for %s tenant months", len(groups))
+    conn.exec_driver_sql(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_rent_records_tenant_month ON rent_records (tenant_id, month)"
+    )
+
+
+def updated_at_columns(conn: Connection) -> None:
+    """
+    The indexed updated_at that analytics snapshots partition by. Existing
+    rows get the time of the upgrade.
+    """
+    inspector = inspect(conn)
+    for table in UPDATED_AT_TABLES:
+        if not any(c["name"] == "updated_at" for c in inspector.get_columns(table)):
+            if conn.dialect.name == "postgresql":
+                conn.exec_driver_sql(
+                    f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS updated_at timestamptz DEFAULT now()"
+                )
+            else:
+                # SQLite cannot add a column with a non-constant default
+                conn.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN updated_at TIMESTAMP")
+                conn.exec_driver_sql(f"UPDATE {table} SET updated_at = CURRENT_TIMESTAMP")
+            logger.info("Added %s.updated_at", table)
+        index = f"ix_{table}_updated_at"
+        if not any(i["name"] == index for i in inspector.get_indexes(table)):
+            conn.exec_driver_sql(f"CREATE INDEX IF NOT EXISTS {index} ON {table} (updated_at)")
+
+
+def lookup_indexes(conn: Connection) -> None:
+    """
+    The owner and PG lookup indexes, as the models define them.
+    """
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            if index.name in LOOKUP_INDEXES:
+                index.create(conn, checkfirst=True)
+
+
+STEPS: List[Callable[[Connection], None]] = [
+    unique_rent_month,
+    updated_at_columns,
+    lookup_indexes,
+]
+
+
+def run(engine: Engine) -> None:
+    """
+    Apply every step, in order, in one transaction.
+    """
+    with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            # Waiting for another worker's run and building an index can outlast
+            # DB_STATEMENT_TIMEOUT_MS, which would fail every retry the same way
+            conn.exec_driver_sql("SET LOCAL statement_timeout = 0")
+            conn.execute(select(func.pg_advisory_xact_lock(_LOCK_KEY)))
+        for step in STEPS:
+            step(conn)
@@ -0,0 +1,69 @@
+"""
+Reconnect-and-retry for pooled connections, in place of pool_pre_ping.
+
+pool_pre_ping costs a round trip on every checkout. Without it, a pooled
+connection the server has closed (restart, failover, idle timeout) is only
+found out when a statement fails on it. If that statement is the first one
+since checkout, nothing has run in its transaction yet, so the connection is
+replaced the way pre-ping would have replaced it and the statement is run
+again. A disconnect later in a transaction is raised as before, since the
+work done so far on that connection is lost.
+
+The replacement swaps the DBAPI connection under the pool's connection
+record, as pre-ping does inside SQLAlchemy's pool; that is not public API,
+so it is tested against the SQLAlchemy version pinned in requirements.txt.
+after_cursor_execute listeners are passed the failed cursor, so they read
+context.cursor instead.
+"""
+import logging
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+FIRST_STATEMENT = "reconnect_first_statement"
+
+
+def _execute_with_retry(do_execute, cursor, statement, context, *args) -> bool:
+    fairy = context.root_connection.connection
+    # The pool's own record of the DBAPI connection, as used by pre-ping in _ConnectionFairy._checkout
+    record = fairy._connection_record
+    first = record.info.pop(FIRST_STATEMENT, False)
+    try:
+        do_execute(cursor, statement, *args, context=context)
+    except context.dialect.loaded_dbapi.Error as exc:
+        if not first or not context.dialect.is_disconnect(exc, fairy.dbapi_connection, cursor):
+            raise
+        logger.info("Pooled connection was closed, reconnecting: %s", exc)
+        try:
+            cursor.close()
+        except context.dialect.loaded_dbapi.Error:
+            pass
+        record.invalidate(exc)
+        fairy.dbapi_connection = record.get_connection()
+        context.cursor = fairy.cursor()
+        do_execute(context.cursor, statement, *args, context=context)
+    return True
+
+
+def install(engine: Engine) -> None:
+    """
+    Retry the first statement after checkout on a new connection if the pooled one was closed.
+    """
+
+    @event.listens_for(engine.pool, "checkout")
+    def mark_first_statement(dbapi_connection, connection_record, connection_proxy):
+        connection_record.info[FIRST_STATEMENT] = True
+
+    @event.listens_for(engine, "do_execute")
+    def do_execute(cursor, statement, parameters, context):
+        return _execute_with_retry(context.dialect.do_execute, cursor, statement, context, parameters)
+
+    @event.listens_for(engine, "do_executemany")
+    def do_executemany(cursor, statement, parameters, context):
+        return _execute_with_retry(context.dialect.do_executemany, cursor, statement, context, parameters)
+
+    @event.listens_for(engine, "do_execute_no_params")
+    def do_execute_no_params(cursor, statement, context):
+        return _execute_with_retry(context.dialect.do_execute_no_params, cursor, statement, context)
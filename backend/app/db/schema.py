@@ -0,0 +1,64 @@
+"""
+Table creation off the request path.
+
+create_all connects and checks every table, which on a remote database is
+the slowest part of a worker's start. It runs in a background thread instead,
+so the worker serves as soon as the app is imported; `ready` is set once the
+tables are in place and existing ones upgraded (app.db.migrations), retrying
+while the database is unreachable.
+
+With CREATE_TABLES_ON_STARTUP=false, run the same steps once per deploy:
+
+    python -m app.db.schema
+"""
+import logging
+import threading
+import time
+from typing import Optional
+
+from app.db import migrations
+from app.db.base import Base
+from app.db.session import engine
+
+logger = logging.getLogger(__name__)
+
+RETRY_DELAYS = (1, 2, 5, 10, 30)  # Seconds; the last one repeats
+
+ready = threading.Event()
+_thread: Optional[threading.Thread] = None
+_lock = threading.Lock()
+
+
+def ensure_schema() -> None:
+    Base.metadata.create_all(bind=engine)
+    migrations.run(engine)
+    ready.set()
+
+
+def _run() -> None:
+    attempt = 0
+    while True:
+        try:
+            ensure_schema()
+            return
+        except Exception:
+            delay = RETRY_DELAYS[min(attempt, len(RETRY_DELAYS) - 1)]
+            logger.exception("Schema check failed, retrying in %ss", delay)
+            attempt += 1
+            time.sleep(delay)
+
+
+def start() -> None:
+    """
+    Create missing tables in the background, once per process.
+    """
+    global _thread
+    with _lock:
+        if _thread is None:
+            _thread = threading.Thread(target=_run, name="schema-check", daemon=True)
+            _thread.start()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    ensure_schema()
@@ -1,9 +1,14 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.engine.url import make_url
+from sqlalchemy.engine.url import URL, make_url
+from sqlalchemy.pool import NullPool
 import os
 
 from app.core.config import settings
+from app.core import slow_query, tracing
+from app.core.metrics import TimedQueuePool, instrument_engine
+from app.db import reconnect, timeouts
 
 # Parse the DATABASE_URL to handle special characters in passwords
 database_url = make_url(settings.DATABASE_URL)
@@ -20,13 +25,52 @@ if is_production:
         "connect_timeout": 10,
     }
 
-engine = create_engine(
-    database_url, 
-    pool_pre_ping=True,  # Verify connections before using them
-    pool_size=5 if is_production else 10,
-    max_overflow=10 if is_production else 20,
-    pool_recycle=300,  # Recycle connections after 5 minutes (Supabase recommendation)
-    connect_args=connect_args,
-    echo=False,  # Set to True for SQL debugging
-)
+
+def pool_options() -> dict:
+    """
+    Pool class and size for each worker's engine, from DB_POOL_SIZE / DB_MAX_OVERFLOW.
+    """
+    pool_size = settings.DB_POOL_SIZE
+    if pool_size is None:
+        # Behind a transaction-mode pooler, holding idle connections only takes its slots
+        pool_size = 0 if settings.DB_TRANSACTION_POOLER else (5 if is_production else 10)
+    if not pool_size:
+        return {"poolclass": NullPool}
+    max_overflow = settings.DB_MAX_OVERFLOW
+    if max_overflow is None:
+        max_overflow = 0 if settings.DB_TRANSACTION_POOLER else (10 if is_production else 20)
+    return {
+        "poolclass": TimedQueuePool,  # QueuePool that records checkout wait times
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+    }
+
+
+def make_engine(url: URL) -> Engine:
+    """
+    The app's engine for `url`, with its pool, driver options and instrumentation.
+    """
+    driver_args = dict(connect_args)
+    if settings.DB_TRANSACTION_POOLER and url.get_driver_name() == "psycopg":
+        # psycopg 3 prepares repeated statements on the server connection, which the pooler
+        # hands to other clients; psycopg2 (the default driver) never prepares
+        driver_args["prepare_threshold"] = None
+    engine = create_engine(
+        url,
+        pool_pre_ping=settings.DB_PRE_PING,  # Verify connections before using them
+        pool_recycle=300,  # Recycle connections after 5 minutes (Supabase recommendation)
+        connect_args=driver_args,
+        echo=False,  # Set to True for SQL debugging
+        **pool_options(),
+    )
+    if not settings.DB_PRE_PING:
+        reconnect.install(engine)
+    timeouts.install(engine)
+    instrument_engine(engine)
+    slow_query.install(engine)
+    tracing.instrument_engine(engine)
+    return engine
+
+
+engine = make_engine(database_url)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
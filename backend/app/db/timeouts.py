@@ -0,0 +1,42 @@
+"""
+Statement and idle-in-transaction timeouts, set per transaction.
+
+The timeouts are set with SET LOCAL when each transaction begins rather than
+once per connection. Behind a transaction-mode pooler every transaction may
+run on a different server connection: a session-level SET would be missing
+on the next one and left behind for whichever client gets this one. SET
+LOCAL ends with the transaction, so nothing outlives it. Both settings go
+in one statement, but it is still a round trip per transaction, so nothing
+is installed unless a timeout is configured.
+"""
+from typing import List
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+
+def timeout_statements() -> List[str]:
+    statements = []
+    if settings.DB_STATEMENT_TIMEOUT_MS:
+        statements.append(f"SET LOCAL statement_timeout = {int(settings.DB_STATEMENT_TIMEOUT_MS)}")
+    if settings.DB_IDLE_IN_TRANSACTION_TIMEOUT_MS:
+        statements.append(
+            f"SET LOCAL idle_in_transaction_session_timeout = {int(settings.DB_IDLE_IN_TRANSACTION_TIMEOUT_MS)}"
+        )
+    return statements
+
+
+def install(engine: Engine) -> None:
+    """
+    Apply the configured timeouts at the start of every transaction on a Postgres engine.
+    """
+    statements = timeout_statements()
+    if not statements or engine.dialect.name != "postgresql":
+        return
+    sql = "; ".join(statements)
+
+    @event.listens_for(engine, "begin")
+    def set_timeouts(conn):
+        conn.exec_driver_sql(sql)
@@ -0,0 +1,13 @@
+from typing import Any
+
+from sqlalchemy.dialects import postgresql, sqlite
+
+
+def insert_for(bind: Any):
+    """
+    Return the dialect-specific insert() for the bound engine, which supports
+    ON CONFLICT ... DO UPDATE (upserts) on both Postgres and SQLite.
+    """
+    if bind.dialect.name == "postgresql":
+        return postgresql.insert
+    return sqlite.insert
@@ -1,19 +1,40 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from starlette.middleware.cors import CORSMiddleware
 
 from app.api.v1.api import api_router
+from app.core import health, tracing
 from app.core.config import settings
-from app.db.session import engine
-from app.db.base import Base
+from app.core.metrics import MetricsMiddleware, metrics_endpoint
+from app.core.profiler import ProfileMiddleware
+from app.core.slow_query import RequestContextMiddleware
+from app.db import schema
+
+tracing.configure()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Create all tables (for MVP only - usually we use Alembic), without holding up serving
+    if settings.CREATE_TABLES_ON_STARTUP:
+        schema.start()
+    else:
+        schema.ready.set()
+    health.start()
+    yield
+    health.stop()
 
-# Create all tables (for MVP only - usually we use Alembic)
-Base.metadata.create_all(bind=engine)
 
 app = FastAPI(
     title=settings.PROJECT_NAME, 
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan,
 )
 
+# Innermost, so CORS headers and metrics still apply to its 503s
+app.add_middleware(health.SchemaReadyMiddleware)
+
 # Set all CORS enabled origins
 if settings.BACKEND_CORS_ORIGINS:
     app.add_middleware(
@@ -24,4 +45,11 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_headers=["*"],
     )
 
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(RequestContextMiddleware)
+app.add_middleware(ProfileMiddleware)
+
 app.include_router(api_router, prefix=settings.API_V1_STR)
+app.add_route("/metrics", metrics_endpoint, include_in_schema=False)
+app.add_route("/healthz", health.healthz, include_in_schema=False)
+app.add_route("/readyz", health.readyz, include_in_schema=False)
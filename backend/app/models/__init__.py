@@ -1,3 +1,4 @@
 from .user import User
 from .pg_structure import PG, Room, Bed
-from .tenant_management import Tenant, RentRecord
+from .tenant_management import Tenant, RentRecord, Payment, TenantBalance
+from .job import Job, RolloverCheckpoint
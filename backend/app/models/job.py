@@ -0,0 +1,36 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, Float, Text, Date, DateTime, JSON, Index
+from sqlalchemy.sql import func
+
+from app.db.base_class import Base
+
+class Job(Base):
+    __tablename__ = "jobs"
+    # Workers poll for the next runnable job with this index
+    __table_args__ = (Index("ix_jobs_status_run_after", "status", "run_after"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    owner_id = Column(Integer, ForeignKey("user.id"), nullable=True, index=True)
+    kind = Column(String, nullable=False) # e.g. rents.generate
+    payload = Column(JSON, default=dict)
+
+    status = Column(String, default="queued") # queued, running, succeeded, failed
+    attempts = Column(Integer, default=0)
+    max_attempts = Column(Integer, default=5)
+    run_after = Column(DateTime(timezone=True), server_default=func.now()) # Not picked up before this
+    locked_by = Column(String, nullable=True)
+    locked_at = Column(DateTime(timezone=True), nullable=True)
+
+    progress = Column(Float, default=0.0) # 0.0 - 1.0
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+# One row per owner whose rent was generated by a month rollover run
+class RolloverCheckpoint(Base):
+    __tablename__ = "rollover_checkpoints"
+    month = Column(Date, primary_key=True)
+    owner_id = Column(Integer, ForeignKey("user.id"), primary_key=True)
+    completed_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -7,11 +7,12 @@ from app.db.base_class import Base
 class PG(Base):
     __tablename__ = "pgs"
     id = Column(Integer, primary_key=True, index=True)
-    owner_id = Column(Integer, ForeignKey("user.id"))
+    owner_id = Column(Integer, ForeignKey("user.id"), index=True)
     name = Column(String, index=True, nullable=False)
     address = Column(String)
     city = Column(String)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), index=True)
 
     owner = relationship("User", back_populates="pgs")
     rooms = relationship("Room", back_populates="pg", cascade="all, delete-orphan")
@@ -21,10 +22,11 @@ class PG(Base):
 class Room(Base):
     __tablename__ = "rooms"
     id = Column(Integer, primary_key=True, index=True)
-    pg_id = Column(Integer, ForeignKey("pgs.id"))
+    pg_id = Column(Integer, ForeignKey("pgs.id"), index=True)
     room_number = Column(String, nullable=False)
     floor = Column(Integer, default=0)
     type = Column(String)  # Single, Double, etc.
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), index=True)
 
     pg = relationship("PG", back_populates="rooms")
     beds = relationship("Bed", back_populates="room", cascade="all, delete-orphan")
@@ -33,10 +35,11 @@ class Room(Base):
 class Bed(Base):
     __tablename__ = "beds"
     id = Column(Integer, primary_key=True, index=True)
-    room_id = Column(Integer, ForeignKey("rooms.id"))
+    room_id = Column(Integer, ForeignKey("rooms.id"), index=True)
     bed_number = Column(String, nullable=False)
     is_occupied = Column(Boolean, default=False)
     monthly_price = Column(Float, default=0.0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), index=True)
 
     room = relationship("Room", back_populates="beds")
     tenant = relationship("Tenant", back_populates="bed", uselist=False)
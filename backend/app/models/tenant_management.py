@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Date, Float, Text, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, Date, Float, Text, DateTime, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -7,7 +7,7 @@ from app.db.base_class import Base
 class Tenant(Base):
     __tablename__ = "tenants"
     id = Column(Integer, primary_key=True, index=True)
-    pg_id = Column(Integer, ForeignKey("pgs.id"))
+    pg_id = Column(Integer, ForeignKey("pgs.id"), index=True)
     bed_id = Column(Integer, ForeignKey("beds.id"), unique=True)
     
     name = Column(String, nullable=False)
@@ -19,14 +19,24 @@ class Tenant(Base):
     check_out_date = Column(Date, nullable=True)
     status = Column(String, default="active") # active, checked_out
     security_deposit = Column(Float, default=0.0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), index=True)
     
     pg = relationship("PG", back_populates="tenants")
     bed = relationship("Bed", back_populates="tenant")
     rent_records = relationship("RentRecord", back_populates="tenant")
+    payments = relationship("Payment", back_populates="tenant")
+    balance = relationship("TenantBalance", back_populates="tenant", uselist=False, cascade="all, delete-orphan")
 
 
 class RentRecord(Base):
     __tablename__ = "rent_records"
+    # One record per tenant per month; payments upsert against this key
+    __table_args__ = (
+        UniqueConstraint("tenant_id", "month", name="uq_rent_records_tenant_month"),
+        # Owner-scoped rent lists and dashboard totals filter by PG and month
+        Index("ix_rent_records_pg_id_month", "pg_id", "month"),
+    )
+
     id = Column(Integer, primary_key=True, index=True)
     tenant_id = Column(Integer, ForeignKey("tenants.id"))
     pg_id = Column(Integer, ForeignKey("pgs.id"))
@@ -36,5 +46,36 @@ class RentRecord(Base):
     amount_paid = Column(Float, default=0.0)
     status = Column(String, default="pending") # pending, paid, partial
     payment_date = Column(Date, nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), index=True)
     
     tenant = relationship("Tenant", back_populates="rent_records")
+
+
+# Append-only ledger of money received; RentRecord.amount_paid/status are derived from it
+class Payment(Base):
+    __tablename__ = "payments"
+    id = Column(Integer, primary_key=True, index=True)
+    tenant_id = Column(Integer, ForeignKey("tenants.id"), index=True)
+    pg_id = Column(Integer, ForeignKey("pgs.id"))
+    rent_record_id = Column(Integer, ForeignKey("rent_records.id"), nullable=True) # Set when paid against one month
+
+    amount = Column(Float, nullable=False) # Negative for corrections
+    payment_date = Column(Date, nullable=False)
+    mode = Column(String, default="cash") # cash, upi, bank_transfer, manual
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    tenant = relationship("Tenant", back_populates="payments")
+
+
+# Per-tenant running totals so a balance lookup is a single-row read
+class TenantBalance(Base):
+    __tablename__ = "tenant_balances"
+    tenant_id = Column(Integer, ForeignKey("tenants.id"), primary_key=True)
+
+    total_due = Column(Float, default=0.0)
+    total_paid = Column(Float, default=0.0)
+    credit = Column(Float, default=0.0) # Advance not yet allocated to a month
+    balance = Column(Float, default=0.0) # Outstanding: total_due - total_paid - credit
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    tenant = relationship("Tenant", back_populates="balance")
@@ -0,0 +1,204 @@
+"""
+Platform-wide month rollover.
+
+At the start of every month (in ROLLOVER_TIMEZONE, Asia/Kolkata by default)
+this creates the month's rent records for every owner's active tenants and
+applies any credit they hold.
+
+    python -m app.scheduler                    # wait for each month start, then roll over
+    python -m app.scheduler --once             # roll over the current month and exit
+    python -m app.scheduler --once --month 2025-03-01 --processes 8
+
+Owners are sharded by owner_id across worker processes. Each shard commits
+its owners in chunks, writing a `rollover_checkpoints` row per owner in the
+same transaction as their rents, so a run that crashes or is stopped resumes
+with the owners it had not finished. Rent generation itself skips existing
+records, so a repeated run is harmless either way.
+"""
+import argparse
+import logging
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+from typing import Callable, Dict, List, Optional
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core import ledger
+from app.core.config import settings
+from app.core.rent_cycle import generate_rents
+from app.db.session import SessionLocal, engine
+from app.db.upsert import insert_for
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SessionFactory = Callable[[], Session]
+
+
+def local_now() -> datetime:
+    return datetime.now(ZoneInfo(settings.ROLLOVER_TIMEZONE))
+
+
+def month_start_at(month: date) -> datetime:
+    """
+    The moment the month starts in the rollover timezone.
+    """
+    return datetime(month.year, month.month, 1, tzinfo=ZoneInfo(settings.ROLLOVER_TIMEZONE))
+
+
+def pending_owners(db: Session, month: date) -> List[int]:
+    """
+    Owners with at least one PG and no checkpoint for the month yet.
+    """
+    done = select(models.RolloverCheckpoint.owner_id).where(models.RolloverCheckpoint.month == month)
+    return list(db.scalars(
+        select(models.PG.owner_id).where(models.PG.owner_id.not_in(done))
+        .distinct().order_by(models.PG.owner_id)
+    ))
+
+
+def roll_over_owners(
+    db: Session, month: date, owner_ids: List[int], chunk_size: int
+) -> Dict[str, int]:
+    """
+    Generate the month's rents for the given owners, one transaction per chunk.
+    """
+    created_count = 0
+    skipped_count = 0
+    for start in range(0, len(owner_ids), chunk_size):
+        chunk = owner_ids[start:start + chunk_size]
+        created, skipped, tenant_ids = generate_rents(db, [month], chunk)
+        ledger.settle_new_rents(db, tenant_ids, month)
+
+        insert = insert_for(db.get_bind())
+        db.execute(
+            insert(models.RolloverCheckpoint).on_conflict_do_nothing(),
+            [{"month": month, "owner_id": owner_id} for owner_id in chunk],
+        )
+        db.commit()
+        created_count += created
+        skipped_count += skipped
+
+    return {"owners": len(owner_ids), "created_count": created_count, "skipped_count": skipped_count}
+
+
+def _init_process() -> None:
+    # Don't reuse pooled connections inherited from the parent process
+    engine.dispose(close=False)
+
+
+def _run_shard(month: date, owner_ids: List[int], chunk_size: int) -> Dict[str, int]:
+    db = SessionLocal()
+    try:
+        return roll_over_owners(db, month, owner_ids, chunk_size)
+    finally:
+        db.close()
+
+
+def run_rollover(
+    month: date,
+    processes: int = settings.ROLLOVER_PROCESSES,
+    chunk_size: int = settings.ROLLOVER_CHUNK_SIZE,
+    session_factory: SessionFactory = SessionLocal,
+) -> Dict[str, float]:
+    """
+    Roll over every pending owner for the month and report throughput and lag.
+    """
+    started = time.perf_counter()
+    db = session_factory()
+    try:
+        owner_ids = pending_owners(db, month)
+        dialect = db.get_bind().dialect.name
+    finally:
+        db.close()
+
+    if dialect == "sqlite":
+        # SQLite allows one writer at a time; extra processes would only contend
+        processes = 1
+    processes = max(1, min(processes, len(owner_ids)))
+
+    if processes == 1:
+        db = session_factory()
+        try:
+            results = [roll_over_owners(db, month, owner_ids, chunk_size)] if owner_ids else []
+        finally:
+            db.close()
+    else:
+        shards = [[o for o in owner_ids if o % processes == shard] for shard in range(processes)]
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_process) as pool:
+            futures = [pool.submit(_run_shard, month, shard, chunk_size) for shard in shards]
+            results = [future.result() for future in futures]
+
+    elapsed = time.perf_counter() - started
+    report = {
+        "month": month.isoformat(),
+        "processes": processes,
+        "owners": sum(r["owners"] for r in results),
+        "created_count": sum(r["created_count"] for r in results),
+        "skipped_count": sum(r["skipped_count"] for r in results),
+        "seconds": round(elapsed, 3),
+        "lag_seconds": round((local_now() - month_start_at(month)).total_seconds(), 1),
+    }
+    report["owners_per_second"] = round(report["owners"] / elapsed, 1) if elapsed else 0.0
+    report["records_per_second"] = round(report["created_count"] / elapsed, 1) if elapsed else 0.0
+    logger.info(
+        "Rollover %(month)s: %(owners)s owners, %(created_count)s records in %(seconds)ss "
+        "(%(owners_per_second)s owners/s, %(records_per_second)s records/s), "
+        "finished %(lag_seconds)ss after month start",
+        report,
+    )
+    return report
+
+
+class Scheduler:
+    def __init__(self, processes: int, chunk_size: int, poll_interval: float = 30.0):
+        self.processes = processes
+        self.chunk_size = chunk_size
+        self.poll_interval = poll_interval
+        self.stopping = False
+
+    def stop(self, *_) -> None:
+        logger.info("Scheduler stopping")
+        self.stopping = True
+
+    def run(self) -> None:
+        last_month: Optional[date] = None
+        while not self.stopping:
+            current = local_now().date().replace(day=1)
+            if current != last_month:
+                # Also catches up on a month whose run was interrupted
+                try:
+                    run_rollover(current, self.processes, self.chunk_size)
+                    last_month = current
+                except Exception:
+                    logger.exception("Rollover for %s failed; retrying", current)
+            time.sleep(self.poll_interval)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Create each month's rent records for all owners.")
+    parser.add_argument("--once", action="store_true", help="Roll over one month and exit")
+    parser.add_argument("--month", type=date.fromisoformat, help="Month to roll over (YYYY-MM-DD), with --once")
+    parser.add_argument("--processes", type=int, default=settings.ROLLOVER_PROCESSES)
+    parser.add_argument("--chunk-size", type=int, default=settings.ROLLOVER_CHUNK_SIZE)
+    parser.add_argument("--poll-interval", type=float, default=30.0, help="Seconds between month checks")
+    args = parser.parse_args()
+
+    if args.once:
+        month = (args.month or local_now().date()).replace(day=1)
+        run_rollover(month, args.processes, args.chunk_size)
+        return
+
+    scheduler = Scheduler(args.processes, args.chunk_size, args.poll_interval)
+    signal.signal(signal.SIGTERM, scheduler.stop)
+    signal.signal(signal.SIGINT, scheduler.stop)
+    scheduler.run()
+
+
+if __name__ == "__main__":
+    main()
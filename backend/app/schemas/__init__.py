@@ -1,3 +1,5 @@
 from .user import User, UserCreate, Token, TokenData
-from .pg import PG, PGCreate, PGUpdate, Room, RoomCreate, RoomUpdate, Bed, BedCreate, BedUpdate, DashboardStats
-from .tenant import Tenant, TenantCreate, TenantUpdate, RentRecord, RentRecordCreate, RentRecordUpdate
+from .pg import PG, PGCreate, PGUpdate, Room, RoomCreate, RoomUpdate, Bed, BedCreate, BedUpdate, DashboardStats, LayoutBed, LayoutRoom, LayoutGenerator, PGLayout, LayoutChanges, PriceRevision, PriceRevisionResult
+from .tenant import Tenant, TenantCreate, TenantUpdate, RentRecord, RentRecordCreate, RentRecordUpdate, RentRecordBulkUpdate, RentRecordBulkResult, RentForecast, PaymentCreate, LumpSumPaymentCreate, Payment, TenantBalance, PaymentAllocation, ReconcileMatch, ReconcileResult, TenantImportRow, TenantImportError, TenantImportResult
+from .job import Job
+from .profile import ProfileSummary
@@ -1,6 +1,6 @@
 from typing import List, Optional
-from pydantic import BaseModel
-from datetime import datetime
+from pydantic import BaseModel, Field, model_validator
+from datetime import date, datetime
 
 class BedBase(BaseModel):
     bed_number: str
@@ -54,6 +54,46 @@ class Room(RoomBase):
         from_attributes = True
 
 
+class LayoutBed(BaseModel):
+    bed_number: str
+    monthly_price: float
+
+class LayoutRoom(BaseModel):
+    room_number: str
+    floor: int
+    type: str
+    beds: List[LayoutBed] = []
+
+class LayoutGenerator(BaseModel):
+    # e.g. floors 1-4 x 8 rooms x beds A-C at 6000: rooms 101..408, beds 101-A..408-C
+    floor_from: int
+    floor_to: int
+    rooms_per_floor: int = Field(..., ge=1, le=99)
+    bed_labels: str = Field(..., min_length=1, description="One character per bed, e.g. 'ABC'")
+    monthly_price: float
+    type: str = "Shared"
+
+class PGLayout(BaseModel):
+    # The full desired structure, or a generator for it; rooms and beds not listed are removed
+    rooms: Optional[List[LayoutRoom]] = None
+    generate: Optional[LayoutGenerator] = None
+
+    @model_validator(mode="after")
+    def one_source(self):
+        if (self.rooms is None) == (self.generate is None):
+            raise ValueError("Give either 'rooms' or 'generate'")
+        return self
+
+class LayoutChanges(BaseModel):
+    dry_run: bool = False
+    rooms_created: int = 0
+    rooms_updated: int = 0
+    rooms_deleted: int = 0
+    beds_created: int = 0
+    beds_updated: int = 0
+    beds_deleted: int = 0
+
+
 class PGBase(BaseModel):
     name: str
     address: Optional[str] = None
@@ -84,3 +124,26 @@ class DashboardStats(BaseModel):
     total_expected_rent: float
     total_collected_rent: float
     total_pending_rent: float
+
+class PriceRevision(BaseModel):
+    # Give percent (e.g. 5 for +5%) or amount (e.g. 500 or -250), not both
+    percent: Optional[float] = Field(None, gt=-100)
+    amount: Optional[float] = None
+    room_type: Optional[str] = None
+    floor: Optional[int] = None
+    effective_month: date  # Pending rent from this month on is re-priced
+
+    @model_validator(mode="after")
+    def one_change(self):
+        if (self.percent is None) == (self.amount is None):
+            raise ValueError("Give either 'percent' or 'amount'")
+        return self
+
+class PriceRevisionResult(BaseModel):
+    dry_run: bool = False
+    beds: int
+    current_monthly_total: float
+    new_monthly_total: float
+    rent_records: int
+    current_rent_due: float
+    new_rent_due: float
@@ -0,0 +1,15 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class ProfileSummary(BaseModel):
+    id: str
+    created_at: str
+    method: str
+    path: str
+    route: Optional[str] = None
+    status: int
+    duration_ms: float
+    samples: int
+    pid: int
@@ -26,6 +26,78 @@ class RentRecord(RentRecordBase):
     class Config:
         from_attributes = True
 
+class RentRecordBulkUpdate(RentRecordUpdate):
+    rent_id: int
+
+class RentRecordBulkResult(BaseModel):
+    rent_id: int
+    updated: bool
+    detail: Optional[str] = None
+    rent: Optional[RentRecord] = None
+
+class RentForecast(BaseModel):
+    month: date
+    expected_rent: float
+    billed_tenants: int
+
+class PaymentCreate(BaseModel):
+    amount: Optional[float] = None  # Defaults to the full amount due
+    month: Optional[date] = None  # Defaults to the current month
+    payment_date: Optional[date] = None  # Defaults to today
+    mode: str = "cash"
+
+class LumpSumPaymentCreate(BaseModel):
+    amount: float
+    payment_date: Optional[date] = None  # Defaults to today
+    mode: str = "cash"
+
+class Payment(BaseModel):
+    id: int
+    tenant_id: Optional[int] = None
+    pg_id: int
+    rent_record_id: Optional[int] = None
+    amount: float
+    payment_date: date
+    mode: str
+
+    class Config:
+        from_attributes = True
+
+class TenantBalance(BaseModel):
+    tenant_id: int
+    total_due: float = 0.0
+    total_paid: float = 0.0
+    credit: float = 0.0
+    balance: float = 0.0
+
+    class Config:
+        from_attributes = True
+
+class PaymentAllocation(BaseModel):
+    payment: Payment
+    rents: List[RentRecord] = []  # Months the payment was applied to, oldest first
+    balance: TenantBalance
+
+class ReconcileMatch(BaseModel):
+    line: int  # Line number in the statement, header is line 1
+    payment_date: date
+    amount: float
+    description: str
+    rent_id: Optional[int] = None
+    tenant_id: Optional[int] = None
+    tenant_name: Optional[str] = None
+    month: Optional[date] = None
+    confidence: float = 0.0
+    applied: bool = False
+
+class ReconcileResult(BaseModel):
+    lines: int
+    credits: int
+    matched: int
+    applied: int
+    matches: List[ReconcileMatch] = []
+    unmatched: List[ReconcileMatch] = []
+
 # --- Minimal Schemas for Relationships ---
 class PGMinimal(BaseModel):
     id: int
@@ -81,3 +153,18 @@ class Tenant(TenantBase):
 
     class Config:
         from_attributes = True
+
+class TenantImportRow(TenantBase):
+    # The bed is given by its room and bed number within the PG being imported into
+    room_number: str
+    bed_number: str
+
+class TenantImportError(BaseModel):
+    row: int  # Line number in the file, header is line 1
+    errors: List[str]
+
+class TenantImportResult(BaseModel):
+    created: int
+    dry_run: bool = False
+    tenant_ids: List[int] = []
+    errors: List[TenantImportError] = []
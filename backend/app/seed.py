@@ -0,0 +1,244 @@
+"""
+Synthetic data at production scale.
+
+Bulk-inserts owners x PGs x rooms x beds x tenants with months of rent
+history and the matching payments and balance snapshots, a chunk of owners
+per transaction, each table with one multi-row INSERT ... RETURNING per
+chunk. Distributions are meant to look like real PGs: room types weighted
+towards doubles, prices by room type and city with some spread, occupancy
+varying per PG around --occupancy, tenures skewed short, vacant beds
+with the tenant who last checked out, and older months mostly paid while the current
+month is still being collected.
+
+    python -m app.seed --owners 1000 --pgs-per-owner 2 --rooms-per-pg 20 --months 12
+
+Owners log in as <prefix><n>@seed.local with --password. The seeder refuses
+to run if the first of those owners already exists.
+"""
+import argparse
+import logging
+import random
+import time
+from datetime import date, timedelta
+from typing import Dict, List
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core import billing, ledger
+from app.core.rent_cycle import month_end, month_range
+from app.core.security import get_password_hash
+from app.db.base import Base
+from app.db.session import SessionLocal, engine
+
+logger = logging.getLogger(__name__)
+
+CITIES = {"Pune": 1.0, "Bengaluru": 1.25, "Mumbai": 1.4, "Hyderabad": 1.05, "Delhi": 1.2, "Chennai": 1.0}
+# type: (beds, base monthly price, weight)
+ROOM_TYPES = {"Single": (1, 9000.0, 15), "Double": (2, 6500.0, 45), "Triple": (3, 5500.0, 25), "Quad": (4, 4500.0, 15)}
+ROOMS_PER_FLOOR = 10
+FIRST_NAMES = [
+    "Aarav", "Aditi", "Akash", "Ananya", "Arjun", "Asha", "Deepak", "Divya", "Farah", "Gaurav", "Imran", "Isha",
+    "Karan", "Kavya", "Manish", "Meera", "Neha", "Nikhil", "Pooja", "Priya", "Rahul", "Ravi", "Rohit", "Sana",
+    "Sanjay", "Shreya", "Sneha", "Suresh", "Tanvi", "Varun", "Vikram", "Zoya",
+]
+LAST_NAMES = [
+    "Bose", "Das", "Dsouza", "Gupta", "Iyer", "Joshi", "Khan", "Kulkarni", "Kumar", "Mehta", "Menon", "Nair",
+    "Patel", "Patil", "Pillai", "Rao", "Reddy", "Shaikh", "Sharma", "Singh", "Verma", "Yadav",
+]
+PAYMENT_MODES = ["upi"] * 7 + ["cash"] * 2 + ["bank_transfer"]
+
+
+def _insert_returning(db: Session, model, rows: List[dict]) -> List[int]:
+    if not rows:
+        return []
+    # Core insert: the ORM bulk path splits the rows into a batch per run of the same None columns
+    table = model.__table__
+    return db.scalars(insert(table).returning(table.c.id, sort_by_parameter_order=True), rows).all()
+
+
+def _tenure_start(rng: random.Random, first_month: date, as_of: date) -> date:
+    # Most stays are short; a few tenants have been there since before the history starts
+    months_ago = min(int(rng.expovariate(1 / 7)), 36)
+    year, month = divmod(as_of.year * 12 + as_of.month - 1 - months_ago, 12)
+    start = date(year, month + 1, rng.randint(1, 28))
+    return min(max(start, first_month - timedelta(days=365)), as_of)
+
+
+def _seed_chunk(
+    db: Session, owner_numbers: range, rng: random.Random, args, months: List[date], as_of: date, password_hash: str
+) -> Dict[str, int]:
+    counts = dict.fromkeys(["owners", "pgs", "rooms", "beds", "tenants", "rent_records", "payments"], 0)
+
+    owner_ids = _insert_returning(db, models.User, [
+        {"email": f"{args.email_prefix}{n}@seed.local", "hashed_password": password_hash,
+         "full_name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}", "is_active": True}
+        for n in owner_numbers
+    ])
+    pg_rows = []
+    for owner_id in owner_ids:
+        for p in range(args.pgs_per_owner):
+            city = rng.choice(list(CITIES))
+            pg_rows.append({"owner_id": owner_id, "name": f"{rng.choice(LAST_NAMES)} Residency {p + 1}",
+                            "address": f"{rng.randint(1, 300)} Main Road", "city": city})
+    pg_ids = _insert_returning(db, models.PG, pg_rows)
+
+    room_rows, room_specs = [], []
+    for pg_id, pg in zip(pg_ids, pg_rows):
+        for r in range(args.rooms_per_pg):
+            floor = r // ROOMS_PER_FLOOR + 1
+            room_type = rng.choices(list(ROOM_TYPES), weights=[spec[2] for spec in ROOM_TYPES.values()])[0]
+            room_rows.append({"pg_id": pg_id, "room_number": f"{floor}{r % ROOMS_PER_FLOOR + 1:02d}",
+                              "floor": floor, "type": room_type})
+            room_specs.append((pg_id, pg["city"], room_type))
+    room_ids = _insert_returning(db, models.Room, room_rows)
+
+    occupancy = {pg_id: min(1.0, max(0.3, rng.gauss(args.occupancy, 0.08))) for pg_id in pg_ids}
+    bed_rows, bed_pgs = [], []
+    for room_id, room, (pg_id, city, room_type) in zip(room_ids, room_rows, room_specs):
+        beds, base_price, _ = ROOM_TYPES[room_type]
+        price = round(base_price * CITIES[city] * rng.uniform(0.9, 1.1), -2)
+        for b in range(beds):
+            bed_rows.append({"room_id": room_id, "bed_number": f"{room['room_number']}-{'ABCD'[b]}",
+                             "monthly_price": price, "is_occupied": rng.random() < occupancy[pg_id]})
+            bed_pgs.append(pg_id)
+    bed_ids = _insert_returning(db, models.Bed, bed_rows)
+
+    tenant_rows = []
+    for bed_id, bed, pg_id in zip(bed_ids, bed_rows, bed_pgs):
+        if bed["is_occupied"]:
+            check_in = _tenure_start(rng, months[0], as_of)
+            tenant_rows.append(_tenant(rng, pg_id, bed_id, check_in, None, bed["monthly_price"]))
+        elif rng.random() < 0.6:
+            # Checked-out tenants keep their bed_id, so a vacant bed remembers its last occupant
+            check_out = as_of - timedelta(days=rng.randint(1, 90))
+            check_in = _tenure_start(rng, months[0], check_out)
+            if check_in < check_out:
+                tenant_rows.append(_tenant(rng, pg_id, bed_id, check_in, check_out, bed["monthly_price"]))
+    tenant_ids = _insert_returning(db, models.Tenant, [
+        {key: value for key, value in row.items() if key != "price"} for row in tenant_rows
+    ])
+
+    pairs = [
+        (tenant_id, row, month)
+        for tenant_id, row in zip(tenant_ids, tenant_rows)
+        for month in months
+        if row["check_in_date"] <= month_end(month)
+        and (row["check_out_date"] is None or row["check_out_date"] >= month)
+    ]
+    amounts = billing.bill_pairs(
+        [row["check_in_date"] for _, row, _ in pairs],
+        [row["check_out_date"] for _, row, _ in pairs],
+        [row["price"] for _, row, _ in pairs],
+        [month for _, _, month in pairs],
+    )
+    rent_rows = []
+    for (tenant_id, row, month), amount in zip(pairs, amounts):
+        amount = float(amount)
+        if amount <= 0:
+            continue
+        current = month == months[-1]
+        roll = rng.random()
+        if roll < (0.55 if current else 0.93):
+            status, paid = "paid", amount
+        elif roll < (0.65 if current else 0.96):
+            status, paid = "partial", round(amount * rng.choice([0.25, 0.5, 0.75]), 2)
+        else:
+            status, paid = "pending", 0.0
+        paid_on = min(as_of, max(row["check_in_date"], month) + timedelta(days=rng.randint(0, 9))) if paid else None
+        rent_rows.append({"tenant_id": tenant_id, "pg_id": row["pg_id"], "month": month, "amount_due": amount,
+                          "amount_paid": paid, "status": status, "payment_date": paid_on})
+    rent_ids = _insert_returning(db, models.RentRecord, rent_rows)
+
+    payment_rows = [
+        {"tenant_id": rent["tenant_id"], "pg_id": rent["pg_id"], "rent_record_id": rent_id,
+         "amount": rent["amount_paid"], "payment_date": rent["payment_date"], "mode": rng.choice(PAYMENT_MODES)}
+        for rent_id, rent in zip(rent_ids, rent_rows)
+        if rent["amount_paid"]
+    ]
+    if payment_rows:
+        db.execute(insert(models.Payment.__table__), payment_rows)
+    db.flush()
+    ledger.refresh_balances(db, tenant_ids)
+
+    counts.update(owners=len(owner_ids), pgs=len(pg_ids), rooms=len(room_ids), beds=len(bed_ids),
+                  tenants=len(tenant_ids), rent_records=len(rent_ids), payments=len(payment_rows))
+    return counts
+
+
+def _tenant(rng: random.Random, pg_id: int, bed_id, check_in: date, check_out, price: float) -> dict:
+    return {
+        "pg_id": pg_id,
+        "bed_id": bed_id,
+        "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+        "phone": f"{rng.choice('6789')}{rng.randint(0, 10**9 - 1):09d}",
+        "check_in_date": check_in,
+        "check_out_date": check_out,
+        "status": "active" if check_out is None else "checked_out",
+        "security_deposit": round(price * rng.choice([0, 1, 1, 2]), -2),
+        "price": price,
+    }
+
+
+def seed(db: Session, args, as_of: date) -> Dict[str, int]:
+    """
+    Insert the synthetic data described by `args`, committing every
+    --chunk-owners owners. Returns the number of rows per table.
+    """
+    rng = random.Random(args.seed)
+    first = date(as_of.year, as_of.month, 1)
+    year, month = divmod(first.year * 12 + first.month - args.months, 12)
+    months = month_range(date(year, month + 1, 1), first)
+    password_hash = get_password_hash(args.password)
+
+    totals: Dict[str, int] = {}
+    for start in range(1, args.owners + 1, args.chunk_owners):
+        numbers = range(start, min(start + args.chunk_owners, args.owners + 1))
+        counts = _seed_chunk(db, numbers, rng, args, months, as_of, password_hash)
+        db.commit()
+        for key, value in counts.items():
+            totals[key] = totals.get(key, 0) + value
+        logger.info("Seeded owners %d-%d", numbers[0], numbers[-1])
+    return totals
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--owners", type=int, default=100)
+    parser.add_argument("--pgs-per-owner", type=int, default=2)
+    parser.add_argument("--rooms-per-pg", type=int, default=20)
+    parser.add_argument("--months", type=int, default=12, help="Months of rent history, including the current one")
+    parser.add_argument("--occupancy", type=float, default=0.85, help="Mean share of occupied beds")
+    parser.add_argument("--as-of", type=date.fromisoformat, default=date.today(), help="Today, for the data")
+    parser.add_argument("--email-prefix", default="owner")
+    parser.add_argument("--password", default="password123")
+    parser.add_argument("--chunk-owners", type=int, default=50, help="Owners per transaction")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed, for repeatable data")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        if db.scalar(select(models.User.id).where(models.User.email == f"{args.email_prefix}1@seed.local")):
+            logger.error("%s1@seed.local already exists; pick another --email-prefix", args.email_prefix)
+            return 1
+        start = time.perf_counter()
+        totals = seed(db, args, args.as_of)
+        seconds = time.perf_counter() - start
+    finally:
+        db.close()
+
+    rows = sum(totals.values())
+    logger.info("Seeded %s in %.1fs (%d rows/s)",
+                ", ".join(f"{value:,} {key}" for key, value in totals.items()), seconds, rows / seconds)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,70 @@
+"""
+Background job worker.
+
+    python -m app.worker            # run until stopped
+    python -m app.worker --once     # drain the queue and exit
+"""
+import argparse
+import logging
+import os
+import signal
+import socket
+import time
+
+from app.core import jobs
+from app.core import job_handlers  # noqa: F401 (registers handlers)
+from app.db.session import SessionLocal
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class Worker:
+    def __init__(self, worker_id: str, poll_interval: float = 1.0):
+        self.worker_id = worker_id
+        self.poll_interval = poll_interval
+        self.stopping = False
+
+    def stop(self, *_) -> None:
+        logger.info("Worker %s stopping after the current job", self.worker_id)
+        self.stopping = True
+
+    def run(self, once: bool = False) -> int:
+        processed = 0
+        while not self.stopping:
+            db = SessionLocal()
+            try:
+                ran = jobs.run_next(db, self.worker_id)
+            except Exception:
+                logger.exception("Worker %s could not claim a job", self.worker_id)
+                ran = False
+            finally:
+                db.close()
+
+            if ran:
+                processed += 1
+                continue
+            if once:
+                break
+            time.sleep(self.poll_interval)
+        return processed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run background jobs from the jobs table.")
+    parser.add_argument("--once", action="store_true", help="Exit when no job is runnable")
+    parser.add_argument("--poll-interval", type=float, default=1.0, help="Seconds to wait when idle")
+    parser.add_argument("--worker-id", default=f"{socket.gethostname()}:{os.getpid()}")
+    args = parser.parse_args()
+
+    worker = Worker(args.worker_id, args.poll_interval)
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+
+    logger.info("Worker %s started", worker.worker_id)
+    processed = worker.run(once=args.once)
+    logger.info("Worker %s processed %s jobs", worker.worker_id, processed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark for the batched billing engine.
+
+Bills tenants x months (100k tenant-months by default) with bill_grid and
+bill_pairs, and compares against a plain Python loop doing the same
+per-tenant proration. Exits non-zero if bill_grid exceeds the budget.
+
+    cd backend
+    python -m benchmarks.bench_billing --tenants 10000 --months 10 --budget 1.0
+"""
+import argparse
+import calendar
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+from app.core import billing
+from app.core.rent_cycle import month_range
+
+
+def python_loop(stays, months):
+    # Reference: one call per tenant-month, as calculate_prorated_rent used to be used
+    out = []
+    for check_in, check_out, price in stays:
+        for month in months:
+            total_days = calendar.monthrange(month.year, month.month)[1]
+            last = date(month.year, month.month, total_days)
+            first_day = max(check_in, month)
+            last_day = min(check_out, last) if check_out else last
+            days = max((last_day - first_day).days + 1, 0)
+            out.append(price if days == total_days else round(price / total_days * days, 2))
+    return out
+
+
+def best_of(repeats, fn):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tenants", type=int, default=10_000)
+    parser.add_argument("--months", type=int, default=10)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=1.0, help="Seconds allowed for bill_grid")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    first_month = date(2024, 1, 1)
+    months = month_range(first_month, date(first_month.year + args.months // 12 + 1, 1, 1))[:args.months]
+
+    stays = []
+    for _ in range(args.tenants):
+        check_in = first_month + timedelta(days=rng.randrange(-365, 300))
+        check_out = check_in + timedelta(days=rng.randrange(30, 400)) if rng.random() < 0.2 else None
+        stays.append((check_in, check_out, float(rng.choice([4500, 5000, 6000, 7500, 9000]))))
+
+    check_in = [s[0] for s in stays]
+    check_out = [s[1] for s in stays]
+    prices = [s[2] for s in stays]
+    pair_in = [c for c in check_in for _ in months]
+    pair_out = [c for c in check_out for _ in months]
+    pair_price = [p for p in prices for _ in months]
+    pair_month = months * len(stays)
+
+    cells = len(stays) * len(months)
+    grid = best_of(args.repeats, lambda: billing.bill_grid(check_in, check_out, prices, months))
+    pairs = best_of(args.repeats, lambda: billing.bill_pairs(pair_in, pair_out, pair_price, pair_month))
+    loop = best_of(1, lambda: python_loop(stays, months))
+
+    expected = python_loop(stays, months)
+    actual = billing.bill_grid(check_in, check_out, prices, months).ravel()
+    mismatches = int((abs(actual - expected) > 0.01).sum())
+
+    print(f"tenant-months: {cells:,}")
+    print(f"bill_grid:    {grid * 1000:8.1f} ms  ({cells / grid:,.0f} /s)")
+    print(f"bill_pairs:   {pairs * 1000:8.1f} ms  ({cells / pairs:,.0f} /s)")
+    print(f"python loop:  {loop * 1000:8.1f} ms  ({cells / loop:,.0f} /s)")
+    print(f"mismatches vs loop: {mismatches}")
+
+    if mismatches:
+        print("FAIL: bill_grid disagrees with the reference loop")
+        return 1
+    if grid > args.budget:
+        print(f"FAIL: bill_grid took {grid:.3f}s, budget {args.budget:.3f}s")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+"""
+Benchmark for connection churn: pooled vs per-transaction connections, direct
+to Postgres and through a transaction-mode pooler such as PgBouncer.
+
+Runs the same short transaction (the configured SET LOCAL timeouts and one
+SELECT) from --concurrency threads with engines built by
+app.db.session.make_engine, in these modes:
+
+  - direct-pool:  a QueuePool per worker straight to Postgres (the default setup)
+  - direct-null:  a new Postgres connection for every transaction
+  - pooler-null:  a new pooler connection for every transaction (DB_TRANSACTION_POOLER)
+  - pooler-pool:  a small QueuePool in front of the pooler (DB_POOL_SIZE=2)
+
+The pooler modes run only with --pooler-url. For each mode it prints
+transactions/s, latency percentiles and how many server connections Postgres
+opened (pg_stat_database.sessions, Postgres 14+), which is the churn a pooler
+absorbs.
+
+    cd backend
+    python -m benchmarks.bench_pooler --url postgresql://localhost/pgkhata \\
+        --pooler-url postgresql://localhost:6432/pgkhata --transactions 5000 --concurrency 16
+"""
+import os
+import sys
+
+# Settings are read at import time, so fill them in before importing the app
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+os.environ.setdefault("ADMIN_PASSWORD", "bench-admin")
+
+import argparse  # noqa: E402
+import statistics  # noqa: E402
+import time  # noqa: E402
+from concurrent.futures import ThreadPoolExecutor  # noqa: E402
+from typing import Dict, List, Optional  # noqa: E402
+
+from sqlalchemy import create_engine, text  # noqa: E402
+from sqlalchemy.engine import make_url  # noqa: E402
+from sqlalchemy.pool import NullPool  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.db.session import make_engine  # noqa: E402
+
+MODES = {
+    "direct-pool": {"DB_TRANSACTION_POOLER": False, "DB_POOL_SIZE": None},
+    "direct-null": {"DB_TRANSACTION_POOLER": False, "DB_POOL_SIZE": 0},
+    "pooler-null": {"DB_TRANSACTION_POOLER": True, "DB_POOL_SIZE": None},
+    "pooler-pool": {"DB_TRANSACTION_POOLER": True, "DB_POOL_SIZE": 2},
+}
+
+
+def server_sessions(url: str) -> Optional[int]:
+    """Sessions Postgres has opened on the database so far, or None before Postgres 14."""
+    engine = create_engine(url, poolclass=NullPool)
+    try:
+        with engine.connect() as conn:
+            if conn.dialect.server_version_info < (14,):
+                return None
+            return conn.execute(
+                text("SELECT sessions FROM pg_stat_database WHERE datname = current_database()")
+            ).scalar()
+    finally:
+        engine.dispose()
+
+
+def run_mode(url: str, transactions: int, concurrency: int) -> List[float]:
+    engine = make_engine(make_url(url))
+
+    def transaction(_) -> float:
+        start = time.perf_counter()
+        with engine.begin() as conn:
+            conn.execute(text("SELECT now()")).scalar()
+        return time.perf_counter() - start
+
+    try:
+        with ThreadPoolExecutor(concurrency) as executor:
+            return list(executor.map(transaction, range(transactions)))
+    finally:
+        engine.dispose()
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=os.environ["DATABASE_URL"], help="Postgres, connected to directly")
+    parser.add_argument("--pooler-url", help="The same database through a transaction-mode pooler")
+    parser.add_argument("--transactions", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--statement-timeout-ms", type=int, default=settings.DB_STATEMENT_TIMEOUT_MS)
+    parser.add_argument("--idle-timeout-ms", type=int, default=settings.DB_IDLE_IN_TRANSACTION_TIMEOUT_MS)
+    args = parser.parse_args(argv)
+
+    if not args.url.startswith("postgresql"):
+        parser.error("--url (or DATABASE_URL) must be a Postgres database")
+    settings.DB_STATEMENT_TIMEOUT_MS = args.statement_timeout_ms
+    settings.DB_IDLE_IN_TRANSACTION_TIMEOUT_MS = args.idle_timeout_ms
+    settings.SLOW_QUERY_MS = 0
+
+    results: Dict[str, List[float]] = {}
+    print(f"{'mode':<12} {'tx/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'server conns':>13}")
+    for mode, overrides in MODES.items():
+        url = args.pooler_url if mode.startswith("pooler") else args.url
+        if url is None:
+            continue
+        for name, value in overrides.items():
+            setattr(settings, name, value)
+        before = server_sessions(args.url)
+        start = time.perf_counter()
+        results[mode] = run_mode(url, args.transactions, args.concurrency)
+        elapsed = time.perf_counter() - start
+        after = server_sessions(args.url)
+        # The counting connection itself is one session
+        opened = "n/a" if before is None else str(after - before - 1)
+        latencies = [seconds * 1000 for seconds in results[mode]]
+        print(f"{mode:<12} {args.transactions / elapsed:>8.0f} {statistics.median(latencies):>8.2f} "
+              f"{_percentile(latencies, 95):>8.2f} {_percentile(latencies, 99):>8.2f} {opened:>13}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
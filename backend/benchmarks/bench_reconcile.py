@@ -0,0 +1,138 @@
+"""
+Benchmark for bank statement reconciliation.
+
+Seeds one owner with tenants and two months of open rent into an empty
+database, builds a synthetic UPI statement (payer names truncated or
+abbreviated the way banks print them, some with the payer's phone, plus
+unrelated credits and debits) and times reconcile() on it. Prints the time,
+lines/s and how many confident matches picked the intended tenant.
+
+    cd backend
+    python -m benchmarks.bench_reconcile --tenants 5000 --lines 10000
+"""
+import os
+import sys
+import tempfile
+
+# Settings are read at import time, so fill them in before importing the app
+_DB_FILE = os.path.join(tempfile.gettempdir(), "pgkhata_bench_reconcile.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_DB_FILE}")
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+os.environ.setdefault("ADMIN_PASSWORD", "bench-admin")
+
+import argparse  # noqa: E402
+import random  # noqa: E402
+import time  # noqa: E402
+from datetime import date, timedelta  # noqa: E402
+
+from sqlalchemy import func, select  # noqa: E402
+
+from app import models  # noqa: E402
+from app.core import reconcile  # noqa: E402
+from app.db.base import Base  # noqa: E402
+from app.db.session import SessionLocal, engine  # noqa: E402
+from benchmarks.bench_rollover import BEDS_PER_ROOM, insert_batched  # noqa: E402
+
+FIRST = ["Ravi", "Asha", "Imran", "Priya", "Suresh", "Neha", "Arjun", "Kavya", "Rahul", "Sneha",
+         "Vikram", "Pooja", "Amit", "Divya", "Karan", "Meera", "Rohit", "Anjali", "Sanjay", "Farah"]
+LAST = ["Kumar", "Patil", "Shaikh", "Iyer", "Reddy", "Sharma", "Nair", "Gupta", "Dsouza", "Joshi",
+        "Menon", "Verma", "Rao", "Das", "Kulkarni", "Pillai", "Bose", "Khan", "Mehta", "Singh"]
+PRICES = [4500.0, 5000.0, 5500.0, 6000.0, 6500.0, 7000.0, 8000.0]
+MONTHS = [date(2025, 1, 1), date(2025, 2, 1)]
+
+
+def seed(db, tenants: int, rng: random.Random) -> list:
+    rooms = -(-tenants // BEDS_PER_ROOM)
+    people = []
+    for t in range(1, tenants + 1):
+        name = f"{rng.choice(FIRST)} {rng.choice(LAST)}"
+        people.append({"id": t, "name": name, "phone": f"9{t:09d}", "price": rng.choice(PRICES)})
+
+    insert_batched(db, models.User, [{"id": 1, "email": "owner@bench.local", "hashed_password": "x", "is_active": True}])
+    insert_batched(db, models.PG, [{"id": 1, "owner_id": 1, "name": "Bench PG"}])
+    insert_batched(db, models.Room, [
+        {"id": r, "pg_id": 1, "room_number": str(100 + r), "floor": r // 10, "type": "Quad"} for r in range(1, rooms + 1)
+    ])
+    insert_batched(db, models.Bed, [
+        {"id": p["id"], "room_id": (p["id"] - 1) // BEDS_PER_ROOM + 1, "bed_number": f"B{p['id']}",
+         "is_occupied": True, "monthly_price": p["price"]}
+        for p in people
+    ])
+    insert_batched(db, models.Tenant, [
+        {"id": p["id"], "pg_id": 1, "bed_id": p["id"], "name": p["name"], "phone": p["phone"],
+         "check_in_date": date(2024, 6, 1), "status": "active"}
+        for p in people
+    ])
+    insert_batched(db, models.RentRecord, [
+        {"tenant_id": p["id"], "pg_id": 1, "month": month, "amount_due": p["price"], "amount_paid": 0.0,
+         "status": "pending"}
+        for month in MONTHS for p in people
+    ])
+    db.commit()
+    return people
+
+
+def narration(person: dict, rng: random.Random) -> str:
+    first, last = person["name"].upper().split()
+    payer = rng.choice([f"{first} {last}", f"{first} {last[0]}", f"{first[:8]} {last[:6]}", f"{last} {first}"])
+    handle = f"{person['phone']}@ybl" if rng.random() < 0.4 else f"{first.lower()}{rng.randint(1, 99)}@okaxis"
+    return f"UPI/CR/{rng.randint(10**11, 10**12 - 1)}/{payer}/{handle}"
+
+
+def statement(people: list, lines: int, rng: random.Random) -> tuple:
+    rows, intended = [], {}
+    for line in range(2, lines + 2):
+        kind = rng.random()
+        paid_on = date(2025, 1, 1) + timedelta(days=rng.randint(0, 58))
+        if kind < 0.8:
+            person = rng.choice(people)
+            intended[line] = person["id"]
+            rows.append({"txn_date": paid_on.strftime("%d/%m/%Y"), "narration": narration(person, rng),
+                         "credit": f"{person['price']:,.2f}"})
+        elif kind < 0.9:
+            rows.append({"txn_date": paid_on.strftime("%d/%m/%Y"), "narration": "NEFT/SALARY/ACME LTD",
+                         "credit": f"{rng.randint(20, 90) * 1000:,.2f}"})
+        else:
+            rows.append({"txn_date": paid_on.strftime("%d/%m/%Y"), "narration": "POS/GROCERY",
+                         "debit": f"{rng.randint(100, 5000):.2f}"})
+    return rows, intended
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tenants", type=int, default=5_000)
+    parser.add_argument("--lines", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        if db.scalar(select(func.count()).select_from(models.User)):
+            print(f"Refusing to seed: {engine.url.render_as_string()} is not empty")
+            return 1
+        people = seed(db, args.tenants, rng)
+        rows, intended = statement(people, args.lines, rng)
+
+        start = time.perf_counter()
+        result = reconcile.reconcile(db, 1, enumerate(rows, start=2), auto_apply=True)
+        seconds = time.perf_counter() - start
+        db.rollback()
+
+        confident = [m for m in result.matches if m.applied]
+        right = sum(1 for m in confident if intended.get(m.line) == m.tenant_id)
+        print(f"reconcile: {seconds:.2f}s for {result.lines:,} lines / {args.tenants:,} tenants "
+              f"({result.lines / seconds:,.0f} lines/s)")
+        print(f"credits:   {result.credits:,}, matched {result.matched:,}, applied {result.applied:,}")
+        print(f"applied to the intended tenant: {right:,} of {len(confident):,}")
+    finally:
+        db.close()
+        if engine.url.database == _DB_FILE:
+            engine.dispose()
+            os.remove(_DB_FILE)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
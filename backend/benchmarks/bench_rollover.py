@@ -0,0 +1,103 @@
+"""
+Benchmark for the month rollover scheduler.
+
+Seeds owners (one PG each) with active tenants into an empty database, then
+times run_rollover for one month and prints owners/s and records/s. The
+full-scale run is 10k owners x 100 tenants (1M tenants); the default is a
+tenth of that. Point DATABASE_URL at an empty Postgres database to measure
+the multi-process path; the SQLite default always runs in one process.
+
+    cd backend
+    python -m benchmarks.bench_rollover --owners 10000 --tenants-per-owner 100 --processes 8
+"""
+import os
+import sys
+import tempfile
+
+# Settings are read at import time, so fill them in before importing the app
+_DB_FILE = os.path.join(tempfile.gettempdir(), "pgkhata_bench_rollover.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_DB_FILE}")
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+os.environ.setdefault("ADMIN_PASSWORD", "bench-admin")
+
+import argparse  # noqa: E402
+import time  # noqa: E402
+from datetime import date  # noqa: E402
+
+from sqlalchemy import func, insert, select  # noqa: E402
+
+from app import models  # noqa: E402
+from app.db.base import Base  # noqa: E402
+from app.db.session import SessionLocal, engine  # noqa: E402
+from app.scheduler import run_rollover  # noqa: E402
+
+BEDS_PER_ROOM = 4
+BATCH = 50_000
+
+
+def insert_batched(db, model, rows):
+    for start in range(0, len(rows), BATCH):
+        db.execute(insert(model), rows[start:start + BATCH])
+
+
+def seed(db, owners: int, tenants_per_owner: int) -> None:
+    rooms_per_owner = -(-tenants_per_owner // BEDS_PER_ROOM)
+    users, pgs, rooms, beds, tenants = [], [], [], [], []
+    for owner_id in range(1, owners + 1):
+        users.append({"id": owner_id, "email": f"owner{owner_id}@bench.local", "hashed_password": "x", "is_active": True})
+        pgs.append({"id": owner_id, "owner_id": owner_id, "name": f"PG {owner_id}"})
+        for r in range(rooms_per_owner):
+            room_id = (owner_id - 1) * rooms_per_owner + r + 1
+            rooms.append({"id": room_id, "pg_id": owner_id, "room_number": str(100 + r), "floor": r // 10, "type": "Quad"})
+        for t in range(tenants_per_owner):
+            bed_id = (owner_id - 1) * tenants_per_owner + t + 1
+            room_id = (owner_id - 1) * rooms_per_owner + t // BEDS_PER_ROOM + 1
+            beds.append({"id": bed_id, "room_id": room_id, "bed_number": f"B{t}", "is_occupied": True, "monthly_price": 6000.0})
+            tenants.append({
+                "id": bed_id, "pg_id": owner_id, "bed_id": bed_id, "name": f"Tenant {bed_id}",
+                "phone": f"9{bed_id:09d}", "check_in_date": date(2024, 1, (t % 28) + 1), "status": "active",
+            })
+
+    for model, rows in [
+        (models.User, users), (models.PG, pgs), (models.Room, rooms), (models.Bed, beds), (models.Tenant, tenants)
+    ]:
+        insert_batched(db, model, rows)
+    db.commit()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--owners", type=int, default=1_000)
+    parser.add_argument("--tenants-per-owner", type=int, default=100)
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--chunk-size", type=int, default=100)
+    parser.add_argument("--month", type=date.fromisoformat, default=date(2025, 1, 1))
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        if db.scalar(select(func.count()).select_from(models.User)):
+            print(f"Refusing to seed: {engine.url.render_as_string()} is not empty")
+            return 1
+        start = time.perf_counter()
+        seed(db, args.owners, args.tenants_per_owner)
+        print(f"seeded {args.owners:,} owners / {args.owners * args.tenants_per_owner:,} tenants "
+              f"in {time.perf_counter() - start:.1f}s")
+    finally:
+        db.close()
+
+    try:
+        report = run_rollover(args.month, args.processes, args.chunk_size)
+        print(f"rollover:  {report['seconds']:.2f}s with {report['processes']} process(es)")
+        print(f"owners/s:  {report['owners_per_second']:,.0f}")
+        print(f"records/s: {report['records_per_second']:,.0f}  ({report['created_count']:,} records)")
+    finally:
+        if engine.url.database == _DB_FILE:
+            engine.dispose()
+            os.remove(_DB_FILE)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""
+Benchmark for worker cold starts.
+
+Measures, each in fresh processes:
+  - import: `import app.main` in a new interpreter, with the slowest imports
+    (from python -X importtime)
+  - serve: launching the server command until the first successful response
+
+and exits with status 1 if the median time to first response is over
+--budget-ms. The default server is gunicorn with gunicorn.conf.py (preloaded,
+one uvicorn worker) against a throwaway SQLite database; point DATABASE_URL at
+Postgres to include connecting to it.
+
+    cd backend
+    python -m benchmarks.bench_startup --runs 5 --budget-ms 3000
+    python -m benchmarks.bench_startup --server "uvicorn app.main:app --port {port}"
+"""
+import argparse
+import os
+import shlex
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SERVER = "gunicorn -w 1 -k uvicorn.workers.UvicornWorker app.main:app --bind 127.0.0.1:{port}"
+
+
+def _env() -> Dict[str, str]:
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.gettempdir(), 'pgkhata_bench_startup.db')}")
+    env.setdefault("SECRET_KEY", "bench-secret")
+    env.setdefault("ADMIN_PASSWORD", "bench-admin")
+    return env
+
+
+def time_import() -> Tuple[float, List[Tuple[int, str]]]:
+    """
+    Wall time of `import app.main` in a new interpreter, and (cumulative us,
+    module) for every module it imported.
+    """
+    code = "import time; t = time.perf_counter(); import app.main; print(time.perf_counter() - t)"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=BACKEND_DIR, env=_env(), capture_output=True, text=True, check=True,
+    )
+    modules = []
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line and "cumulative" not in line:
+            _, cumulative, name = line.split("|")
+            modules.append((int(cumulative), name.rstrip()))
+    return float(result.stdout.strip()), modules
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def time_first_response(server: str, path: str, timeout: float) -> float:
+    port = _free_port()
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        shlex.split(server.format(port=port)),
+        cwd=BACKEND_DIR, env=_env(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    # One client for all polls: building one per request costs enough CPU to slow a server
+    # starting on a single core
+    client = httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=1.0)
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                if client.get(path).status_code < 500:
+                    return time.perf_counter() - start
+            except httpx.TransportError:
+                pass
+            if process.poll() is not None:
+                raise RuntimeError(f"Server exited with status {process.returncode}")
+            time.sleep(0.02)
+        raise RuntimeError(f"No response from {path} within {timeout}s")
+    finally:
+        client.close()
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--server", default=DEFAULT_SERVER, help="Server command; {port} is filled in")
+    parser.add_argument("--path", default="/healthz", help="Path polled for the first response")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--top", type=int, default=15, help="Slowest imports to list")
+    parser.add_argument("--budget-ms", type=float, help="Fail if the median time to first response is over this")
+    args = parser.parse_args(argv)
+
+    imports, modules = [], []
+    for _ in range(args.runs):
+        seconds, modules = time_import()
+        imports.append(seconds * 1000)
+    print(f"import app.main    median {statistics.median(imports):7.0f} ms   min {min(imports):7.0f} ms")
+    print("Slowest imports (cumulative, last run):")
+    top_level = {}
+    for cumulative, name in modules:
+        # Nested modules are indented under their importer; keep each module's own line
+        top_level[name.strip()] = max(top_level.get(name.strip(), 0), cumulative)
+    for name, cumulative in sorted(top_level.items(), key=lambda item: -item[1])[1:args.top + 1]:
+        print(f"  {cumulative / 1000:7.1f} ms  {name}")
+
+    serves = [time_first_response(args.server, args.path, args.timeout) * 1000 for _ in range(args.runs)]
+    median = statistics.median(serves)
+    print(f"first response     median {median:7.0f} ms   min {min(serves):7.0f} ms   ({args.server.split()[0]})")
+
+    if args.budget_ms is not None and median > args.budget_ms:
+        print(f"Over the {args.budget_ms:g} ms budget", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
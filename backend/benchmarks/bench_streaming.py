@@ -0,0 +1,148 @@
+"""
+Benchmark for the streaming list endpoints.
+
+Seeds one owner with N tenants (100k by default) and a month of rent, then
+requests GET /tenants/ and GET /rents/ with limit=N buffered, as a streamed
+JSON array (?stream=1) and as NDJSON. Each request runs in a fresh process
+against the ASGI app so peak RSS is measured per mode, next to the peak
+after importing the app; time to first byte is when the app sends its first
+non-empty body chunk.
+
+    cd backend
+    python -m benchmarks.bench_streaming --tenants 100000
+"""
+import os
+import sys
+import tempfile
+
+_DB_FILE = os.path.join(tempfile.gettempdir(), "pgkhata_bench_streaming.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_DB_FILE}")
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+os.environ.setdefault("ADMIN_PASSWORD", "bench-admin")
+
+import argparse  # noqa: E402
+import asyncio  # noqa: E402
+import json  # noqa: E402
+import resource  # noqa: E402
+import subprocess  # noqa: E402
+import time  # noqa: E402
+from datetime import date  # noqa: E402
+
+MODES = {
+    "buffered": ({}, "application/json"),
+    "stream": ({"stream": "1"}, "application/json"),
+    "ndjson": ({}, "application/x-ndjson"),
+}
+ENDPOINTS = ["/tenants/", "/rents/"]
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def request(app, path: str, query: str, headers: dict) -> dict:
+    timings = {"start": time.perf_counter(), "first_byte": None, "bytes": 0, "status": None}
+    request_sent = False
+    response_done = asyncio.Event()
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # Like a real server: report a disconnect only once the response is over
+        await response_done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            timings["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            if message.get("body"):
+                if timings["first_byte"] is None:
+                    timings["first_byte"] = time.perf_counter()
+                timings["bytes"] += len(message["body"])
+            if not message.get("more_body"):
+                response_done.set()
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": query.encode(),
+        "root_path": "", "server": ("bench", 80), "client": ("bench", 1),
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+    }
+    await app(scope, receive, send)
+    timings["end"] = time.perf_counter()
+    return timings
+
+
+def child(endpoint: str, mode: str, limit: int) -> None:
+    from urllib.parse import urlencode
+
+    from app.core.config import settings
+    from app.core.security import create_access_token
+    from app.main import app
+
+    params, accept = MODES[mode]
+    headers = {"Authorization": f"Bearer {create_access_token(1)}", "Accept": accept}
+    baseline = peak_rss_mb()
+    t = asyncio.run(request(app, settings.API_V1_STR + endpoint, urlencode({"limit": limit, **params}), headers))
+    print(json.dumps({
+        "status": t["status"],
+        "ttfb": t["first_byte"] - t["start"],
+        "total": t["end"] - t["start"],
+        "mb": t["bytes"] / 1e6,
+        "rss_base": baseline,
+        "rss_peak": peak_rss_mb(),
+    }))
+
+
+def seed(tenants: int) -> None:
+    from app.core.rent_cycle import generate_rents
+    from app.db.base import Base
+    from app.db.session import SessionLocal, engine
+    from benchmarks.bench_rollover import seed as seed_owners
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        seed_owners(db, 1, tenants)
+        generate_rents(db, [date(2025, 1, 1)], [1])
+        db.commit()
+    finally:
+        db.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tenants", type=int, default=100_000)
+    parser.add_argument("--child", nargs=2, metavar=("ENDPOINT", "MODE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child[0], args.child[1], args.tenants)
+        return 0
+
+    if os.path.exists(_DB_FILE):
+        os.remove(_DB_FILE)
+    os.environ["DATABASE_URL"] = f"sqlite:///{_DB_FILE}"
+    seed(args.tenants)
+    try:
+        print(f"{'endpoint':<10} {'mode':<9} {'TTFB':>9} {'total':>9} {'body':>9} {'peak RSS':>9} {'(after import)':>15}")
+        for endpoint in ENDPOINTS:
+            for mode in MODES:
+                out = subprocess.run(
+                    [sys.executable, "-m", "benchmarks.bench_streaming", "--tenants", str(args.tenants),
+                     "--child", endpoint, mode],
+                    capture_output=True, text=True, check=True,
+                ).stdout
+                r = json.loads(out.strip().splitlines()[-1])
+                print(f"{endpoint:<10} {mode:<9} {r['ttfb'] * 1000:7.0f}ms {r['total']:8.2f}s "
+                      f"{r['mb']:7.1f}MB {r['rss_peak']:7.0f}MB {r['rss_base']:13.0f}MB")
+    finally:
+        os.remove(_DB_FILE)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
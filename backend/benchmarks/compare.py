@@ -0,0 +1,110 @@
+"""
+Stored baselines for pytest-benchmark reports.
+
+`save` keeps a report's summary statistics (without the raw timings) as a
+baseline; `check` exits with status 1 if any benchmark in the baseline got
+slower than --max-regression percent in the current run (by --stat, the
+median by default, which is less sensitive than the mean to GC pauses and
+noisy neighbours). Baselines are only comparable on the same machine, so record
+them where the comparison runs:
+
+    cd backend
+    pytest benchmarks/micro --benchmark-json=.benchmarks/micro.json
+    python -m benchmarks.compare save .benchmarks/micro.json benchmarks/baselines/micro.json
+    # ... change code ...
+    pytest benchmarks/micro --benchmark-json=.benchmarks/micro.json
+    python -m benchmarks.compare check benchmarks/baselines/micro.json .benchmarks/micro.json --max-regression 10
+"""
+import argparse
+import json
+import os
+import sys
+from typing import Dict
+
+
+def save(report_path: str, baseline_path: str) -> None:
+    with open(report_path) as f:
+        report = json.load(f)
+    baseline = {
+        "datetime": report["datetime"],
+        "machine_info": {
+            "machine": report["machine_info"].get("machine"),
+            "python_version": report["machine_info"].get("python_version"),
+            "cpu": report["machine_info"].get("cpu", {}).get("brand_raw"),
+        },
+        "commit_info": {key: report["commit_info"].get(key) for key in ("id", "branch", "dirty")},
+        "benchmarks": [
+            {
+                "fullname": bench["fullname"],
+                "group": bench["group"],
+                "stats": {key: value for key, value in bench["stats"].items() if key != "data"},
+            }
+            for bench in report["benchmarks"]
+        ],
+    }
+    os.makedirs(os.path.dirname(baseline_path) or ".", exist_ok=True)
+    with open(baseline_path, "w") as f:
+        json.dump(baseline, f, indent=2)
+        f.write("\n")
+
+
+def load(path: str, stat: str) -> Dict[str, float]:
+    with open(path) as f:
+        report = json.load(f)
+    return {bench["fullname"]: bench["stats"][stat] for bench in report["benchmarks"]}
+
+
+def _format(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e3), ("us", 1e6)):
+        if seconds * scale >= 1:
+            return f"{seconds * scale:.2f} {unit}"
+    return f"{seconds * 1e9:.0f} ns"
+
+
+def compare(baseline: Dict[str, float], current: Dict[str, float], max_regression: float) -> int:
+    """
+    Print a table of changes and return the number of regressions.
+    """
+    regressions = 0
+    width = max(map(len, baseline.keys() | current.keys()), default=10)
+    print(f"{'benchmark':<{width}}  {'baseline':>10}  {'current':>10}  {'change':>8}")
+    for name in sorted(baseline.keys() | current.keys()):
+        if name not in current:
+            print(f"{name:<{width}}  {_format(baseline[name]):>10}  {'-':>10}  {'missing':>8}")
+            continue
+        if name not in baseline:
+            print(f"{name:<{width}}  {'-':>10}  {_format(current[name]):>10}  {'new':>8}")
+            continue
+        change = (current[name] - baseline[name]) / baseline[name] * 100
+        regressed = change > max_regression
+        regressions += regressed
+        print(f"{name:<{width}}  {_format(baseline[name]):>10}  {_format(current[name]):>10}  "
+              f"{change:>+7.1f}%{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    save_parser = commands.add_parser("save", help="Store a report as a baseline")
+    save_parser.add_argument("report")
+    save_parser.add_argument("baseline")
+    check_parser = commands.add_parser("check", help="Compare a report with a baseline")
+    check_parser.add_argument("baseline")
+    check_parser.add_argument("current")
+    check_parser.add_argument("--max-regression", type=float, default=10.0, help="Allowed slowdown in percent")
+    check_parser.add_argument("--stat", default="median", choices=["min", "median", "mean"])
+    args = parser.parse_args(argv)
+
+    if args.command == "save":
+        save(args.report, args.baseline)
+        return 0
+    regressions = compare(load(args.baseline, args.stat), load(args.current, args.stat), args.max_regression)
+    if regressions:
+        print(f"{regressions} benchmark(s) regressed more than {args.max_regression:g}%", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,178 @@
+"""
+Load test for the main owner workflows.
+
+Logs in as owners created by `python -m app.seed` and runs each scenario in
+turn with a fixed number of requests in flight, then prints p50/p95/p99
+latency, throughput and errors per scenario:
+
+    dashboard  GET  /pgs/stats
+    tenants    GET  /tenants/
+    rents      GET  /rents/?curr_month=<this month>
+    pay        PUT  /rents/{id} {"status": "paid"}, each pending record once
+    rollover   POST /rents/generate?target_month=<next month>
+
+Without --base-url the app runs in-process against DATABASE_URL (seeding it
+first if the owners are missing), which measures the app and the database
+without a server in between. With --base-url it drives a running server,
+e.g. gunicorn against local Postgres seeded with the same --email-prefix.
+
+    cd backend
+    python -m app.seed --owners 200
+    python -m benchmarks.load_test --owners 50 --requests 500 --concurrency 20
+"""
+import os
+import tempfile
+
+# Settings are read at import time, so fill them in before importing the app
+_DB_FILE = os.path.join(tempfile.gettempdir(), "pgkhata_load_test.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_DB_FILE}")
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+os.environ.setdefault("ADMIN_PASSWORD", "bench-admin")
+
+import argparse  # noqa: E402
+import asyncio  # noqa: E402
+import itertools  # noqa: E402
+import statistics  # noqa: E402
+import time  # noqa: E402
+from datetime import date  # noqa: E402
+from typing import Callable, List, Optional, Tuple  # noqa: E402
+
+import httpx  # noqa: E402
+
+API = "/api/v1"
+SCENARIOS = ["dashboard", "tenants", "rents", "pay", "rollover"]
+
+
+def _ensure_seeded(args) -> None:
+    from sqlalchemy import select
+
+    from app import models, seed
+    from app.db.base import Base
+    from app.db.session import SessionLocal, engine
+
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        if db.scalar(select(models.User.id).where(models.User.email == f"{args.email_prefix}1@seed.local")):
+            return
+        print(f"Seeding {args.owners} owners into {engine.url.render_as_string(hide_password=True)}")
+        seed.main(["--owners", str(args.owners), "--email-prefix", args.email_prefix, "--password", args.password])
+
+
+async def _login(client: httpx.AsyncClient, email: str, password: str) -> dict:
+    response = await client.post(f"{API}/login/access-token", data={"username": email, "password": password})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def _pending_rents(client: httpx.AsyncClient, headers: dict, month: date) -> List[int]:
+    response = await client.get(
+        f"{API}/rents/", params={"status": "pending", "curr_month": month.isoformat(), "limit": 1000}, headers=headers
+    )
+    response.raise_for_status()
+    return [rent["id"] for rent in response.json()]
+
+
+async def _run(
+    client: httpx.AsyncClient, requests: List[Callable], concurrency: int
+) -> Tuple[List[float], int, float]:
+    latencies: List[float] = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(send):
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                response = await send()
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            latencies.append((time.perf_counter() - start) * 1000)
+            errors += not ok
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(send) for send in requests))
+    return latencies, errors, time.perf_counter() - start
+
+
+def _report(name: str, latencies: List[float], errors: int, seconds: float) -> None:
+    if not latencies:
+        print(f"{name:<10} no requests")
+        return
+    if len(latencies) > 1:
+        p = statistics.quantiles(latencies, n=100, method="inclusive")
+        p50, p95, p99 = p[49], p[94], p[98]
+    else:
+        p50 = p95 = p99 = latencies[0]
+    print(
+        f"{name:<10} {len(latencies):>7} {len(latencies) / seconds:>9.1f} "
+        f"{p50:>9.1f} {p95:>9.1f} {p99:>9.1f} {errors:>7}"
+    )
+
+
+async def main_async(args, transport: Optional[httpx.AsyncBaseTransport]) -> None:
+    today = date.today()
+    this_month = date(today.year, today.month, 1)
+    next_month = date(today.year + (today.month == 12), today.month % 12 + 1, 1)
+
+    async with httpx.AsyncClient(
+        base_url=args.base_url or "http://load-test", transport=transport, timeout=args.timeout
+    ) as client:
+        emails = [f"{args.email_prefix}{n}@seed.local" for n in range(1, args.owners + 1)]
+        owners = await asyncio.gather(*(_login(client, email, args.password) for email in emails))
+        cycle = itertools.cycle(owners)
+
+        def repeat(method: str, url: str, **kwargs) -> List[Callable]:
+            return [
+                (lambda headers=next(cycle): client.request(method, url, headers=headers, **kwargs))
+                for _ in range(args.requests)
+            ]
+
+        plans = {
+            "dashboard": lambda: repeat("GET", f"{API}/pgs/stats"),
+            "tenants": lambda: repeat("GET", f"{API}/tenants/"),
+            "rents": lambda: repeat("GET", f"{API}/rents/", params={"curr_month": this_month.isoformat()}),
+            "rollover": lambda: repeat("POST", f"{API}/rents/generate", params={"target_month": next_month.isoformat()}),
+        }
+
+        print(f"{'scenario':<10} {'requests':>7} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+        for name in args.scenarios:
+            if name == "pay":
+                # Each record can only be marked paid once
+                pending = await asyncio.gather(*(_pending_rents(client, headers, this_month) for headers in owners))
+                pairs = [(headers, rent_id) for headers, ids in zip(owners, pending) for rent_id in ids]
+                requests = [
+                    (lambda headers=headers, rent_id=rent_id: client.put(
+                        f"{API}/rents/{rent_id}", json={"status": "paid"}, headers=headers
+                    ))
+                    for headers, rent_id in pairs[:args.requests]
+                ]
+            else:
+                requests = plans[name]()
+            _report(name, *await _run(client, requests, args.concurrency))
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", help="Server to load, e.g. http://localhost:8000; default runs the app in-process")
+    parser.add_argument("--owners", type=int, default=20, help="Seeded owners to log in as")
+    parser.add_argument("--email-prefix", default="owner")
+    parser.add_argument("--password", default="password123")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=10, help="Requests in flight")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    args = parser.parse_args(argv)
+
+    transport = None
+    if not args.base_url:
+        _ensure_seeded(args)
+        from app.main import app
+
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    asyncio.run(main_async(args, transport))
+
+
+if __name__ == "__main__":
+    main()
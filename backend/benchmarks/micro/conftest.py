@@ -0,0 +1,85 @@
+"""
+Fixtures for the microbenchmarks: one owner with two 500-bed PGs, 1000
+tenants and six months of rent each, in an in-memory SQLite database.
+"""
+import os
+
+# Settings are read at import time, so fill them in before importing the app
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+os.environ.setdefault("ADMIN_PASSWORD", "bench-admin")
+
+from datetime import date  # noqa: E402
+
+import pytest  # noqa: E402
+from sqlalchemy import create_engine, insert  # noqa: E402
+from sqlalchemy.orm import selectinload, sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from app import models  # noqa: E402
+from app.db.base import Base  # noqa: E402
+
+PGS = 2
+ROOMS_PER_PG = 125
+BEDS_PER_ROOM = 4
+MONTHS = [date(2024, m, 1) for m in range(1, 7)]
+CURRENT_MONTH = MONTHS[-1]
+
+
+def _seed(db) -> None:
+    db.execute(insert(models.User), [{"id": 1, "email": "owner@bench.local", "hashed_password": "x", "is_active": True}])
+    pgs, rooms, beds, tenants, rents = [], [], [], [], []
+    for pg_id in range(1, PGS + 1):
+        pgs.append({"id": pg_id, "owner_id": 1, "name": f"PG {pg_id}", "address": "1 Main Road", "city": "Pune"})
+        for r in range(ROOMS_PER_PG):
+            room_id = (pg_id - 1) * ROOMS_PER_PG + r + 1
+            rooms.append({"id": room_id, "pg_id": pg_id, "room_number": str(101 + r), "floor": r // 10 + 1, "type": "Quad"})
+            for b in range(BEDS_PER_ROOM):
+                bed_id = (room_id - 1) * BEDS_PER_ROOM + b + 1
+                beds.append({"id": bed_id, "room_id": room_id, "bed_number": "ABCD"[b],
+                             "monthly_price": 6000.0, "is_occupied": True})
+                tenants.append({"id": bed_id, "pg_id": pg_id, "bed_id": bed_id, "name": f"Tenant {bed_id}",
+                                "phone": f"9{bed_id:09d}", "check_in_date": date(2023, 12, b + 1), "status": "active"})
+                for month in MONTHS:
+                    paid = month != CURRENT_MONTH or bed_id % 3 == 0
+                    rents.append({"tenant_id": bed_id, "pg_id": pg_id, "month": month, "amount_due": 6000.0,
+                                  "amount_paid": 6000.0 if paid else 0.0, "status": "paid" if paid else "pending",
+                                  "payment_date": month if paid else None})
+    for model, rows in [(models.PG, pgs), (models.Room, rooms), (models.Bed, beds),
+                        (models.Tenant, tenants), (models.RentRecord, rents)]:
+        db.execute(insert(model), rows)
+    db.commit()
+
+
+@pytest.fixture(scope="session")
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    _seed(session)
+    yield session
+    session.close()
+    engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def owner(db):
+    return db.get(models.User, 1)
+
+
+@pytest.fixture(scope="session")
+def pg_tree(db):
+    """A 500-bed PG with its rooms, beds and their tenants loaded, as read_pg returns it."""
+    return db.query(models.PG).options(
+        selectinload(models.PG.rooms).selectinload(models.Room.beds).selectinload(models.Bed.tenant)
+    ).filter(models.PG.id == 1).one()
+
+
+@pytest.fixture(scope="session")
+def tenant_list(db):
+    """1000 tenants loaded the way read_tenants loads them."""
+    return db.query(models.Tenant).options(
+        selectinload(models.Tenant.rent_records),
+        selectinload(models.Tenant.bed).selectinload(models.Bed.room),
+        selectinload(models.Tenant.pg),
+    ).order_by(models.Tenant.id).all()
@@ -0,0 +1,66 @@
+"""
+Microbenchmarks for code that runs on every request or every rent record.
+
+    cd backend
+    pytest benchmarks/micro --benchmark-json=.benchmarks/micro.json
+    python -m benchmarks.compare check benchmarks/baselines/micro.json .benchmarks/micro.json
+"""
+from datetime import date, timedelta
+from typing import List
+
+import pytest
+from pydantic import TypeAdapter
+
+from app import schemas
+from app.api import deps
+from app.api.v1.endpoints.pgs import read_dashboard_stats
+from app.core import security
+from app.core.rent_cycle import calculate_prorated_rent
+
+from .conftest import CURRENT_MONTH
+
+
+def _response(adapter: TypeAdapter, value) -> bytes:
+    # What FastAPI does with a response_model: validate from the ORM objects, then dump
+    return adapter.dump_json(adapter.validate_python(value, from_attributes=True))
+
+
+@pytest.mark.benchmark(group="rent")
+def test_prorated_rent(benchmark):
+    result = benchmark(calculate_prorated_rent, date(2024, 2, 10), 6000.0)
+    assert 0 < result < 6000.0
+
+
+@pytest.mark.benchmark(group="auth")
+def test_create_access_token(benchmark):
+    token = benchmark(security.create_access_token, 1, timedelta(minutes=30))
+    assert token.count(".") == 2
+
+
+@pytest.mark.benchmark(group="auth")
+def test_get_current_user(benchmark, db, owner):
+    token = security.create_access_token(owner.id)
+    user = benchmark(deps.get_current_user, db=db, token=token)
+    assert user.id == owner.id
+
+
+@pytest.mark.benchmark(group="serialization")
+def test_serialize_pg_500_beds(benchmark, pg_tree):
+    adapter = TypeAdapter(schemas.PG)
+    body = benchmark(_response, adapter, pg_tree)
+    assert sum(len(room.beds) for room in pg_tree.rooms) == 500
+    assert body.count(b'"bed_number"') == 500
+
+
+@pytest.mark.benchmark(group="serialization")
+def test_serialize_tenant_list_1000(benchmark, tenant_list):
+    adapter = TypeAdapter(List[schemas.Tenant])
+    body = benchmark(_response, adapter, tenant_list)
+    assert body.count(b'"check_in_date"') == 1000
+
+
+@pytest.mark.benchmark(group="dashboard")
+def test_dashboard_stats(benchmark, db, owner):
+    stats = benchmark(read_dashboard_stats, db=db, curr_month=CURRENT_MONTH, current_user=owner)
+    assert stats.total_beds == 1000
+    assert stats.total_collected_rent + stats.total_pending_rent == stats.total_expected_rent
@@ -0,0 +1,46 @@
+"""
+Gunicorn settings, read automatically when gunicorn starts in this directory.
+
+The app is imported once in the master and workers are forked from it
+(preload_app), so a new or restarted worker serves within milliseconds
+instead of importing everything again; GUNICORN_PRELOAD=0 turns this off.
+Each worker drops the database pool inherited from the master.
+
+Workers share their Prometheus metrics through files in
+PROMETHEUS_MULTIPROC_DIR (see app/core/metrics.py). The directory is
+emptied when gunicorn starts and a dead worker's live gauges are removed
+when it exits.
+"""
+import os
+import shutil
+import tempfile
+
+preload_app = os.environ.get("GUNICORN_PRELOAD", "1") != "0"
+
+# Set here rather than in a hook: with preload_app the master imports the app, which picks
+# the metrics mode on import, before gunicorn calls on_starting
+_metrics_dir = os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "pgkhata-metrics")
+)
+os.makedirs(_metrics_dir, exist_ok=True)
+
+
+def on_starting(server):
+    # Once per master; this file is read again on every reload (HUP), while workers still
+    # write their metrics here
+    shutil.rmtree(_metrics_dir, ignore_errors=True)
+    os.makedirs(_metrics_dir)
+
+
+def post_fork(server, worker):
+    if server.cfg.preload_app:
+        from app.db.session import engine
+
+        # Connections opened in the master must not be shared; leave them open for the master
+        engine.dispose(close=False)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
@@ -5,6 +5,7 @@ Test configuration and fixtures for PGKhata backend tests.
 import os
 import pytest
 import asyncio
+from datetime import date
 from typing import Generator, AsyncGenerator
 from httpx import AsyncClient
 from sqlalchemy import create_engine
@@ -40,6 +41,20 @@ def test_settings():
 # Event loop is handled automatically by pytest-asyncio with asyncio_mode = auto
 
 
+@pytest.fixture(scope="session", autouse=True)
+def tables_from_fixtures():
+    """
+    Tables come from the db_session fixture, which creates and drops them around each
+    test; the app's own background schema check would race it on the same file.
+    """
+    from app.core.config import settings
+
+    previous = settings.CREATE_TABLES_ON_STARTUP
+    settings.CREATE_TABLES_ON_STARTUP = False
+    yield
+    settings.CREATE_TABLES_ON_STARTUP = previous
+
+
 @pytest.fixture
 def engine():
     """Create test database engine."""
@@ -295,4 +310,68 @@ def test_user_2_token(test_user_2):
 @pytest.fixture
 def auth_headers_user_2(test_user_2_token):
     """Authentication headers for second test user."""
-    return {"Authorization": f"Bearer {test_user_2_token}"}
\ No newline at end of file
+    return {"Authorization": f"Bearer {test_user_2_token}"}
+
+# Fixtures matching the current models and routes (mounted under API_V1_STR)
+@pytest.fixture
+def client(override_get_db):
+    """Synchronous test client for the API."""
+    from fastapi.testclient import TestClient
+
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def api_prefix():
+    """Prefix the API router is mounted under."""
+    from app.core.config import settings
+
+    return settings.API_V1_STR
+
+
+@pytest.fixture
+def owner_headers(test_user):
+    """Authentication headers carrying a token for the test user's id."""
+    return {"Authorization": f"Bearer {create_access_token(test_user.id)}"}
+
+
+@pytest.fixture
+def other_owner_headers(test_user_2):
+    """Authentication headers for the second test user."""
+    return {"Authorization": f"Bearer {create_access_token(test_user_2.id)}"}
+
+
+@pytest.fixture
+def owner_pg(db_session, test_user):
+    """A PG with one double room and two beds owned by the test user."""
+    pg = PG(name="Sunrise PG", address="123 Main St", city="Pune", owner_id=test_user.id)
+    db_session.add(pg)
+    db_session.flush()
+    room = Room(pg_id=pg.id, room_number="101", floor=1, type="Double")
+    db_session.add(room)
+    db_session.flush()
+    for bed_number in ("101-A", "101-B"):
+        db_session.add(Bed(room_id=room.id, bed_number=bed_number, monthly_price=6000.0))
+    db_session.commit()
+    db_session.refresh(pg)
+    return pg
+
+
+@pytest.fixture
+def owner_tenant(db_session, owner_pg):
+    """An active tenant on the first bed of owner_pg, checked in on 2024-01-15."""
+    bed = owner_pg.rooms[0].beds[0]
+    tenant = Tenant(
+        pg_id=owner_pg.id,
+        bed_id=bed.id,
+        name="Ravi Kumar",
+        phone="9876543210",
+        check_in_date=date(2024, 1, 15),
+        status="active",
+    )
+    bed.is_occupied = True
+    db_session.add(tenant)
+    db_session.commit()
+    db_session.refresh(tenant)
+    return tenant
@@ -0,0 +1,167 @@
+"""
+A minimal transaction-mode connection pooler, for tests.
+
+It speaks just enough of the Postgres wire protocol to stand in for PgBouncer
+with pool_mode=transaction: clients connect without a password, and each
+transaction runs on whichever of `pool_size` server connections is free. A
+server connection goes back to the pool when the server reports the
+connection idle (ReadyForQuery 'I'), so consecutive transactions from one
+client can land on different backends, exactly the situation in which
+session state (SET, prepared statements, advisory locks) leaks or goes
+missing. COPY and cancel requests are not supported.
+
+    with TransactionPooler("postgresql://postgres@localhost/app", pool_size=2) as pooler:
+        engine = create_engine(pooler.url)
+"""
+import asyncio
+import struct
+import threading
+from typing import Dict, List, Optional
+
+from sqlalchemy.engine import make_url
+
+PROTOCOL_VERSION = 196608
+SSL_REQUEST = 80877103
+GSSENC_REQUEST = 80877104
+
+
+async def _read_message(reader: asyncio.StreamReader):
+    header = await reader.readexactly(5)
+    length = struct.unpack("!I", header[1:])[0]
+    return header[:1], header + await reader.readexactly(length - 4)
+
+
+def _message(kind: bytes, payload: bytes) -> bytes:
+    return kind + struct.pack("!I", len(payload) + 4) + payload
+
+
+class _ServerConnection:
+    def __init__(self, reader, writer, pid: int):
+        self.reader = reader
+        self.writer = writer
+        self.pid = pid
+
+
+class TransactionPooler:
+    def __init__(self, server_url: str, pool_size: int = 2):
+        url = make_url(server_url)
+        self.host = url.host or "localhost"
+        self.port = url.port or 5432
+        self.user = url.username or "postgres"
+        self.database = url.database or self.user
+        self.pool_size = pool_size
+        self.url = ""
+        # Server pids in the order transactions got them, and how many server connections were opened
+        self.assignments: List[int] = []
+        self.server_connections = 0
+        self._parameters: Dict[bytes, bytes] = {}
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="pooler", daemon=True)
+        self._idle: Optional[asyncio.Queue] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._clients: Dict[asyncio.Task, asyncio.StreamWriter] = {}
+
+    def __enter__(self) -> "TransactionPooler":
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._start(), self._loop).result(timeout=10)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        asyncio.run_coroutine_threadsafe(self._stop(), self._loop).result(timeout=10)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=10)
+        self._loop.close()
+
+    async def _start(self) -> None:
+        self._idle = asyncio.Queue()
+        for _ in range(self.pool_size):
+            self._idle.put_nowait(await self._connect_server())
+        self._server = await asyncio.start_server(self._serve_client, "127.0.0.1", 0)
+        port = self._server.sockets[0].getsockname()[1]
+        self.url = f"postgresql://{self.user}@127.0.0.1:{port}/{self.database}"
+
+    async def _stop(self) -> None:
+        self._server.close()
+        # Closing the client sockets ends each client's read loop
+        for writer in self._clients.values():
+            writer.close()
+        await asyncio.gather(*self._clients, return_exceptions=True)
+        while not self._idle.empty():
+            server = self._idle.get_nowait()
+            server.writer.write(_message(b"X", b""))
+            server.writer.close()
+
+    async def _connect_server(self) -> _ServerConnection:
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        params = b"user\0" + self.user.encode() + b"\0database\0" + self.database.encode() + b"\0\0"
+        writer.write(struct.pack("!II", len(params) + 8, PROTOCOL_VERSION) + params)
+        pid = 0
+        while True:
+            kind, message = await _read_message(reader)
+            if kind == b"R" and struct.unpack("!I", message[5:9])[0] != 0:
+                raise RuntimeError("TransactionPooler only supports trust authentication to the server")
+            if kind == b"E":
+                raise RuntimeError(f"Server refused the connection: {message[5:]!r}")
+            if kind == b"S":
+                name, value = message[5:].split(b"\0")[:2]
+                self._parameters[name] = value
+            if kind == b"K":
+                pid = struct.unpack("!I", message[5:9])[0]
+            if kind == b"Z":
+                self.server_connections += 1
+                return _ServerConnection(reader, writer, pid)
+
+    async def _startup_client(self, reader, writer) -> bool:
+        while True:
+            length, code = struct.unpack("!II", await reader.readexactly(8))
+            await reader.readexactly(length - 8)
+            if code in (SSL_REQUEST, GSSENC_REQUEST):
+                writer.write(b"N")
+                continue
+            if code != PROTOCOL_VERSION:
+                return False
+            writer.write(_message(b"R", struct.pack("!I", 0)))
+            for name, value in self._parameters.items():
+                writer.write(_message(b"S", name + b"\0" + value + b"\0"))
+            writer.write(_message(b"K", struct.pack("!II", 0, 0)))
+            writer.write(_message(b"Z", b"I"))
+            await writer.drain()
+            return True
+
+    async def _serve_client(self, reader, writer) -> None:
+        self._clients[asyncio.current_task()] = writer
+        server = None
+        try:
+            if not await self._startup_client(reader, writer):
+                return
+            while True:
+                kind, message = await _read_message(reader)
+                if kind == b"X":
+                    break
+                if server is None:
+                    server = await self._idle.get()
+                    self.assignments.append(server.pid)
+                server.writer.write(message)
+                # Simple queries and Sync end in ReadyForQuery; the extended protocol's
+                # Parse/Bind/Execute are only forwarded
+                if kind not in (b"Q", b"S"):
+                    continue
+                while True:
+                    reply_kind, reply = await _read_message(server.reader)
+                    writer.write(reply)
+                    if reply_kind == b"Z":
+                        break
+                await writer.drain()
+                if reply[5:6] == b"I":
+                    self._idle.put_nowait(server)
+                    server = None
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._clients.pop(asyncio.current_task(), None)
+            writer.close()
+            if server is not None:
+                # The client left mid-transaction: the connection's state is unknown, replace it
+                server.writer.close()
+                if self._server.is_serving():
+                    self._idle.put_nowait(await self._connect_server())
@@ -0,0 +1,101 @@
+"""
+Tests for owner backup and restore.
+"""
+
+import gzip
+import json
+
+import pytest
+from datetime import date
+
+from app.models.pg_structure import PG, Bed
+from app.models.tenant_management import Tenant, RentRecord, Payment
+
+
+@pytest.fixture
+def owner_data(db_session, owner_tenant):
+    rent = RentRecord(tenant_id=owner_tenant.id, pg_id=owner_tenant.pg_id, month=date(2024, 2, 1),
+                      amount_due=6000.0, amount_paid=2000.0, status="partial", payment_date=date(2024, 2, 5))
+    db_session.add(rent)
+    db_session.flush()
+    db_session.add(Payment(tenant_id=owner_tenant.id, pg_id=owner_tenant.pg_id, rent_record_id=rent.id,
+                           amount=2000.0, payment_date=date(2024, 2, 5), mode="upi"))
+    db_session.commit()
+    return owner_tenant
+
+
+class TestBackupRestore:
+    """Test GET /export/backup and POST /import/restore."""
+
+    @pytest.mark.integration
+    def test_round_trip_into_another_account(
+        self, client, api_prefix, owner_headers, other_owner_headers, owner_data, test_user_2, db_session
+    ):
+        backup = client.get(f"{api_prefix}/export/backup", headers=owner_headers)
+        assert backup.status_code == 200
+        assert backup.headers["content-type"] == "application/gzip"
+        raw = gzip.decompress(backup.content)
+        lines = [json.loads(line) for line in raw.splitlines()]
+        assert lines[0]["format"] == "pgkhata-backup"
+        assert [line["table"] for line in lines[1:]] == [
+            "pgs", "rooms", "beds", "beds", "tenants", "rent_records", "payments",
+        ]
+
+        response = client.post(
+            f"{api_prefix}/import/restore",
+            files={"file": ("backup.jsonl.gz", backup.content, "application/gzip")},
+            headers=other_owner_headers,
+        )
+
+        assert response.status_code == 200
+        assert response.json()["restored"]["beds"] == 2
+        pg = db_session.query(PG).filter(PG.owner_id == test_user_2.id).one()
+        assert pg.name == "Sunrise PG"
+        tenant = db_session.query(Tenant).filter(Tenant.pg_id == pg.id).one()
+        assert tenant.id != owner_data.id
+        assert db_session.get(Bed, tenant.bed_id).room.pg_id == pg.id
+        rent = db_session.query(RentRecord).filter(RentRecord.tenant_id == tenant.id).one()
+        assert (rent.month, rent.amount_paid, rent.pg_id) == (date(2024, 2, 1), 2000.0, pg.id)
+        payment = db_session.query(Payment).filter(Payment.tenant_id == tenant.id).one()
+        assert payment.rent_record_id == rent.id
+
+    @pytest.mark.unit
+    def test_rejects_file_without_header(self, client, api_prefix, owner_headers):
+        response = client.post(
+            f"{api_prefix}/import/restore",
+            files={"file": ("x.jsonl", b'{"table": "pgs", "row": {}}\n', "application/x-ndjson")},
+            headers=owner_headers,
+        )
+
+        assert response.status_code == 400
+        assert "header" in response.json()["detail"]
+
+    @pytest.mark.unit
+    def test_rejects_unknown_parent(self, client, api_prefix, owner_headers, db_session):
+        body = "\n".join([
+            json.dumps({"format": "pgkhata-backup", "version": 1}),
+            json.dumps({"table": "rooms", "row": {"id": 1, "pg_id": 99, "room_number": "1"}}),
+        ]).encode()
+
+        response = client.post(
+            f"{api_prefix}/import/restore", files={"file": ("x.jsonl", body)}, headers=owner_headers
+        )
+
+        assert response.status_code == 400
+        assert "unknown pgs id 99" in response.json()["detail"]
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("line, detail", [
+        ("[]", "Line 2: not a JSON object"),
+        ("1", "Line 2: not a JSON object"),
+        (json.dumps({"table": "pgs", "row": [1]}), "Line 2: row is not a JSON object"),
+    ])
+    def test_rejects_lines_that_are_not_objects(self, client, api_prefix, owner_headers, line, detail):
+        body = "\n".join([json.dumps({"format": "pgkhata-backup", "version": 1}), line]).encode()
+
+        response = client.post(
+            f"{api_prefix}/import/restore", files={"file": ("x.jsonl", body)}, headers=owner_headers
+        )
+
+        assert response.status_code == 400
+        assert response.json()["detail"] == f"Restore stopped: {detail}"
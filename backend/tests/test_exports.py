@@ -0,0 +1,133 @@
+"""
+Tests for streamed exports.
+"""
+
+import csv
+import io
+import json
+import zlib
+
+import pytest
+from datetime import date
+
+from app.core import streaming
+from app.schemas import RentForecast
+from app.models.tenant_management import RentRecord
+
+
+@pytest.fixture
+def owner_rents(db_session, owner_tenant):
+    """Three months of rent for the owner's tenant."""
+    rents = [
+        RentRecord(tenant_id=owner_tenant.id, pg_id=owner_tenant.pg_id, month=date(2024, m, 1),
+                   amount_due=6000.0, amount_paid=6000.0 if m == 2 else 0.0,
+                   status="paid" if m == 2 else "pending")
+        for m in (2, 3, 4)
+    ]
+    db_session.add_all(rents)
+    db_session.commit()
+    return rents
+
+
+class TestRentCsvExport:
+    """Test GET /rents/export.csv."""
+
+    @pytest.mark.rent
+    def test_exports_rows_with_tenant_room_and_bed(self, client, api_prefix, owner_headers, owner_rents):
+        response = client.get(
+            f"{api_prefix}/rents/export.csv",
+            params={"from": "2024-03-01", "to": "2024-04-01"},
+            headers={**owner_headers, "Accept-Encoding": "identity"},
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        assert "content-encoding" not in response.headers
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert [r["month"] for r in rows] == ["2024-03-01", "2024-04-01"]
+        assert rows[0]["pg"] == "Sunrise PG"
+        assert rows[0]["room"] == "101"
+        assert rows[0]["bed"] == "101-A"
+        assert rows[0]["tenant"] == "Ravi Kumar"
+        assert rows[0]["status"] == "pending"
+
+    @pytest.mark.rent
+    def test_gzip_when_accepted(self, client, api_prefix, owner_headers, owner_rents):
+        response = client.get(
+            f"{api_prefix}/rents/export.csv", headers={**owner_headers, "Accept-Encoding": "gzip"}
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        # httpx decodes the body transparently
+        assert len(list(csv.DictReader(io.StringIO(response.text)))) == 3
+
+    @pytest.mark.rent
+    def test_other_owners_rents_are_not_exported(self, client, api_prefix, other_owner_headers, owner_rents):
+        response = client.get(
+            f"{api_prefix}/rents/export.csv", headers={**other_owner_headers, "Accept-Encoding": "identity"}
+        )
+
+        assert response.status_code == 200
+        assert response.text.strip() == ",".join(
+            ["rent_id", "month", "pg", "room", "floor", "bed", "tenant", "phone",
+             "amount_due", "amount_paid", "status", "payment_date"]
+        )
+
+    @pytest.mark.unit
+    def test_gzip_chunks_are_independently_decodable(self):
+        chunks = list(streaming.gzip_chunks(iter([b"a,b\n", b"1,2\n"])))
+        decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+        # The first chunk decodes before the stream has finished
+        assert decoder.decompress(chunks[0]) == b"a,b\n"
+        assert b"".join(decoder.decompress(c) for c in chunks[1:]) == b"1,2\n"
+
+    @pytest.mark.unit
+    def test_formula_cells_are_neutralised(self):
+        assert streaming.safe_text("=HYPERLINK(\"x\")") == "'=HYPERLINK(\"x\")"
+        assert streaming.safe_text("Ravi") == "Ravi"
+        assert streaming.safe_text(5) == 5
+
+
+class TestStreamingLists:
+    """Test the streaming modes of the tenant and rent list endpoints."""
+
+    @pytest.mark.unit
+    def test_stream_matches_buffered_tenant_list(self, client, api_prefix, owner_headers, owner_rents):
+        url = f"{api_prefix}/tenants/"
+        buffered = client.get(url, headers=owner_headers)
+        streamed = client.get(url, params={"stream": 1}, headers=owner_headers)
+
+        assert streamed.status_code == 200
+        assert streamed.headers["content-type"] == "application/json"
+        assert streamed.json() == buffered.json()
+        assert len(streamed.json()[0]["rent_records"]) == 3
+
+    @pytest.mark.rent
+    def test_ndjson_rent_list(self, client, api_prefix, owner_headers, owner_rents):
+        response = client.get(
+            f"{api_prefix}/rents/",
+            params={"status": "pending"},
+            headers={**owner_headers, "Accept": "application/x-ndjson"},
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert [r["month"] for r in rows] == ["2024-03-01", "2024-04-01"]
+
+    @pytest.mark.unit
+    def test_empty_stream_is_an_empty_array(self, client, api_prefix, other_owner_headers, owner_rents):
+        response = client.get(f"{api_prefix}/rents/", params={"stream": 1}, headers=other_owner_headers)
+
+        assert response.status_code == 200
+        assert response.json() == []
+
+    @pytest.mark.unit
+    def test_json_array_spans_batches(self):
+        batches = [[{"month": "2024-01-01", "expected_rent": 1, "billed_tenants": 1}], [],
+                   [{"month": "2024-02-01", "expected_rent": 2, "billed_tenants": 1}]]
+        body = b"".join(streaming.json_array_chunks(batches, RentForecast))
+
+        assert [row["expected_rent"] for row in json.loads(body)] == [1.0, 2.0]
@@ -0,0 +1,192 @@
+"""
+Tests for the health endpoints and reconnecting without pre-ping.
+"""
+
+import os
+import sqlite3
+import time
+
+import pytest
+from sqlalchemy import create_engine, event, exc, text
+from sqlalchemy.orm import Session
+
+from app.core import health
+from app.db import reconnect, schema
+
+TEST_POSTGRES_URL = os.environ.get("TEST_POSTGRES_URL")
+
+
+@pytest.fixture
+def db_status(monkeypatch):
+    """Set the last probe result instead of waiting for the probe thread."""
+    # The client's probe thread would overwrite it
+    health.stop()
+    if health._thread is not None:
+        health._thread.join()
+
+    def set_status(**kwargs):
+        monkeypatch.setattr(health, "status", health.DatabaseStatus(**kwargs))
+
+    return set_status
+
+
+@pytest.fixture
+def retrying_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'reconnect.db'}", pool_size=1)
+    reconnect.install(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def disconnect_once(retrying_engine, monkeypatch):
+    """Make the next statement fail the way it does on a connection the server closed."""
+    real_do_execute = retrying_engine.dialect.do_execute
+    failures = []
+
+    def do_execute(cursor, statement, parameters, context=None):
+        if not failures:
+            failures.append(cursor.connection)
+            raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+        return real_do_execute(cursor, statement, parameters, context=context)
+
+    monkeypatch.setattr(retrying_engine.dialect, "do_execute", do_execute)
+    return failures
+
+
+class TestHealthEndpoints:
+    """Test GET /healthz and GET /readyz."""
+
+    def test_healthz_does_not_touch_the_database(self, client, db_status):
+        db_status(ok=False, error="down")
+
+        response = client.get("/healthz")
+
+        assert response.status_code == 200
+        assert response.json() == {"status": "ok"}
+
+    def test_readyz_reports_last_probe(self, client, db_status):
+        db_status(ok=True, checked_at=time.monotonic(), latency_ms=0.4)
+
+        response = client.get("/readyz")
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["status"] == "ok"
+        assert body["checks"] == {"schema": True, "database": True}
+        assert body["database"]["latency_ms"] == 0.4
+
+    def test_readyz_unavailable_when_database_down(self, client, db_status):
+        db_status(ok=False, checked_at=time.monotonic(), error="OperationalError: connection refused")
+
+        response = client.get("/readyz")
+
+        assert response.status_code == 503
+        assert response.json()["checks"]["database"] is False
+        assert "connection refused" in response.json()["database"]["error"]
+
+    def test_readyz_unavailable_when_probe_is_stale(self, client, db_status):
+        db_status(ok=True, checked_at=time.monotonic() - 4 * health.settings.HEALTH_CHECK_INTERVAL)
+
+        assert client.get("/readyz").status_code == 503
+
+    def test_readyz_unavailable_until_schema_checked(self, client, db_status, monkeypatch):
+        db_status(ok=True, checked_at=time.monotonic())
+        monkeypatch.setattr(schema, "ready", schema.threading.Event())
+
+        response = client.get("/readyz")
+
+        assert response.status_code == 503
+        assert response.json()["checks"] == {"schema": False, "database": True}
+
+    def test_api_unavailable_until_schema_checked(self, client, api_prefix, owner_headers, monkeypatch):
+        monkeypatch.setattr(schema, "ready", schema.threading.Event())
+        monkeypatch.setattr(health.settings, "SCHEMA_WAIT_SECONDS", 0)
+
+        response = client.get(f"{api_prefix}/pgs/", headers=owner_headers)
+
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "1"
+        assert client.get("/healthz").status_code == 200
+
+        schema.ready.set()
+        assert client.get(f"{api_prefix}/pgs/", headers=owner_headers).status_code == 200
+
+    def test_api_waits_for_schema_check(self, client, api_prefix, owner_headers, monkeypatch):
+        monkeypatch.setattr(schema, "ready", schema.threading.Event())
+        timer = schema.threading.Timer(0.2, schema.ready.set)
+        timer.start()
+
+        response = client.get(f"{api_prefix}/pgs/", headers=owner_headers)
+
+        timer.join()
+        assert response.status_code == 200
+
+    def test_probe_records_failure_and_recovery(self, db_status, monkeypatch, tmp_path):
+        db_status(ok=True)
+        monkeypatch.setattr(health, "engine", create_engine(f"sqlite:///{tmp_path / 'missing' / 'x.db'}"))
+
+        failed = health.probe()
+
+        assert not failed.ok and failed.checked_at is not None
+        assert failed.error.startswith("OperationalError")
+
+        monkeypatch.setattr(health, "engine", create_engine(f"sqlite:///{tmp_path / 'x.db'}"))
+        assert health.probe().ok
+        assert health.status.latency_ms is not None
+
+
+class TestReconnect:
+    """Test the retry that replaces pool_pre_ping."""
+
+    def test_first_statement_is_retried_on_new_connection(self, retrying_engine, disconnect_once):
+        with Session(retrying_engine) as session:
+            assert session.execute(text("SELECT :x"), {"x": 1}).scalar() == 1
+            assert session.connection().connection.dbapi_connection is not disconnect_once[0]
+            session.execute(text("CREATE TABLE IF NOT EXISTS t (x INTEGER)"))
+            session.commit()
+
+    def test_failed_cursor_is_closed(self, retrying_engine, disconnect_once):
+        cursors = []
+        event.listen(retrying_engine, "before_cursor_execute", lambda conn, cursor, *args: cursors.append(cursor))
+        event.listen(retrying_engine, "after_cursor_execute",
+                     lambda conn, cursor, statement, params, context, many: cursors.append(context.cursor))
+
+        with Session(retrying_engine) as session:
+            assert session.execute(text("SELECT 1")).scalar() == 1
+
+        failed, retried = cursors
+        assert retried is not failed
+        with pytest.raises(sqlite3.ProgrammingError, match="closed cursor"):
+            failed.execute("SELECT 1")
+
+    def test_disconnect_mid_transaction_is_raised(self, retrying_engine, disconnect_once):
+        with Session(retrying_engine) as session:
+            session.execute(text("SELECT 1"))
+            disconnect_once.clear()
+
+            with pytest.raises(exc.DBAPIError) as raised:
+                session.execute(text("SELECT :x"), {"x": 2})
+            assert raised.value.connection_invalidated
+
+    def test_other_errors_are_not_retried(self, retrying_engine):
+        with Session(retrying_engine) as session:
+            with pytest.raises(exc.OperationalError):
+                session.execute(text("SELECT * FROM no_such_table"))
+
+    @pytest.mark.postgres
+    @pytest.mark.skipif(not TEST_POSTGRES_URL, reason="TEST_POSTGRES_URL is not set")
+    def test_connection_terminated_by_postgres(self):
+        engine = create_engine(TEST_POSTGRES_URL, pool_size=1)
+        reconnect.install(engine)
+        try:
+            with engine.connect() as conn:
+                pid = conn.exec_driver_sql("SELECT pg_backend_pid()").scalar()
+            with create_engine(TEST_POSTGRES_URL).connect() as admin:
+                admin.execute(text("SELECT pg_terminate_backend(:pid)"), {"pid": pid})
+
+            with Session(engine) as session:
+                assert session.execute(text("SELECT pg_backend_pid()")).scalar() != pid
+                session.commit()
+        finally:
+            engine.dispose()
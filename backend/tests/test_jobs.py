@@ -0,0 +1,124 @@
+"""
+Tests for the background job queue.
+"""
+
+import pytest
+from datetime import date, timedelta
+
+from app.core import jobs
+from app.core import job_handlers  # noqa: F401
+from app.models.tenant_management import RentRecord
+
+
+class TestJobQueue:
+    """Test enqueueing, claiming and retrying jobs."""
+
+    @pytest.mark.unit
+    def test_claim_marks_job_running(self, db_session):
+        job = jobs.enqueue(db_session, "test.noop", {})
+        db_session.commit()
+
+        claimed = jobs.claim(db_session, "worker-1")
+
+        assert claimed.id == job.id
+        assert claimed.status == "running"
+        assert claimed.attempts == 1
+        assert claimed.locked_by == "worker-1"
+        assert jobs.claim(db_session, "worker-2") is None
+
+    @pytest.mark.unit
+    def test_failed_job_is_retried_with_backoff(self, db_session, monkeypatch):
+        calls = []
+
+        def flaky(db, job):
+            calls.append(job.attempts)
+            raise RuntimeError("boom")
+
+        monkeypatch.setitem(jobs.HANDLERS, "test.flaky", flaky)
+        job = jobs.enqueue(db_session, "test.flaky", {}, max_attempts=2)
+        db_session.commit()
+
+        assert jobs.run_next(db_session, "worker-1")
+        db_session.refresh(job)
+        assert job.status == "queued"
+        assert job.error == "RuntimeError: boom"
+        # Not runnable again until the backoff has passed
+        assert jobs.run_next(db_session, "worker-1") is False
+
+        job.run_after = jobs.utcnow() - timedelta(seconds=1)
+        db_session.commit()
+        assert jobs.run_next(db_session, "worker-1")
+        db_session.refresh(job)
+        assert job.status == "failed"
+        assert calls == [1, 2]
+
+    @pytest.mark.unit
+    def test_backoff_grows_and_is_capped(self):
+        assert jobs.backoff(1) == timedelta(seconds=jobs.RETRY_BASE_SECONDS)
+        assert jobs.backoff(2) == timedelta(seconds=jobs.RETRY_BASE_SECONDS * 2)
+        assert jobs.backoff(50) == timedelta(seconds=jobs.RETRY_MAX_SECONDS)
+
+    @pytest.mark.unit
+    def test_expired_lease_is_reclaimed(self, db_session):
+        job = jobs.enqueue(db_session, "test.noop", {})
+        db_session.commit()
+        jobs.claim(db_session, "worker-1")
+
+        job.locked_at = jobs.utcnow() - timedelta(seconds=jobs.LEASE_SECONDS + 1)
+        db_session.commit()
+
+        reclaimed = jobs.claim(db_session, "worker-2")
+        assert reclaimed.locked_by == "worker-2"
+        assert reclaimed.attempts == 2
+
+    @pytest.mark.unit
+    def test_expired_last_attempt_fails(self, db_session):
+        """A job whose worker died on its last attempt is not run again."""
+        job = jobs.enqueue(db_session, "test.noop", {}, max_attempts=1)
+        db_session.commit()
+        jobs.claim(db_session, "worker-1")
+
+        job.locked_at = jobs.utcnow() - timedelta(seconds=jobs.LEASE_SECONDS + 1)
+        db_session.commit()
+
+        assert jobs.claim(db_session, "worker-2") is None
+        db_session.refresh(job)
+        assert job.status == "failed"
+        assert job.attempts == 1
+        assert job.locked_by is None
+        assert job.error == "Worker stopped during the last attempt"
+
+
+class TestBackgroundRentGeneration:
+    """Test queued rent generation and job polling."""
+
+    @pytest.mark.rent
+    def test_generate_in_background(self, client, api_prefix, owner_headers, owner_tenant, db_session):
+        response = client.post(
+            f"{api_prefix}/rents/generate?from=2024-01-01&to=2024-03-01&background=true",
+            headers=owner_headers,
+        )
+
+        assert response.status_code == 202
+        job = response.json()
+        assert job["status"] == "queued"
+        assert response.headers["location"] == f"{api_prefix}/jobs/{job['id']}"
+        assert db_session.query(RentRecord).count() == 0
+
+        assert jobs.run_next(db_session, "worker-1")
+
+        polled = client.get(f"{api_prefix}/jobs/{job['id']}", headers=owner_headers).json()
+        assert polled["status"] == "succeeded"
+        assert polled["progress"] == 1.0
+        assert polled["result"]["created_count"] == 3
+        months = [r.month for r in db_session.query(RentRecord).order_by(RentRecord.month)]
+        assert months == [date(2024, 1, 1), date(2024, 2, 1), date(2024, 3, 1)]
+
+    @pytest.mark.rent
+    def test_other_owner_cannot_poll_job(self, client, api_prefix, other_owner_headers, test_user, db_session):
+        job = jobs.enqueue(db_session, "rents.generate", {"months": []}, owner_id=test_user.id)
+        db_session.commit()
+
+        response = client.get(f"{api_prefix}/jobs/{job.id}", headers=other_owner_headers)
+
+        assert response.status_code == 404
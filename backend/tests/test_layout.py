@@ -0,0 +1,69 @@
+"""
+Tests for declarative PG layout sync.
+"""
+
+import pytest
+
+from app.models.pg_structure import Room, Bed
+
+GENERATE = {"generate": {"floor_from": 1, "floor_to": 2, "rooms_per_floor": 2, "bed_labels": "AB", "monthly_price": 6500}}
+
+
+class TestLayoutSync:
+    """Test PUT /pgs/{id}/layout."""
+
+    @pytest.mark.pg
+    def test_generator_diff_and_apply(self, client, api_prefix, owner_headers, owner_pg, db_session):
+        url = f"{api_prefix}/pgs/{owner_pg.id}/layout"
+        preview = client.put(url, params={"dry_run": True}, json=GENERATE, headers=owner_headers)
+
+        assert preview.status_code == 200
+        expected = {
+            "rooms_created": 3, "rooms_updated": 1, "rooms_deleted": 0,
+            "beds_created": 6, "beds_updated": 2, "beds_deleted": 0,
+        }
+        assert preview.json() == {"dry_run": True, **expected}
+        assert db_session.query(Room).count() == 1
+
+        response = client.put(url, json=GENERATE, headers=owner_headers)
+
+        assert response.json() == {"dry_run": False, **expected}
+        rooms = {r.room_number: r for r in db_session.query(Room).filter(Room.pg_id == owner_pg.id)}
+        assert sorted(rooms) == ["101", "102", "201", "202"]
+        assert rooms["101"].type == "Shared"
+        assert sorted(b.bed_number for b in rooms["202"].beds) == ["202-A", "202-B"]
+        assert {b.monthly_price for b in db_session.query(Bed)} == {6500.0}
+
+        # Applying the same layout again changes nothing
+        again = client.put(url, json=GENERATE, headers=owner_headers).json()
+        assert not any(v for k, v in again.items() if k != "dry_run")
+
+    @pytest.mark.pg
+    def test_removes_free_beds(self, client, api_prefix, owner_headers, owner_pg, db_session):
+        layout = {"rooms": [{"room_number": "101", "floor": 1, "type": "Single",
+                             "beds": [{"bed_number": "101-A", "monthly_price": 6000}]}]}
+
+        response = client.put(f"{api_prefix}/pgs/{owner_pg.id}/layout", json=layout, headers=owner_headers)
+
+        assert response.status_code == 200
+        assert response.json()["beds_deleted"] == 1
+        assert [b.bed_number for b in db_session.query(Bed)] == ["101-A"]
+
+    @pytest.mark.pg
+    def test_refuses_to_remove_bed_with_active_tenant(self, client, api_prefix, owner_headers, owner_tenant, db_session):
+        response = client.put(
+            f"{api_prefix}/pgs/{owner_tenant.pg_id}/layout", json={"rooms": []}, headers=owner_headers
+        )
+
+        assert response.status_code == 409
+        assert "101-A" in response.json()["detail"]
+        assert "101-B" not in response.json()["detail"]
+        assert db_session.query(Bed).count() == 2
+
+    @pytest.mark.pg
+    def test_invalid_layouts(self, client, api_prefix, owner_headers, owner_pg):
+        url = f"{api_prefix}/pgs/{owner_pg.id}/layout"
+        room = {"room_number": "101", "floor": 1, "type": "Double", "beds": []}
+
+        assert client.put(url, json={"rooms": [room, room]}, headers=owner_headers).status_code == 400
+        assert client.put(url, json={}, headers=owner_headers).status_code == 422
@@ -0,0 +1,79 @@
+"""
+Tests for the Prometheus /metrics endpoint.
+"""
+
+import subprocess
+import sys
+
+import pytest
+from prometheus_client import CollectorRegistry, generate_latest, multiprocess
+
+from app.core.config import settings
+
+TOKEN = "scrape-token"
+
+
+@pytest.fixture
+def metrics_token(monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", TOKEN)
+    return {"Authorization": f"Bearer {TOKEN}"}
+
+
+def _sample(text: str, name: str) -> float:
+    return sum(float(line.rsplit(" ", 1)[1]) for line in text.splitlines() if line.startswith(name))
+
+
+class TestMetrics:
+    """Test GET /metrics."""
+
+    def test_records_requests_by_route_template(self, client, api_prefix, owner_headers, owner_pg, metrics_token):
+        client.get(f"{api_prefix}/pgs/{owner_pg.id}", headers=owner_headers)
+        client.get("/no-such-page")
+
+        response = client.get("/metrics", headers=metrics_token)
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        text = response.text
+        route = f'method="GET",route="{api_prefix}/pgs/{{pg_id}}",status="200"'
+        assert _sample(text, f"http_requests_total{{{route}}}") >= 1
+        assert _sample(text, 'http_requests_total{method="GET",route="unmatched",status="404"}') >= 1
+        assert f'http_request_duration_seconds_bucket{{le="0.005",method="GET",route="{api_prefix}/pgs/{{pg_id}}"}}' in text
+        assert _sample(text, "anyio_threadpool_size") > 0
+        assert "db_pool_wait_seconds_count" in text
+        # The test user's password was hashed when it was created
+        assert _sample(text, "bcrypt_duration_seconds_count") >= 1
+
+    def test_requires_the_token(self, client, metrics_token):
+        assert client.get("/metrics").status_code == 401
+        response = client.get("/metrics", headers={"Authorization": "Bearer wrong"})
+        assert response.status_code == 401
+        assert response.headers["www-authenticate"] == "Bearer"
+        assert client.get("/metrics", headers={"Authorization": "Bearer \xe9".encode("latin-1")}).status_code == 401
+
+    def test_off_without_a_token(self, client, monkeypatch):
+        monkeypatch.setattr(settings, "METRICS_TOKEN", "")
+
+        assert client.get("/metrics", headers={"Authorization": "Bearer "}).status_code == 404
+
+    def test_multiprocess_values_are_aggregated(self, tmp_path):
+        code = (
+            "from app.core import metrics\n"
+            "metrics.REQUESTS.labels('GET', '/x', '200').inc(3)\n"
+            "metrics.THREADPOOL_SIZE.set(40)\n"
+        )
+        env = {
+            "PROMETHEUS_MULTIPROC_DIR": str(tmp_path), "DATABASE_URL": "sqlite://", "SECRET_KEY": "s",
+            "ADMIN_PASSWORD": "a",
+        }
+        for _ in range(2):
+            subprocess.run([sys.executable, "-c", code], env=env, check=True)
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry, path=str(tmp_path))
+        text = generate_latest(registry).decode()
+
+        assert _sample(text, 'http_requests_total{method="GET",route="/x",status="200"}') == 6
+        # Live gauges of exited workers are dropped by gunicorn's child_exit
+        # hook; without it both workers still count
+        assert _sample(text, "anyio_threadpool_size") == 80
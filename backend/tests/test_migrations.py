@@ -0,0 +1,212 @@
+"""
+Tests for the in-place schema upgrades run after create_all.
+
+Each test builds a database the way an older version of the app left it and
+checks that app.db.migrations brings it up to the models. They run on
+SQLite, and on Postgres as well when TEST_POSTGRES_URL points at a scratch
+database (its tables are dropped and recreated).
+"""
+
+import os
+from datetime import date
+
+import pytest
+from sqlalchemy import MetaData, create_engine, exc, func, inspect, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import NullPool
+
+from app import models
+from app.core.config import settings
+from app.db import migrations
+from app.db import session as db_session_module
+from app.db.base import Base
+from app.db.upsert import insert_for
+
+TEST_POSTGRES_URL = os.environ.get("TEST_POSTGRES_URL")
+MONTH = date(2024, 6, 1)
+
+
+@pytest.fixture(params=[
+    "sqlite",
+    pytest.param("postgresql", marks=[
+        pytest.mark.postgres,
+        pytest.mark.skipif(not TEST_POSTGRES_URL, reason="TEST_POSTGRES_URL is not set"),
+    ]),
+])
+def engine(request, tmp_path):
+    url = f"sqlite:///{tmp_path / 'migrate.db'}" if request.param == "sqlite" else TEST_POSTGRES_URL
+    engine = create_engine(url, poolclass=NullPool)
+    Base.metadata.drop_all(bind=engine)
+    yield engine
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+
+
+def create_old_schema(engine, drop_constraints=()):
+    """The current tables without the named constraints, as create_all made them before they existed."""
+    old = MetaData()
+    for table in Base.metadata.sorted_tables:
+        table.to_metadata(old)
+    for table in old.tables.values():
+        table.constraints = {c for c in table.constraints if c.name not in drop_constraints}
+    old.create_all(bind=engine)
+
+
+def upsert_rent(conn, amount_paid):
+    insert = insert_for(conn)
+    stmt = insert(models.RentRecord).values(
+        tenant_id=1, pg_id=1, month=MONTH, amount_due=5000.0, amount_paid=amount_paid, status="partial",
+    )
+    conn.execute(stmt.on_conflict_do_update(index_elements=["tenant_id", "month"], set_={"amount_paid": amount_paid}))
+
+
+def seed_owner(conn):
+    conn.execute(models.User.__table__.insert().values(
+        id=1, email="owner@example.com", hashed_password="x", full_name="Owner", is_active=True,
+    ))
+    conn.execute(models.PG.__table__.insert().values(id=1, owner_id=1, name="PG", address="Street"))
+    conn.execute(models.Tenant.__table__.insert().values(
+        id=1, pg_id=1, name="Asha", phone="1", check_in_date=date(2024, 1, 1), status="active",
+    ))
+
+
+class TestUniqueRentMonth:
+    """Test the unique (tenant_id, month) index on rent_records."""
+
+    def test_create_all_has_the_index_upserts_need(self, engine):
+        Base.metadata.create_all(bind=engine)
+
+        with engine.begin() as conn:
+            assert migrations._has_unique(conn, "rent_records", ["tenant_id", "month"])
+            seed_owner(conn)
+            upsert_rent(conn, 1000.0)
+            upsert_rent(conn, 2000.0)
+            assert conn.execute(select(models.RentRecord.amount_paid)).scalars().all() == [2000.0]
+
+    def test_upsert_fails_without_the_index(self, engine):
+        create_old_schema(engine, {"uq_rent_records_tenant_month"})
+
+        with pytest.raises(exc.DBAPIError):
+            with engine.begin() as conn:
+                seed_owner(conn)
+                upsert_rent(conn, 1000.0)
+
+    def test_duplicates_are_merged_and_the_index_added(self, engine):
+        create_old_schema(engine, {"uq_rent_records_tenant_month"})
+        rents = models.RentRecord.__table__
+        payments = models.Payment.__table__
+        with engine.begin() as conn:
+            seed_owner(conn)
+            for record_id, paid, paid_on in [(1, 1000.0, date(2024, 6, 3)), (2, 4000.0, date(2024, 6, 9))]:
+                conn.execute(rents.insert().values(
+                    id=record_id, tenant_id=1, pg_id=1, month=MONTH, amount_due=5000.0,
+                    amount_paid=paid, status="partial", payment_date=paid_on,
+                ))
+                conn.execute(payments.insert().values(
+                    tenant_id=1, pg_id=1, rent_record_id=record_id, amount=paid, payment_date=paid_on,
+                ))
+            # Cached before the merge, counting the month twice
+            conn.execute(models.TenantBalance.__table__.insert().values(
+                tenant_id=1, total_due=10000.0, total_paid=5000.0, credit=0.0, balance=5000.0,
+            ))
+
+        migrations.run(engine)
+        migrations.run(engine)  # Nothing left to do the second time
+
+        with engine.begin() as conn:
+            record = conn.execute(select(rents)).one()
+            assert (record.id, record.amount_paid, record.status) == (1, 5000.0, "paid")
+            assert record.payment_date == date(2024, 6, 9)
+            assert conn.execute(select(payments.c.rent_record_id)).scalars().all() == [1, 1]
+            balance = conn.execute(select(models.TenantBalance.__table__)).one()
+            assert (balance.total_due, balance.total_paid, balance.balance) == (5000.0, 5000.0, 0.0)
+            upsert_rent(conn, 5000.0)
+            assert conn.execute(select(func.count()).select_from(rents)).scalar() == 1
+        indexes = inspect(engine).get_indexes("rent_records")
+        assert [i["name"] for i in indexes if i["unique"]] == ["uq_rent_records_tenant_month"]
+
+    def test_current_schema_is_left_alone(self, engine):
+        Base.metadata.create_all(bind=engine)
+        before = inspect(engine).get_indexes("rent_records")
+
+        migrations.run(engine)
+
+        assert inspect(engine).get_indexes("rent_records") == before
+
+
+class TestUpdatedAt:
+    """Test adding the indexed updated_at columns."""
+
+    def test_columns_and_indexes_are_added(self, engine):
+        Base.metadata.create_all(bind=engine)
+        with engine.begin() as conn:
+            for table in migrations.UPDATED_AT_TABLES:
+                conn.exec_driver_sql(f"DROP INDEX ix_{table}_updated_at")
+                conn.exec_driver_sql(f"ALTER TABLE {table} DROP COLUMN updated_at")
+            seed_owner(conn)
+
+        migrations.run(engine)
+        migrations.run(engine)
+
+        inspector = inspect(engine)
+        for table in migrations.UPDATED_AT_TABLES:
+            assert "updated_at" in [c["name"] for c in inspector.get_columns(table)]
+            assert f"ix_{table}_updated_at" in [i["name"] for i in inspector.get_indexes(table)]
+        with engine.begin() as conn:
+            assert conn.execute(select(models.Tenant.updated_at)).scalar() is not None
+
+    def test_current_schema_is_left_alone(self, engine):
+        Base.metadata.create_all(bind=engine)
+
+        def schema():
+            inspector = inspect(engine)
+            return {
+                table: ([(c["name"], str(c["type"]), c["default"]) for c in inspector.get_columns(table)],
+                        inspector.get_indexes(table))
+                for table in migrations.UPDATED_AT_TABLES
+            }
+        before = schema()
+
+        migrations.run(engine)
+
+        assert schema() == before
+
+
+class TestLookupIndexes:
+    """Test adding the owner and PG lookup indexes."""
+
+    def test_missing_indexes_are_added(self, engine):
+        Base.metadata.create_all(bind=engine)
+        with engine.begin() as conn:
+            for name in migrations.LOOKUP_INDEXES:
+                conn.exec_driver_sql(f"DROP INDEX {name}")
+
+        migrations.run(engine)
+        migrations.run(engine)
+
+        inspector = inspect(engine)
+        names = {index["name"] for table in ("pgs", "rooms", "beds", "tenants", "rent_records")
+                 for index in inspector.get_indexes(table)}
+        assert set(migrations.LOOKUP_INDEXES) <= names
+        assert [i["column_names"] for i in inspector.get_indexes("rent_records")
+                if i["name"] == "ix_rent_records_pg_id_month"] == [["pg_id", "month"]]
+
+
+@pytest.mark.postgres
+@pytest.mark.skipif(not TEST_POSTGRES_URL, reason="TEST_POSTGRES_URL is not set")
+def test_runs_without_the_statement_timeout(monkeypatch):
+    monkeypatch.setattr(settings, "DB_STATEMENT_TIMEOUT_MS", 50)
+    engine = db_session_module.make_engine(make_url(TEST_POSTGRES_URL))
+    seen = []
+    monkeypatch.setattr(migrations, "STEPS", [
+        lambda conn: seen.append(conn.exec_driver_sql("SHOW statement_timeout").scalar()),
+        lambda conn: conn.exec_driver_sql("SELECT pg_sleep(0.1)"),
+    ])
+    try:
+        migrations.run(engine)
+        with engine.connect() as conn:
+            assert conn.exec_driver_sql("SHOW statement_timeout").scalar() == "50ms"
+    finally:
+        engine.dispose()
+
+    assert seen == ["0"]
@@ -0,0 +1,386 @@
+"""
+Tests for recording tenant rent payments.
+"""
+
+import os
+import threading
+import time
+
+import pytest
+from datetime import date
+from sqlalchemy import create_engine, event, func
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app import models, schemas
+from app.api.v1.endpoints import tenants
+from app.db.base import Base
+from app.models.tenant_management import RentRecord
+
+TEST_POSTGRES_URL = os.environ.get("TEST_POSTGRES_URL")
+
+
+class TestRecordPayment:
+    """Test the single-call payment endpoint."""
+
+    @pytest.mark.rent
+    def test_creates_record_for_missing_month(self, client, api_prefix, owner_headers, owner_tenant, db_session):
+        """A payment for a month without a record creates it and applies the payment."""
+        response = client.post(
+            f"{api_prefix}/tenants/{owner_tenant.id}/payments",
+            json={"month": "2024-02-01", "amount": 2500, "payment_date": "2024-02-03"},
+            headers=owner_headers,
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["month"] == "2024-02-01"
+        assert data["amount_due"] == 6000.0
+        assert data["amount_paid"] == 2500.0
+        assert data["status"] == "partial"
+        assert data["payment_date"] == "2024-02-03"
+        assert db_session.query(RentRecord).filter(RentRecord.tenant_id == owner_tenant.id).count() == 1
+
+    @pytest.mark.rent
+    def test_partial_payments_accumulate(self, client, api_prefix, owner_headers, owner_tenant):
+        """Repeated payments for the same month add up and settle the record."""
+        url = f"{api_prefix}/tenants/{owner_tenant.id}/payments"
+        client.post(url, json={"month": "2024-03-01", "amount": 4000}, headers=owner_headers)
+        response = client.post(url, json={"month": "2024-03-01", "amount": 2000}, headers=owner_headers)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["amount_paid"] == 6000.0
+        assert data["status"] == "paid"
+
+    @pytest.mark.rent
+    def test_full_payment_uses_prorated_due(self, client, api_prefix, owner_headers, owner_tenant):
+        """Without an amount the check-in month's prorated rent is settled in full."""
+        response = client.post(
+            f"{api_prefix}/tenants/{owner_tenant.id}/payments",
+            json={"month": "2024-01-01"},
+            headers=owner_headers,
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["amount_due"] == round(6000.0 / 31 * 17, 2)
+        assert data["amount_paid"] == data["amount_due"]
+        assert data["status"] == "paid"
+
+    @pytest.mark.rent
+    def test_check_out_month_is_prorated(self, client, api_prefix, owner_headers, owner_tenant, db_session):
+        """A new record for the check-out month bills the days up to check-out, as generation would."""
+        owner_tenant.check_out_date = date(2024, 3, 10)
+        owner_tenant.status = "checked_out"
+        db_session.commit()
+
+        response = client.post(
+            f"{api_prefix}/tenants/{owner_tenant.id}/payments",
+            json={"month": "2024-03-01"},
+            headers=owner_headers,
+        )
+
+        assert response.status_code == 200
+        assert response.json()["amount_due"] == round(6000.0 / 31 * 10, 2)
+
+    @pytest.mark.rent
+    def test_month_before_check_in_has_nothing_due(self, client, api_prefix, owner_headers, owner_tenant):
+        response = client.post(
+            f"{api_prefix}/tenants/{owner_tenant.id}/payments",
+            json={"month": "2023-12-01", "amount": 500},
+            headers=owner_headers,
+        )
+
+        assert response.status_code == 200
+        assert response.json()["amount_due"] == 0.0
+
+    @pytest.mark.rent
+    def test_updates_existing_record(self, client, api_prefix, owner_headers, owner_tenant, db_session):
+        """An existing record keeps its amount due and is updated in place."""
+        rent = RentRecord(
+            tenant_id=owner_tenant.id, pg_id=owner_tenant.pg_id,
+            month=date(2024, 4, 1), amount_due=5500.0, status="pending",
+        )
+        db_session.add(rent)
+        db_session.commit()
+
+        response = client.post(
+            f"{api_prefix}/tenants/{owner_tenant.id}/payments",
+            json={"month": "2024-04-20"},
+            headers=owner_headers,
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["id"] == rent.id
+        assert data["amount_due"] == 5500.0
+        assert data["amount_paid"] == 5500.0
+        assert data["status"] == "paid"
+
+    @pytest.mark.rent
+    def test_rejects_non_positive_amount(self, client, api_prefix, owner_headers, owner_tenant):
+        """Zero or negative payments are rejected."""
+        response = client.post(
+            f"{api_prefix}/tenants/{owner_tenant.id}/payments",
+            json={"amount": 0},
+            headers=owner_headers,
+        )
+
+        assert response.status_code == 400
+
+    @pytest.mark.rent
+    def test_other_owner_cannot_record(self, client, api_prefix, other_owner_headers, owner_tenant):
+        """Another owner's tenant is not found."""
+        response = client.post(
+            f"{api_prefix}/tenants/{owner_tenant.id}/payments",
+            json={"amount": 100},
+            headers=other_owner_headers,
+        )
+
+        assert response.status_code == 404
+
+
+class TestBulkRentUpdate:
+    """Test PATCH /rents/bulk."""
+
+    @pytest.fixture
+    def owner_rents(self, db_session, owner_tenant):
+        rents = [
+            RentRecord(
+                tenant_id=owner_tenant.id, pg_id=owner_tenant.pg_id,
+                month=date(2024, m, 1), amount_due=6000.0, status="pending",
+            )
+            for m in (2, 3, 4)
+        ]
+        db_session.add_all(rents)
+        db_session.commit()
+        return rents
+
+    @pytest.mark.rent
+    def test_bulk_marks_rents_paid(self, client, api_prefix, owner_headers, owner_rents, db_session):
+        """Every listed record is updated, with amount_paid auto-filled for 'paid'."""
+        payload = [
+            {"rent_id": owner_rents[0].id, "status": "paid", "payment_date": "2024-02-05"},
+            {"rent_id": owner_rents[1].id, "status": "partial", "amount_paid": 1500},
+        ]
+
+        response = client.patch(f"{api_prefix}/rents/bulk", json=payload, headers=owner_headers)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [r["updated"] for r in data] == [True, True]
+        assert data[0]["rent"]["amount_paid"] == 6000.0
+        assert data[0]["rent"]["payment_date"] == "2024-02-05"
+        assert data[1]["rent"]["status"] == "partial"
+
+        db_session.expire_all()
+        stored = {r.id: r for r in db_session.query(RentRecord).all()}
+        assert stored[owner_rents[0].id].status == "paid"
+        assert stored[owner_rents[1].id].amount_paid == 1500.0
+        assert stored[owner_rents[2].id].status == "pending"
+
+    @pytest.mark.rent
+    def test_bulk_reports_missing_and_duplicate_rows(self, client, api_prefix, owner_headers, owner_rents):
+        """Unknown and repeated ids are reported per row without failing the batch."""
+        payload = [
+            {"rent_id": owner_rents[0].id, "status": "paid"},
+            {"rent_id": owner_rents[0].id, "status": "pending"},
+            {"rent_id": 99999, "status": "paid"},
+        ]
+
+        response = client.patch(f"{api_prefix}/rents/bulk", json=payload, headers=owner_headers)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [r["updated"] for r in data] == [True, False, False]
+        assert data[1]["detail"] == "Duplicate rent_id in request"
+        assert data[2]["detail"] == "Rent record not found"
+
+    @pytest.mark.rent
+    def test_bulk_ignores_other_owners_rents(self, client, api_prefix, other_owner_headers, owner_rents):
+        """Records owned by someone else are reported as not found."""
+        payload = [{"rent_id": owner_rents[0].id, "status": "paid"}]
+
+        response = client.patch(f"{api_prefix}/rents/bulk", json=payload, headers=other_owner_headers)
+
+        assert response.status_code == 200
+        assert response.json()[0]["updated"] is False
+
+
+class TestPaymentsLedger:
+    """Test the payments ledger, FIFO allocation and balance snapshots."""
+
+    @pytest.fixture
+    def owner_rents(self, db_session, owner_tenant):
+        rents = [
+            RentRecord(
+                tenant_id=owner_tenant.id, pg_id=owner_tenant.pg_id,
+                month=date(2024, m, 1), amount_due=6000.0, amount_paid=0.0, status="pending",
+            )
+            for m in (2, 3, 4)
+        ]
+        db_session.add_all(rents)
+        db_session.commit()
+        return rents
+
+    @pytest.mark.rent
+    def test_lump_sum_is_applied_oldest_first(self, client, api_prefix, owner_headers, owner_tenant, owner_rents):
+        """A lump sum settles the oldest months and leaves the rest partially paid."""
+        response = client.post(
+            f"{api_prefix}/tenants/{owner_tenant.id}/payments/lump-sum",
+            json={"amount": 9000, "payment_date": "2024-04-02", "mode": "upi"},
+            headers=owner_headers,
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["payment"]["amount"] == 9000.0
+        assert data["payment"]["mode"] == "upi"
+        assert [(r["month"], r["status"], r["amount_paid"]) for r in data["rents"]] == [
+            ("2024-02-01", "paid", 6000.0),
+            ("2024-03-01", "partial", 3000.0),
+        ]
+        assert data["balance"]["total_due"] == 18000.0
+        assert data["balance"]["total_paid"] == 9000.0
+        assert data["balance"]["balance"] == 9000.0
+        assert data["balance"]["credit"] == 0.0
+
+    @pytest.mark.rent
+    def test_advance_payment_becomes_credit(self, client, api_prefix, owner_headers, owner_tenant, owner_rents):
+        """Money beyond every outstanding month is kept as credit."""
+        response = client.post(
+            f"{api_prefix}/tenants/{owner_tenant.id}/payments/lump-sum",
+            json={"amount": 20000},
+            headers=owner_headers,
+        )
+
+        assert response.status_code == 200
+        balance = response.json()["balance"]
+        assert balance["credit"] == 2000.0
+        assert balance["balance"] == -2000.0
+
+    @pytest.mark.rent
+    def test_credit_is_spent_on_generated_month(self, client, api_prefix, owner_headers, owner_tenant, owner_rents, db_session):
+        """Generating a new month consumes the tenant's advance credit."""
+        client.post(
+            f"{api_prefix}/tenants/{owner_tenant.id}/payments/lump-sum",
+            json={"amount": 20000},
+            headers=owner_headers,
+        )
+
+        client.post(f"{api_prefix}/rents/generate?target_month=2024-05-01", headers=owner_headers)
+
+        db_session.expire_all()
+        may = db_session.query(RentRecord).filter(
+            RentRecord.tenant_id == owner_tenant.id, RentRecord.month == date(2024, 5, 1)
+        ).one()
+        assert may.amount_paid == 2000.0
+        assert may.status == "partial"
+        balance = client.get(f"{api_prefix}/tenants/{owner_tenant.id}/balance", headers=owner_headers).json()
+        assert balance["credit"] == 0.0
+        assert balance["balance"] == 4000.0
+
+    @pytest.mark.rent
+    def test_payments_are_recorded_in_ledger(self, client, api_prefix, owner_headers, owner_tenant, owner_rents):
+        """Month payments and manual edits both leave ledger entries."""
+        client.post(
+            f"{api_prefix}/tenants/{owner_tenant.id}/payments",
+            json={"month": "2024-02-01", "amount": 1000, "payment_date": "2024-02-02"},
+            headers=owner_headers,
+        )
+        client.put(
+            f"{api_prefix}/rents/{owner_rents[1].id}",
+            json={"status": "paid", "payment_date": "2024-03-05"},
+            headers=owner_headers,
+        )
+
+        response = client.get(f"{api_prefix}/tenants/{owner_tenant.id}/payments", headers=owner_headers)
+
+        assert response.status_code == 200
+        assert [(p["amount"], p["mode"]) for p in response.json()] == [(6000.0, "manual"), (1000.0, "cash")]
+
+    @pytest.mark.rent
+    def test_balance_is_built_for_legacy_tenants(self, client, api_prefix, owner_headers, owner_tenant, owner_rents):
+        """A tenant without a snapshot gets one on first read."""
+        response = client.get(f"{api_prefix}/tenants/{owner_tenant.id}/balance", headers=owner_headers)
+
+        assert response.status_code == 200
+        assert response.json()["balance"] == 18000.0
+
+    @pytest.mark.rent
+    def test_balance_other_owner(self, client, api_prefix, other_owner_headers, owner_tenant):
+        """Another owner's tenant balance is not found."""
+        response = client.get(f"{api_prefix}/tenants/{owner_tenant.id}/balance", headers=other_owner_headers)
+
+        assert response.status_code == 404
+
+
+@pytest.fixture
+def postgres_tenant():
+    """A tenant in a scratch Postgres database (its tables are dropped and recreated)."""
+    engine = create_engine(TEST_POSTGRES_URL, poolclass=NullPool)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        owner = models.User(email="owner@example.com", hashed_password="x", full_name="Owner", is_active=True)
+        db.add(owner)
+        db.flush()
+        pg = models.PG(name="Sunrise PG", address="123 Main St", city="Pune", owner_id=owner.id)
+        db.add(pg)
+        db.flush()
+        room = models.Room(pg_id=pg.id, room_number="101", floor=1, type="Single")
+        db.add(room)
+        db.flush()
+        bed = models.Bed(room_id=room.id, bed_number="101-A", monthly_price=6000.0, is_occupied=True)
+        db.add(bed)
+        db.flush()
+        tenant = models.Tenant(pg_id=pg.id, bed_id=bed.id, name="Ravi Kumar", phone="9876543210",
+                               check_in_date=date(2024, 1, 15), status="active")
+        db.add(tenant)
+        db.commit()
+        ids = owner.id, tenant.id
+    yield Session, ids
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+
+
+@pytest.mark.postgres
+@pytest.mark.skipif(not TEST_POSTGRES_URL, reason="TEST_POSTGRES_URL is not set")
+class TestConcurrentPayments:
+    """Test record_payment calls racing on Postgres."""
+
+    def test_double_mark_paid_records_one_payment(self, postgres_tenant):
+        """A second "mark paid" sent while the first is committing adds nothing to the ledger."""
+        Session, (owner_id, tenant_id) = postgres_tenant
+        first_committing = threading.Event()
+        errors = []
+
+        def mark_paid(hold_commit):
+            with Session() as db:
+                if hold_commit:
+                    @event.listens_for(db, "before_commit")
+                    def hold(session):
+                        first_committing.set()
+                        time.sleep(0.5)
+                try:
+                    owner = db.get(models.User, owner_id)
+                    tenants.record_payment(db=db, tenant_id=tenant_id, current_user=owner,
+                                           payment_in=schemas.PaymentCreate(month=date(2024, 3, 1)))
+                except Exception as exc:
+                    errors.append(exc)
+
+        first = threading.Thread(target=mark_paid, args=(True,))
+        first.start()
+        assert first_committing.wait(10)
+        second = threading.Thread(target=mark_paid, args=(False,))
+        second.start()
+        first.join(10)
+        second.join(10)
+
+        assert not errors
+        with Session() as db:
+            assert db.query(func.sum(models.Payment.amount)).scalar() == 6000.0
+            assert db.query(RentRecord.amount_paid).scalar() == 6000.0
+            assert db.get(models.TenantBalance, tenant_id).total_paid == 6000.0
@@ -0,0 +1,89 @@
+"""
+Tests for bulk price revisions.
+"""
+
+import pytest
+from datetime import date
+
+from app.models.pg_structure import Bed
+from app.models.tenant_management import RentRecord
+
+
+@pytest.fixture
+def tenant_rents(db_session, owner_tenant):
+    rents = {
+        month: RentRecord(tenant_id=owner_tenant.id, pg_id=owner_tenant.pg_id, month=month,
+                          amount_due=due, amount_paid=paid, status=status)
+        for month, due, paid, status in [
+            (date(2024, 1, 1), 3290.32, 0.0, "pending"),  # Prorated from 2024-01-15
+            (date(2024, 2, 1), 6000.0, 0.0, "pending"),
+            (date(2024, 3, 1), 6000.0, 6000.0, "paid"),
+        ]
+    }
+    db_session.add_all(rents.values())
+    db_session.commit()
+    return rents
+
+
+class TestPriceRevision:
+    """Test POST /pgs/{id}/price-revision."""
+
+    @pytest.mark.pg
+    def test_dry_run_previews_totals(self, client, api_prefix, owner_headers, tenant_rents, owner_pg, db_session):
+        response = client.post(
+            f"{api_prefix}/pgs/{owner_pg.id}/price-revision",
+            params={"dry_run": True},
+            json={"percent": 10, "effective_month": "2024-01-01"},
+            headers=owner_headers,
+        )
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "dry_run": True,
+            "beds": 2,
+            "current_monthly_total": 12000.0,
+            "new_monthly_total": 13200.0,
+            "rent_records": 2,
+            "current_rent_due": 9290.32,
+            "new_rent_due": 10219.35,
+        }
+        assert {b.monthly_price for b in db_session.query(Bed)} == {6000.0}
+
+    @pytest.mark.pg
+    def test_applies_to_beds_and_pending_rent_from_effective_month(
+        self, client, api_prefix, owner_headers, tenant_rents, owner_pg, db_session
+    ):
+        response = client.post(
+            f"{api_prefix}/pgs/{owner_pg.id}/price-revision",
+            json={"amount": 600, "room_type": "Double", "effective_month": "2024-02-01"},
+            headers=owner_headers,
+        )
+
+        assert response.status_code == 200
+        assert response.json()["rent_records"] == 1
+        db_session.expire_all()
+        assert {b.monthly_price for b in db_session.query(Bed)} == {6600.0}
+        due = {r.month: r.amount_due for r in db_session.query(RentRecord)}
+        assert due == {date(2024, 1, 1): 3290.32, date(2024, 2, 1): 6600.0, date(2024, 3, 1): 6000.0}
+
+    @pytest.mark.pg
+    def test_filters_by_floor(self, client, api_prefix, owner_headers, owner_pg):
+        response = client.post(
+            f"{api_prefix}/pgs/{owner_pg.id}/price-revision",
+            params={"dry_run": True},
+            json={"percent": 5, "floor": 2, "effective_month": "2024-01-01"},
+            headers=owner_headers,
+        )
+
+        assert response.json()["beds"] == 0
+
+    @pytest.mark.pg
+    def test_rejects_negative_prices_and_ambiguous_changes(self, client, api_prefix, owner_headers, owner_pg):
+        url = f"{api_prefix}/pgs/{owner_pg.id}/price-revision"
+
+        response = client.post(url, json={"amount": -7000, "effective_month": "2024-01-01"}, headers=owner_headers)
+        assert response.status_code == 400
+        response = client.post(
+            url, json={"amount": 100, "percent": 5, "effective_month": "2024-01-01"}, headers=owner_headers
+        )
+        assert response.status_code == 422
@@ -0,0 +1,69 @@
+"""
+Tests for opt-in request profiling.
+"""
+
+import pytest
+
+from app.core import profiler
+from app.core.config import settings
+from app.core.security import get_password_hash
+
+TOKEN = "profile-secret"
+
+
+@pytest.fixture
+def profiling(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "PROFILER_TOKEN", TOKEN)
+    monkeypatch.setattr(settings, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "PROFILE_INTERVAL_MS", 1.0)
+    return tmp_path
+
+
+class TestProfiler:
+    """Test X-Profile requests and the /profiles endpoints."""
+
+    def test_profiled_request_can_be_listed_and_downloaded(
+        self, client, api_prefix, owner_headers, owner_pg, profiling
+    ):
+        response = client.get(
+            f"{api_prefix}/pgs/", headers={**owner_headers, "X-Profile": "1", "X-Profile-Token": TOKEN}
+        )
+
+        assert response.status_code == 200
+        profile_id = response.headers["X-Profile-Id"]
+        listed = client.get(f"{api_prefix}/profiles/", headers={"X-Profile-Token": TOKEN}).json()
+        assert [p["id"] for p in listed] == [profile_id]
+        assert (listed[0]["route"], listed[0]["status"]) == (f"{api_prefix}/pgs/", 200)
+        download = client.get(f"{api_prefix}/profiles/{profile_id}", headers={"X-Profile-Token": TOKEN})
+        assert download.status_code == 200
+        assert download.headers["content-type"].startswith("text/plain")
+
+    def test_needs_the_token(self, client, api_prefix, owner_headers, profiling):
+        response = client.get(f"{api_prefix}/pgs/", headers={**owner_headers, "X-Profile": "1", "X-Profile-Token": "x"})
+
+        assert "X-Profile-Id" not in response.headers
+        assert not list(profiling.iterdir())
+        assert client.get(f"{api_prefix}/profiles/", headers={"X-Profile-Token": "x"}).status_code == 403
+        non_ascii = {"X-Profile-Token": "secr\xe9t".encode("latin-1")}
+        assert client.get(f"{api_prefix}/profiles/", headers=non_ascii).status_code == 403
+        response = client.get(f"{api_prefix}/pgs/", headers={**owner_headers, "X-Profile": "1", **non_ascii})
+        assert response.status_code == 200 and "X-Profile-Id" not in response.headers
+        assert client.get(f"{api_prefix}/profiles/../secrets", headers={"X-Profile-Token": TOKEN}).status_code == 404
+
+    def test_disabled_without_a_token(self, client, api_prefix, monkeypatch):
+        monkeypatch.setattr(settings, "PROFILER_TOKEN", "")
+
+        assert client.get(f"{api_prefix}/profiles/", headers={"X-Profile-Token": ""}).status_code == 403
+
+    def test_sampler_records_folded_app_stacks(self):
+        sampler = profiler.SamplingProfiler(0.001)
+        sampler.start()
+        for _ in range(3):
+            get_password_hash("correct horse battery staple")
+        sampler.stop()
+
+        folded = sampler.folded()
+        assert sampler.samples > 0
+        line = next(line for line in folded.splitlines() if "get_password_hash (app/core/security.py" in line)
+        assert line.startswith("MainThread;")
+        assert int(line.rsplit(" ", 1)[1]) > 0
@@ -0,0 +1,165 @@
+"""
+Query-plan tests for the hot queries, against a real Postgres.
+
+SQLite plans say nothing about production, so these run only when
+TEST_POSTGRES_URL points at a scratch database (its tables are dropped and
+recreated):
+
+    TEST_POSTGRES_URL=postgresql://localhost/pgkhata_plans pytest tests/test_query_plans.py
+
+The database is seeded with app.seed at a realistic size and analyzed; each
+test then captures the SQL an endpoint (or generate_rents) issues for one
+owner and checks `EXPLAIN (FORMAT JSON)` of the main statement: it must use
+the intended index and stay under a cost ceiling. A dropped index or a query
+that stops being owner-scoped turns into a sequential scan over every
+owner's rows and fails here instead of in production.
+"""
+
+import os
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app import models, seed
+from app.api.deps import get_db
+from app.core import security
+from app.core.rent_cycle import generate_rents
+from app.db.base import Base
+from app.main import app
+
+TEST_POSTGRES_URL = os.environ.get("TEST_POSTGRES_URL")
+AS_OF = date(2024, 6, 15)
+CURRENT_MONTH = date(2024, 6, 1)
+# Enough owners that scanning everyone's rows costs far more than one owner's index lookups
+SEED_ARGS = ["--owners", "1000", "--pgs-per-owner", "2", "--rooms-per-pg", "10", "--months", "6",
+             "--email-prefix", "plan", "--chunk-owners", "250"]
+
+pytestmark = [
+    pytest.mark.postgres,
+    pytest.mark.skipif(not TEST_POSTGRES_URL, reason="TEST_POSTGRES_URL is not set"),
+]
+
+
+@pytest.fixture(scope="module")
+def pg_engine():
+    engine = create_engine(TEST_POSTGRES_URL)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with sessionmaker(bind=engine)() as db:
+        seed.seed(db, seed.parse_args(SEED_ARGS), AS_OF)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("ANALYZE")
+    yield engine
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def pg_db(pg_engine):
+    db = sessionmaker(autocommit=False, autoflush=False, bind=pg_engine)()
+    yield db
+    db.rollback()
+    db.close()
+
+
+@pytest.fixture
+def statements(pg_engine):
+    """(statement, parameters) of every query run on the Postgres engine during the test."""
+    captured = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if not statement.startswith("EXPLAIN"):
+            captured.append((statement, parameters))
+
+    event.listen(pg_engine, "before_cursor_execute", record)
+    yield captured
+    event.remove(pg_engine, "before_cursor_execute", record)
+
+
+@pytest.fixture
+def owner(pg_db):
+    return pg_db.query(models.User).filter(models.User.email == "plan1@seed.local").one()
+
+
+@pytest.fixture
+def pg_client(pg_db, owner):
+    app.dependency_overrides[get_db] = lambda: pg_db
+    with TestClient(app) as client:
+        client.headers["Authorization"] = f"Bearer {security.create_access_token(owner.id)}"
+        yield client
+    app.dependency_overrides.clear()
+
+
+def _plan(pg_engine, captured, *fragments) -> dict:
+    """EXPLAIN the one captured statement containing all `fragments`."""
+    matches = [(sql, params) for sql, params in captured if all(fragment in sql for fragment in fragments)]
+    assert len(matches) == 1, f"expected one statement with {fragments}, got {len(matches)}"
+    sql, params = matches[0]
+    with pg_engine.connect() as conn:
+        return conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}", params).scalar()[0]["Plan"]
+
+
+def _nodes(plan: dict):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _nodes(child)
+
+
+def _describe(plan: dict, depth: int = 0) -> str:
+    line = "  " * depth + plan["Node Type"]
+    if "Index Name" in plan:
+        line += f" using {plan['Index Name']}"
+    if "Relation Name" in plan:
+        line += f" on {plan['Relation Name']}"
+    line += f" (cost={plan['Total Cost']} rows={plan['Plan Rows']})"
+    return "\n".join([line] + [_describe(child, depth + 1) for child in plan.get("Plans", [])])
+
+
+def _assert_plan(plan: dict, index: str, max_cost: float) -> None:
+    indexes = {node.get("Index Name") for node in _nodes(plan)}
+    assert index in indexes, f"{index} not used:\n{_describe(plan)}"
+    assert plan["Total Cost"] <= max_cost, f"cost over {max_cost}:\n{_describe(plan)}"
+
+
+class TestQueryPlans:
+    """Test that the hot owner-scoped queries use their indexes."""
+
+    def test_tenant_list(self, pg_engine, pg_client, statements):
+        assert pg_client.get("/api/v1/tenants/").status_code == 200
+
+        _assert_plan(_plan(pg_engine, statements, "FROM tenants JOIN pgs"), "ix_pgs_owner_id", 150)
+        _assert_plan(_plan(pg_engine, statements, "FROM rent_records", "rent_records.tenant_id IN"),
+                     "uq_rent_records_tenant_month", 1500)
+
+    def test_rent_list(self, pg_engine, pg_client, statements):
+        response = pg_client.get("/api/v1/rents/", params={"curr_month": CURRENT_MONTH.isoformat()})
+        assert response.status_code == 200
+
+        _assert_plan(_plan(pg_engine, statements, "FROM rent_records JOIN pgs"), "ix_rent_records_pg_id_month", 300)
+
+    def test_unpaid_list(self, pg_engine, pg_client, statements):
+        response = pg_client.get("/api/v1/rents/", params={"curr_month": CURRENT_MONTH.isoformat(), "status": "pending"})
+        assert response.status_code == 200
+
+        _assert_plan(_plan(pg_engine, statements, "FROM rent_records JOIN pgs"), "ix_rent_records_pg_id_month", 300)
+
+    def test_dashboard_stats(self, pg_engine, pg_client, statements):
+        response = pg_client.get("/api/v1/pgs/stats", params={"curr_month": CURRENT_MONTH.isoformat()})
+        assert response.status_code == 200
+
+        _assert_plan(_plan(pg_engine, statements, "FROM pgs", "pgs.owner_id ="), "ix_pgs_owner_id", 25)
+        _assert_plan(_plan(pg_engine, statements, "FROM rooms", "count("), "ix_rooms_pg_id", 50)
+        _assert_plan(_plan(pg_engine, statements, "FROM beds JOIN rooms"), "ix_beds_room_id", 500)
+        _assert_plan(_plan(pg_engine, statements, "FROM rent_records", "rent_records.month ="),
+                     "ix_rent_records_pg_id_month", 300)
+
+    def test_rent_generation(self, pg_engine, pg_db, owner, statements):
+        generate_rents(pg_db, [date(2024, 7, 1)], [owner.id])
+
+        plan = _plan(pg_engine, statements, "FROM tenants JOIN pgs", "LEFT OUTER JOIN rent_records")
+        _assert_plan(plan, "ix_pgs_owner_id", 300)
+        _assert_plan(plan, "ix_tenants_pg_id", 300)
+        _assert_plan(plan, "uq_rent_records_tenant_month", 300)
@@ -0,0 +1,110 @@
+"""
+Tests for bank statement reconciliation.
+"""
+
+import pytest
+from datetime import date
+
+from app.core import reconcile
+from app.models.tenant_management import Tenant, RentRecord, Payment, TenantBalance
+
+STATEMENT = (
+    "Txn Date,Narration,Debit,Credit,Balance\n"
+    "03/02/2024,UPI/CR/405012345678/RAVI KUMAR/9876543210@ybl,,6000.00,\n"
+    "04/02/2024,UPI/CR/405012345679/ASHA P/okaxis,,6000.00,\n"
+    '05/02/2024,NEFT/SALARY/ACME,,"45,000.00",\n'
+    "06/02/2024,ATM WDL,2000.00,,\n"
+    "07/02/2024,UPI/CR/405012345680/UNKNOWN,,3290.32,\n"
+)
+
+
+@pytest.fixture
+def open_rents(db_session, owner_pg, owner_tenant):
+    asha = Tenant(
+        pg_id=owner_pg.id, bed_id=owner_pg.rooms[0].beds[1].id, name="Asha Patil", phone="9000000001",
+        check_in_date=date(2024, 2, 1), status="active",
+    )
+    db_session.add(asha)
+    db_session.flush()
+    rents = [
+        RentRecord(tenant_id=owner_tenant.id, pg_id=owner_pg.id, month=date(2024, 1, 1), amount_due=3290.32),
+        RentRecord(tenant_id=owner_tenant.id, pg_id=owner_pg.id, month=date(2024, 2, 1), amount_due=6000.0),
+        RentRecord(tenant_id=asha.id, pg_id=owner_pg.id, month=date(2024, 2, 1), amount_due=6000.0),
+    ]
+    db_session.add_all(rents)
+    db_session.commit()
+    return owner_tenant, asha, rents
+
+
+class TestReconcile:
+    """Test POST /rents/reconcile."""
+
+    @pytest.mark.rent
+    def test_proposes_matches_with_confidence(self, client, api_prefix, owner_headers, open_rents, db_session):
+        ravi, asha, (ravi_jan, ravi_feb, asha_feb) = open_rents
+
+        response = client.post(
+            f"{api_prefix}/rents/reconcile",
+            files={"file": ("statement.csv", STATEMENT.encode(), "text/csv")},
+            headers=owner_headers,
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert (data["lines"], data["credits"], data["matched"], data["applied"]) == (5, 4, 3, 0)
+        matches = {m["line"]: m for m in data["matches"]}
+        assert (matches[2]["rent_id"], matches[2]["confidence"]) == (ravi_feb.id, 0.8)
+        assert matches[3]["tenant_id"] == asha.id
+        assert matches[3]["confidence"] < matches[2]["confidence"]
+        assert (matches[6]["rent_id"], matches[6]["confidence"]) == (ravi_jan.id, 0.5)
+        assert [m["line"] for m in data["unmatched"]] == [4]
+        assert db_session.query(Payment).count() == 0
+
+    @pytest.mark.rent
+    def test_auto_apply_records_confident_matches(self, client, api_prefix, owner_headers, open_rents, db_session):
+        ravi, _, (ravi_jan, ravi_feb, asha_feb) = open_rents
+
+        response = client.post(
+            f"{api_prefix}/rents/reconcile",
+            params={"auto_apply": True},
+            files={"file": ("statement.csv", STATEMENT.encode(), "text/csv")},
+            headers=owner_headers,
+        )
+
+        assert response.json()["applied"] == 1
+        db_session.expire_all()
+        assert db_session.get(RentRecord, ravi_feb.id).status == "paid"
+        assert db_session.get(RentRecord, ravi_feb.id).payment_date == date(2024, 2, 3)
+        assert db_session.get(RentRecord, asha_feb.id).status == "pending"
+        payment = db_session.query(Payment).one()
+        assert (payment.rent_record_id, payment.amount, payment.mode) == (ravi_feb.id, 6000.0, "upi")
+        assert db_session.get(TenantBalance, ravi.id).balance == 3290.32
+
+    @pytest.mark.rent
+    def test_bad_statements(self, client, api_prefix, owner_headers, other_owner_headers, owner_pg):
+        url = f"{api_prefix}/rents/reconcile"
+
+        no_date = client.post(url, files={"file": ("s.csv", b"narration,credit\nx,100\n")}, headers=owner_headers)
+        assert no_date.status_code == 400
+        other_pg = client.post(
+            url, params={"pg_id": owner_pg.id}, files={"file": ("s.csv", STATEMENT.encode())},
+            headers=other_owner_headers,
+        )
+        assert other_pg.status_code == 404
+
+
+def test_read_statement_with_amount_and_type_columns():
+    rows = [
+        {"date": "01-Feb-2024", "amount": "1,500.00", "type": "CR", "description": "UPI"},
+        {"date": "02-Feb-2024", "amount": "700", "type": "DR"},
+        {"date": "03-Feb-2024", "amount": "250.50 Cr"},
+        {"date": "not a date", "amount": "100"},
+    ]
+
+    lines, credits = reconcile.read_statement(enumerate(rows, start=2))
+
+    assert lines == 4
+    assert [(c.line, c.payment_date, c.amount) for c in credits] == [
+        (2, date(2024, 2, 1), 1500.0),
+        (4, date(2024, 2, 3), 250.5),
+    ]
@@ -0,0 +1,170 @@
+"""
+Tests for rent proration and multi-month rent generation.
+"""
+
+import pytest
+from datetime import date
+
+from app.core.rent_cycle import calculate_prorated_rent, month_range, rent_for_month
+from app.models.tenant_management import RentRecord
+
+
+class TestProration:
+    """Test proration helpers."""
+
+    @pytest.mark.unit
+    def test_check_in_month_is_prorated(self):
+        assert calculate_prorated_rent(date(2024, 1, 15), 6200.0) == 3400.0
+
+    @pytest.mark.unit
+    def test_check_out_month_is_prorated(self):
+        assert rent_for_month(date(2024, 3, 1), date(2024, 1, 15), date(2024, 3, 10), 6200.0) == 2000.0
+
+    @pytest.mark.unit
+    def test_check_in_and_out_in_same_month(self):
+        assert rent_for_month(date(2024, 4, 1), date(2024, 4, 11), date(2024, 4, 20), 6000.0) == 2000.0
+
+    @pytest.mark.unit
+    def test_full_and_outside_months(self):
+        assert rent_for_month(date(2024, 2, 1), date(2024, 1, 15), None, 6000.0) == 6000.0
+        assert rent_for_month(date(2023, 12, 1), date(2024, 1, 15), None, 6000.0) == 0.0
+        assert rent_for_month(date(2024, 4, 1), date(2024, 1, 15), date(2024, 3, 10), 6000.0) == 0.0
+
+    @pytest.mark.unit
+    def test_month_range_spans_years(self):
+        months = month_range(date(2023, 11, 20), date(2024, 2, 3))
+        assert months == [date(2023, 11, 1), date(2023, 12, 1), date(2024, 1, 1), date(2024, 2, 1)]
+
+
+class TestGenerateRange:
+    """Test POST /rents/generate with from/to."""
+
+    @pytest.mark.rent
+    def test_backfills_every_missing_month(self, client, api_prefix, owner_headers, owner_tenant, db_session):
+        """A range creates each month once, prorating the check-in month."""
+        db_session.add(RentRecord(
+            tenant_id=owner_tenant.id, pg_id=owner_tenant.pg_id,
+            month=date(2024, 2, 1), amount_due=6000.0, status="paid",
+        ))
+        db_session.commit()
+
+        response = client.post(
+            f"{api_prefix}/rents/generate?from=2023-12-01&to=2024-04-30",
+            headers=owner_headers,
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["created_count"] == 3
+        assert data["skipped_count"] == 1
+        records = db_session.query(RentRecord).filter(
+            RentRecord.tenant_id == owner_tenant.id
+        ).order_by(RentRecord.month).all()
+        assert [(r.month, r.amount_due) for r in records] == [
+            (date(2024, 1, 1), round(6000.0 / 31 * 17, 2)),
+            (date(2024, 2, 1), 6000.0),
+            (date(2024, 3, 1), 6000.0),
+            (date(2024, 4, 1), 6000.0),
+        ]
+
+    @pytest.mark.rent
+    def test_generation_is_idempotent(self, client, api_prefix, owner_headers, owner_tenant):
+        """Running the same range twice creates nothing the second time."""
+        url = f"{api_prefix}/rents/generate?from=2024-01-01&to=2024-03-01"
+        client.post(url, headers=owner_headers)
+
+        response = client.post(url, headers=owner_headers)
+
+        assert response.json()["created_count"] == 0
+        assert response.json()["skipped_count"] == 3
+
+    @pytest.mark.rent
+    def test_planned_check_out_is_prorated(self, client, api_prefix, owner_headers, owner_tenant, db_session):
+        """Months after a planned check-out are skipped and its month is prorated."""
+        owner_tenant.check_out_date = date(2024, 3, 10)
+        db_session.commit()
+
+        client.post(f"{api_prefix}/rents/generate?from=2024-02-01&to=2024-05-01", headers=owner_headers)
+
+        records = db_session.query(RentRecord).order_by(RentRecord.month).all()
+        assert [(r.month, r.amount_due) for r in records] == [
+            (date(2024, 2, 1), 6000.0),
+            (date(2024, 3, 1), round(6000.0 / 31 * 10, 2)),
+        ]
+
+    @pytest.mark.rent
+    def test_checked_out_tenant_is_billed_to_check_out(self, client, api_prefix, owner_headers, owner_tenant,
+                                                       db_session):
+        """A tenant who has checked out still gets the months up to check-out, the last prorated."""
+        owner_tenant.check_out_date = date(2024, 3, 10)
+        owner_tenant.status = "checked_out"
+        db_session.commit()
+
+        response = client.post(f"{api_prefix}/rents/generate?from=2024-02-01&to=2024-05-01", headers=owner_headers)
+
+        assert response.json()["created_count"] == 2
+        records = db_session.query(RentRecord).order_by(RentRecord.month).all()
+        assert [(r.month, r.amount_due) for r in records] == [
+            (date(2024, 2, 1), 6000.0),
+            (date(2024, 3, 1), round(6000.0 / 31 * 10, 2)),
+        ]
+
+        response = client.post(f"{api_prefix}/rents/generate?from=2024-04-01&to=2024-06-01", headers=owner_headers)
+        assert response.json()["created_count"] == 0
+
+    @pytest.mark.rent
+    def test_rejects_reversed_range(self, client, api_prefix, owner_headers):
+        response = client.post(f"{api_prefix}/rents/generate?from=2024-05-01&to=2024-01-01", headers=owner_headers)
+
+        assert response.status_code == 400
+
+
+class TestBatchBilling:
+    """Test the vectorized billing engine."""
+
+    @pytest.mark.unit
+    def test_grid_matches_per_month_proration(self):
+        from app.core.billing import bill_grid
+
+        months = month_range(date(2024, 1, 1), date(2024, 4, 1))
+        due = bill_grid(
+            [date(2024, 1, 15), date(2024, 2, 1)],
+            [None, date(2024, 3, 10)],
+            [6200.0, 6000.0],
+            months,
+        )
+
+        assert due.shape == (2, 4)
+        for row, (check_in, check_out, price) in enumerate(
+            [(date(2024, 1, 15), None, 6200.0), (date(2024, 2, 1), date(2024, 3, 10), 6000.0)]
+        ):
+            assert list(due[row]) == [rent_for_month(m, check_in, check_out, price) for m in months]
+        assert list(due[1]) == [0.0, 6000.0, round(6000.0 / 31 * 10, 2), 0.0]
+
+    @pytest.mark.unit
+    def test_empty_input(self):
+        from app.core.billing import bill_pairs
+
+        assert len(bill_pairs([], [], [], [])) == 0
+
+
+class TestRentForecast:
+    """Test GET /rents/forecast."""
+
+    @pytest.mark.rent
+    def test_forecast_sums_expected_rent(self, client, api_prefix, owner_headers, owner_tenant):
+        response = client.get(f"{api_prefix}/rents/forecast?from=2023-12-01&to=2024-02-01", headers=owner_headers)
+
+        assert response.status_code == 200
+        assert response.json() == [
+            {"month": "2023-12-01", "expected_rent": 0.0, "billed_tenants": 0},
+            {"month": "2024-01-01", "expected_rent": round(6000.0 / 31 * 17, 2), "billed_tenants": 1},
+            {"month": "2024-02-01", "expected_rent": 6000.0, "billed_tenants": 1},
+        ]
+
+    @pytest.mark.rent
+    def test_forecast_defaults_to_six_months(self, client, api_prefix, owner_headers, owner_tenant):
+        response = client.get(f"{api_prefix}/rents/forecast", headers=owner_headers)
+
+        assert response.status_code == 200
+        assert len(response.json()) == 6
@@ -0,0 +1,59 @@
+"""
+Tests for the month rollover scheduler.
+"""
+
+import pytest
+from datetime import date, timedelta
+from sqlalchemy.orm import sessionmaker
+
+from app import scheduler
+from app.models.job import RolloverCheckpoint
+from app.models.tenant_management import RentRecord
+
+
+@pytest.fixture
+def session_factory(engine, db_session):
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+class TestMonthRollover:
+    """Test the platform-wide rollover run."""
+
+    @pytest.mark.rent
+    def test_rollover_creates_rents_and_checkpoints(self, db_session, owner_tenant, session_factory):
+        report = scheduler.run_rollover(date(2024, 3, 1), processes=4, session_factory=session_factory)
+
+        assert report["owners"] == 1
+        assert report["created_count"] == 1
+        assert report["processes"] == 1  # SQLite runs in one process
+        rent = db_session.query(RentRecord).filter(RentRecord.month == date(2024, 3, 1)).one()
+        assert rent.tenant_id == owner_tenant.id
+        assert rent.amount_due == 6000.0
+        checkpoint = db_session.query(RolloverCheckpoint).one()
+        assert (checkpoint.month, checkpoint.owner_id) == (date(2024, 3, 1), owner_tenant.pg.owner_id)
+
+    @pytest.mark.rent
+    def test_rerun_skips_checkpointed_owners(self, db_session, owner_tenant, session_factory):
+        scheduler.run_rollover(date(2024, 3, 1), session_factory=session_factory)
+        report = scheduler.run_rollover(date(2024, 3, 1), session_factory=session_factory)
+
+        assert report["owners"] == 0
+        assert report["created_count"] == 0
+        assert db_session.query(RentRecord).filter(RentRecord.month == date(2024, 3, 1)).count() == 1
+
+    @pytest.mark.rent
+    def test_resume_only_processes_unfinished_owners(self, db_session, owner_tenant, session_factory):
+        # An interrupted run already checkpointed this owner
+        db_session.add(RolloverCheckpoint(month=date(2024, 3, 1), owner_id=owner_tenant.pg.owner_id))
+        db_session.commit()
+
+        report = scheduler.run_rollover(date(2024, 3, 1), session_factory=session_factory)
+
+        assert report["owners"] == 0
+        assert db_session.query(RentRecord).count() == 0
+
+    @pytest.mark.unit
+    def test_month_starts_in_india_time(self):
+        start = scheduler.month_start_at(date(2024, 3, 1))
+        assert start.utcoffset() == timedelta(hours=5, minutes=30)
+        assert (start.hour, start.day) == (0, 1)
@@ -0,0 +1,52 @@
+"""
+Tests for the synthetic data seeder.
+"""
+
+from datetime import date
+
+from sqlalchemy import func
+
+from app import seed
+from app.models.pg_structure import Bed
+from app.models.tenant_management import Payment, RentRecord, Tenant, TenantBalance
+from app.models.user import User
+
+AS_OF = date(2024, 6, 15)
+
+
+def _seed(db_session, *argv):
+    return seed.seed(db_session, seed.parse_args(["--owners", "3", "--rooms-per-pg", "5", "--months", "4", *argv]), AS_OF)
+
+
+class TestSeed:
+    """Test the bulk seeder against the test database."""
+
+    def test_counts_match_inserted_rows(self, db_session):
+        totals = _seed(db_session, "--chunk-owners", "2")
+
+        assert totals["owners"] == 3 and totals["pgs"] == 6 and totals["rooms"] == 30
+        assert db_session.query(User).filter(User.email.like("%@seed.local")).count() == 3
+        assert db_session.query(Bed).count() == totals["beds"]
+        assert db_session.query(Tenant).count() == totals["tenants"]
+        assert db_session.query(RentRecord).count() == totals["rent_records"]
+        assert db_session.query(Payment).count() == totals["payments"]
+
+    def test_history_is_consistent(self, db_session):
+        _seed(db_session)
+
+        active = db_session.query(Tenant).filter(Tenant.status == "active").all()
+        assert active and all(tenant.bed.is_occupied for tenant in active)
+        assert all(tenant.check_in_date <= AS_OF for tenant in active)
+        months = {row.month for row in db_session.query(RentRecord.month).distinct()}
+        assert months <= {date(2024, m, 1) for m in range(3, 7)}
+        # Every paid amount has a matching payment and the balances add up
+        paid = db_session.query(func.sum(RentRecord.amount_paid)).scalar()
+        assert round(db_session.query(func.sum(Payment.amount)).scalar(), 2) == round(paid, 2)
+        due = db_session.query(func.sum(RentRecord.amount_due)).scalar()
+        assert round(db_session.query(func.sum(TenantBalance.balance)).scalar(), 2) == round(due - paid, 2)
+
+    def test_same_seed_same_data(self, db_session):
+        first = _seed(db_session, "--email-prefix", "a")
+        second = _seed(db_session, "--email-prefix", "b")
+
+        assert first == second
@@ -0,0 +1,67 @@
+"""
+Tests for the slow query log.
+"""
+
+import json
+import logging
+
+import pytest
+from sqlalchemy import text
+
+from app.core import slow_query
+from app.core.config import settings
+
+
+@pytest.fixture
+def slow_log(tmp_path, monkeypatch, engine):
+    """Log every statement of the test engine to a temporary file."""
+    path = tmp_path / "slow.jsonl"
+    monkeypatch.setattr(settings, "SLOW_QUERY_LOG_FILE", str(path))
+    monkeypatch.setattr(slow_query, "_logger", None)
+    log = slow_query.SlowQueryLog(engine, threshold_ms=0).install()
+    yield path
+    log.remove()
+    logger = logging.getLogger("pgkhata.slow_query")
+    for handler in logger.handlers[:]:
+        handler.close()
+        logger.removeHandler(handler)
+
+
+def _records(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+class TestSlowQueryLog:
+    """Test the statement timing listeners."""
+
+    def test_logs_endpoint_and_redacted_parameters(self, client, api_prefix, owner_headers, owner_pg, slow_log):
+        response = client.get(f"{api_prefix}/pgs/{owner_pg.id}", headers=owner_headers)
+
+        assert response.status_code == 200
+        records = [r for r in _records(slow_log) if r["endpoint"] == f"GET {api_prefix}/pgs/{{pg_id}}"]
+        assert records
+        pg_query = next(r for r in records if "FROM pgs" in r["statement"])
+        assert pg_query["type"] == "slow_query"
+        assert pg_query["duration_ms"] >= 0
+        assert set(pg_query["parameters"]) == {"int"}
+        assert str(owner_pg.id) not in json.dumps(pg_query["parameters"])
+
+    def test_statements_outside_requests_have_no_endpoint(self, db_session, slow_log):
+        db_session.execute(text("SELECT :secret"), {"secret": "hunter2"})
+
+        record = _records(slow_log)[-1]
+        assert record["endpoint"] is None
+        assert "hunter2" not in json.dumps(record)
+        assert record["parameters"] == ["str"]
+
+    def test_explain_is_sampled_and_rate_limited(self, engine):
+        log = slow_query.SlowQueryLog(engine, threshold_ms=200, explain_sample=1.0, explain_interval=600)
+        log.explain_sample = 1.0  # Only Postgres is explained; force it on for the check
+
+        assert log._should_explain("a", "SELECT 1")
+        log._explaining.release()
+        assert not log._should_explain("a", "SELECT 1")
+        assert not log._should_explain("b", "VACUUM")
+        assert log._should_explain("b", "SELECT 2")
+        # Still busy with "b": new work is dropped rather than queued
+        assert not log._should_explain("c", "SELECT 3")
@@ -0,0 +1,118 @@
+"""
+Tests for columnar analytics snapshots.
+"""
+
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+
+from app.core import snapshots
+from app.models.tenant_management import RentRecord
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+@pytest.fixture
+def owner_rents(db_session, owner_tenant):
+    rents = [
+        RentRecord(tenant_id=owner_tenant.id, pg_id=owner_tenant.pg_id, month=date(2024, m, 1),
+                   amount_due=1933.55 if m == 1 else 6000.0, amount_paid=0.0, status="pending",
+                   updated_at=datetime(2024, m, 2, 10, 0))
+        for m in (1, 2, 3)
+    ]
+    db_session.add_all(rents)
+    db_session.commit()
+    return rents
+
+
+class TestSnapshotFiles:
+    """Test partitioned snapshot files."""
+
+    @pytest.mark.unit
+    def test_partitioned_by_updated_date_with_typed_columns(self, db_session, owner_rents, tmp_path):
+        manifest = snapshots.write_snapshot(db_session, str(tmp_path), tables=["rent_records"])
+
+        assert manifest["tables"]["rent_records"] == {
+            "rows": 3, "partitions": ["2024-01-02", "2024-02-02", "2024-03-02"],
+        }
+        path = tmp_path / "rent_records" / "updated_date=2024-01-02" / "data.parquet"
+        table = pq.read_table(path)
+        assert table.schema.field("month").type == pa.date32()
+        assert table.schema.field("amount_due").type == pa.decimal128(12, 2)
+        assert table.column("amount_due").to_pylist() == [Decimal("1933.55")]
+        assert json.loads((tmp_path / "_manifest.json").read_text())["format"] == "parquet"
+
+    @pytest.mark.unit
+    def test_incremental_snapshot_only_has_recent_partitions(self, db_session, owner_rents, tmp_path):
+        manifest = snapshots.write_snapshot(
+            db_session, str(tmp_path), fmt="arrow", since=date(2024, 2, 2), tables=["rent_records"]
+        )
+
+        assert manifest["tables"]["rent_records"]["partitions"] == ["2024-02-02", "2024-03-02"]
+        with pa.memory_map(str(tmp_path / "rent_records" / "updated_date=2024-03-02" / "data.arrow")) as source:
+            assert pa.ipc.open_file(source).read_all().num_rows == 1
+
+    @pytest.mark.unit
+    def test_one_partition_file_open_at_a_time(self, db_session, owner_rents, tmp_path, monkeypatch):
+        open_writers = []
+        most_open = []
+        real_open_writer = snapshots._open_writer
+
+        def open_writer(sink, schema, fmt):
+            writer = real_open_writer(sink, schema, fmt)
+            real_close = writer.close
+
+            def close():
+                open_writers.remove(writer)
+                real_close()
+
+            writer.close = close
+            open_writers.append(writer)
+            most_open.append(len(open_writers))
+            return writer
+
+        monkeypatch.setattr(snapshots, "_open_writer", open_writer)
+
+        manifest = snapshots.write_snapshot(db_session, str(tmp_path), tables=["rent_records"])
+
+        assert manifest["tables"]["rent_records"]["partitions"] == ["2024-01-02", "2024-02-02", "2024-03-02"]
+        assert max(most_open) == 1 and not open_writers
+
+    @pytest.mark.unit
+    def test_owner_snapshot_excludes_other_owners(self, db_session, owner_rents, test_user_2, tmp_path):
+        manifest = snapshots.write_snapshot(db_session, str(tmp_path), owner_id=test_user_2.id)
+
+        assert all(info["rows"] == 0 for info in manifest["tables"].values())
+
+
+class TestSnapshotEndpoint:
+    """Test GET /export/snapshot/{table}."""
+
+    @pytest.mark.unit
+    def test_arrow_stream(self, client, api_prefix, owner_headers, owner_rents):
+        response = client.get(
+            f"{api_prefix}/export/snapshot/rent_records", params={"format": "arrow"}, headers=owner_headers
+        )
+
+        assert response.status_code == 200
+        table = pa.ipc.open_stream(response.content).read_all()
+        assert sorted(table.column("month").to_pylist()) == [date(2024, 1, 1), date(2024, 2, 1), date(2024, 3, 1)]
+
+    @pytest.mark.unit
+    def test_parquet_file(self, client, api_prefix, owner_headers, owner_tenant):
+        response = client.get(f"{api_prefix}/export/snapshot/tenants", headers=owner_headers)
+
+        assert response.status_code == 200
+        table = pq.read_table(io.BytesIO(response.content))
+        assert table.column("name").to_pylist() == ["Ravi Kumar"]
+        assert table.schema.field("check_in_date").type == pa.date32()
+
+    @pytest.mark.unit
+    def test_unknown_table(self, client, api_prefix, owner_headers):
+        response = client.get(f"{api_prefix}/export/snapshot/user", headers=owner_headers)
+
+        assert response.status_code == 404
@@ -0,0 +1,73 @@
+"""
+Tests for worker startup: what importing the app does and doesn't do.
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+from sqlalchemy import inspect
+
+from app.db import schema
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _import_app(database_url: str) -> subprocess.CompletedProcess:
+    code = (
+        "import sys, app.main; "
+        "print(' '.join(sorted(name for name in ('jose', 'cryptography') if name in sys.modules)))"
+    )
+    env = dict(os.environ, DATABASE_URL=database_url)
+    return subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, env=env,
+                          capture_output=True, text=True, timeout=60)
+
+
+@pytest.fixture
+def fresh_schema(monkeypatch):
+    """schema as if no check had run in this process yet, retrying without delay."""
+    monkeypatch.setattr(schema, "_thread", None)
+    monkeypatch.setattr(schema, "ready", schema.threading.Event())
+    monkeypatch.setattr(schema, "RETRY_DELAYS", (0,))
+    return schema
+
+
+class TestStartup:
+    """Test that a worker starts without the database or the JWT libraries."""
+
+    def test_import_skips_jwt_libraries(self):
+        result = _import_app(os.environ.get("DATABASE_URL", "sqlite:///./test_database.db"))
+
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.strip() == ""
+
+    def test_import_does_not_need_the_database(self):
+        # Nothing listens on port 9, so any connection attempt at import fails the import
+        result = _import_app("postgresql://nobody@127.0.0.1:9/none")
+
+        assert result.returncode == 0, result.stderr
+
+    def test_schema_check_retries_until_ready(self, fresh_schema, monkeypatch):
+        attempts = []
+
+        def ensure_schema():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise ConnectionError("database is starting")
+            fresh_schema.ready.set()
+
+        monkeypatch.setattr(fresh_schema, "ensure_schema", ensure_schema)
+        fresh_schema.start()
+        fresh_schema.start()
+
+        assert fresh_schema.ready.wait(5)
+        assert len(attempts) == 3
+
+    def test_ensure_schema_creates_tables(self, fresh_schema, engine, monkeypatch):
+        monkeypatch.setattr(fresh_schema, "engine", engine)
+
+        fresh_schema.ensure_schema()
+
+        assert fresh_schema.ready.is_set()
+        assert inspect(engine).has_table("rent_records")
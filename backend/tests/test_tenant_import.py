@@ -0,0 +1,119 @@
+"""
+Tests for bulk tenant import.
+"""
+
+import io
+
+import pytest
+from datetime import date, datetime
+
+from app.core import tenant_import
+from app.models.pg_structure import Bed
+from app.models.tenant_management import Tenant, RentRecord
+
+CSV = (
+    "Name,Phone,Check In Date,Room Number,Bed Number,Security Deposit\n"
+    "Asha Patil,9000000001,2024-03-16,101,101-A,5000\n"
+    "Bad Date,9000000002,16/03/2024,101,101-B,\n"
+    "No Bed,9000000003,2024-03-01,999,Z,\n"
+    "Ben Dsouza,9000000004,2024-03-01,101,101-B,\n"
+    "Twice,9000000005,2024-03-01,101,101-B,\n"
+)
+
+
+class TestTenantImport:
+    """Test POST /tenants/import."""
+
+    @pytest.mark.tenant
+    def test_csv_import_creates_valid_rows_and_reports_errors(
+        self, client, api_prefix, owner_headers, owner_pg, db_session
+    ):
+        response = client.post(
+            f"{api_prefix}/tenants/import",
+            params={"pg_id": owner_pg.id},
+            files={"file": ("tenants.csv", CSV.encode(), "text/csv")},
+            headers=owner_headers,
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["created"] == 2
+        assert [e["row"] for e in data["errors"]] == [3, 4, 6]
+        assert "check_in_date" in data["errors"][0]["errors"][0]
+        assert "not found" in data["errors"][1]["errors"][0]
+        assert "already used on line 5" in data["errors"][2]["errors"][0]
+
+        asha = db_session.query(Tenant).filter(Tenant.name == "Asha Patil").one()
+        assert asha.security_deposit == 5000.0
+        assert db_session.get(Bed, asha.bed_id).is_occupied
+        rents = {r.tenant_id: r for r in db_session.query(RentRecord).all()}
+        assert rents[asha.id].month == date(2024, 3, 1)
+        assert rents[asha.id].amount_due == round(6000.0 / 31 * 16, 2)
+        ben = db_session.query(Tenant).filter(Tenant.name == "Ben Dsouza").one()
+        assert rents[ben.id].amount_due == 6000.0
+
+    @pytest.mark.tenant
+    def test_dry_run_writes_nothing(self, client, api_prefix, owner_headers, owner_pg, db_session):
+        response = client.post(
+            f"{api_prefix}/tenants/import",
+            params={"pg_id": owner_pg.id, "dry_run": True},
+            files={"file": ("tenants.csv", CSV.encode(), "text/csv")},
+            headers=owner_headers,
+        )
+
+        assert response.status_code == 200
+        assert response.json()["created"] == 2
+        assert response.json()["tenant_ids"] == []
+        assert db_session.query(Tenant).count() == 0
+
+    @pytest.mark.tenant
+    def test_xlsx_import(self, client, api_prefix, owner_headers, owner_pg, db_session):
+        openpyxl = pytest.importorskip("openpyxl")
+        workbook = openpyxl.Workbook()
+        sheet = workbook.active
+        sheet.append(["name", "phone", "check_in_date", "room_number", "bed_number"])
+        sheet.append(["Asha Patil", 9000000001, datetime(2024, 3, 1), 101, "101-A"])
+        buffer = io.BytesIO()
+        workbook.save(buffer)
+
+        response = client.post(
+            f"{api_prefix}/tenants/import",
+            params={"pg_id": owner_pg.id},
+            files={"file": ("tenants.xlsx", buffer.getvalue())},
+            headers=owner_headers,
+        )
+
+        assert response.status_code == 200
+        assert response.json()["created"] == 1
+        tenant = db_session.query(Tenant).one()
+        assert (tenant.phone, tenant.check_in_date) == ("9000000001", date(2024, 3, 1))
+
+    @pytest.mark.tenant
+    def test_lines_count_blank_rows(self):
+        csv_file = io.BytesIO(b"name,phone\nAsha,1\n\n,\nBen,2\n")
+
+        rows = list(tenant_import.read_rows(csv_file, "tenants.csv"))
+
+        assert rows == [(2, {"name": "Asha", "phone": "1"}), (5, {"name": "Ben", "phone": "2"})]
+
+    @pytest.mark.tenant
+    def test_rejects_other_file_types(self, client, api_prefix, owner_headers, owner_pg):
+        response = client.post(
+            f"{api_prefix}/tenants/import",
+            params={"pg_id": owner_pg.id},
+            files={"file": ("tenants.txt", b"name\n")},
+            headers=owner_headers,
+        )
+
+        assert response.status_code == 400
+
+    @pytest.mark.tenant
+    def test_other_owners_pg_is_not_found(self, client, api_prefix, other_owner_headers, owner_pg):
+        response = client.post(
+            f"{api_prefix}/tenants/import",
+            params={"pg_id": owner_pg.id},
+            files={"file": ("tenants.csv", CSV.encode())},
+            headers=other_owner_headers,
+        )
+
+        assert response.status_code == 404
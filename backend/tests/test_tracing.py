@@ -0,0 +1,86 @@
+"""
+Tests for request tracing.
+"""
+
+import json
+
+import pytest
+
+from app.core import tracing
+
+
+@pytest.fixture
+def spans(engine):
+    """Collect the spans of traced requests, including the test engine's SQL."""
+    tracing.instrument_engine(engine)
+    exporter = tracing.InMemoryExporter()
+    tracing.set_exporter(exporter)
+    yield exporter.spans
+    tracing.set_exporter(None)
+
+
+def _by_id(spans):
+    return {span.span_id: span for span in spans}
+
+
+class TestTracing:
+    """Test the spans recorded for a request."""
+
+    def test_request_spans_split_endpoint_and_serialization(self, client, api_prefix, owner_headers, owner_pg, spans):
+        response = client.get(f"{api_prefix}/pgs/", headers=owner_headers)
+
+        assert response.status_code == 200
+        root = next(span for span in spans if span.kind == "SERVER")
+        assert root.name == f"GET {api_prefix}/pgs/"
+        assert root.parent_span_id is None
+        assert root.attributes["http.status_code"] == 200
+        assert {span.trace_id for span in spans} == {root.trace_id}
+
+        children = {span.name: span for span in spans if span.parent_span_id == root.span_id}
+        assert {"auth.get_current_user", "endpoint", "response.validate", "response.serialize"} <= set(children)
+
+        by_id = _by_id(spans)
+        sql = [span for span in spans if span.kind == "CLIENT"]
+        parents = {by_id[span.parent_span_id].name for span in sql}
+        # The PG query runs in the endpoint; the rooms are lazy-loaded while building schemas.PG
+        assert "endpoint" in parents
+        assert "response.validate" in parents
+        assert "auth.get_current_user" in parents
+        assert all(span.end_time_unix_nano >= span.start_time_unix_nano for span in spans)
+        assert json.dumps([span.to_dict() for span in spans])
+
+    def test_continues_incoming_trace(self, client, api_prefix, owner_headers, spans):
+        traceparent = "00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01"
+
+        client.get(f"{api_prefix}/pgs/", headers={**owner_headers, "traceparent": traceparent})
+
+        root = next(span for span in spans if span.kind == "SERVER")
+        assert (root.trace_id, root.parent_span_id) == ("0af7651916cd43dd8448eb211c80319c", "b7ad6b7169203331")
+
+    def test_errors_are_recorded(self, client, api_prefix, spans):
+        response = client.get(f"{api_prefix}/pgs/", headers={"Authorization": "Bearer not-a-token"})
+
+        assert response.status_code == 403
+        auth = next(span for span in spans if span.name == "auth.get_current_user")
+        assert auth.status == "ERROR"
+        assert "HTTPException" in auth.error
+
+    def test_off_without_exporter(self, client, api_prefix, owner_headers, engine):
+        tracing.instrument_engine(engine)
+
+        response = client.get(f"{api_prefix}/pgs/", headers=owner_headers)
+
+        assert response.status_code == 200
+        assert tracing.start_trace("GET /") is None
+        assert tracing.current_span.get() is None
+
+
+def test_jsonl_exporter(tmp_path):
+    exporter = tracing.JsonlExporter(str(tmp_path / "traces" / "spans.jsonl"))
+    span = tracing.Span("work", "0" * 32, None)
+    span.end()
+
+    exporter.export(span)
+
+    record = json.loads((tmp_path / "traces" / "spans.jsonl").read_text())
+    assert (record["name"], record["kind"], record["status"]) == ("work", "SPAN_KIND_INTERNAL", {"code": "STATUS_CODE_UNSET"})
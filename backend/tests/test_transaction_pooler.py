@@ -0,0 +1,193 @@
+"""
+Tests for running behind a transaction-mode pooler (PgBouncer pool_mode=transaction).
+
+The pool settings are checked everywhere. The rest runs only when
+TEST_POSTGRES_URL points at a scratch database (its tables are dropped and
+recreated): the app's engine is built as in production with
+DB_TRANSACTION_POOLER set, but connected through tests/pooler.py, which runs
+each transaction on whichever of two server connections is free, as
+PgBouncer does. Every statement the app issues is checked for session state
+that would leak to other clients or be missing on the next transaction.
+
+    TEST_POSTGRES_URL=postgresql://localhost/pgkhata_pooler pytest tests/test_transaction_pooler.py
+"""
+
+import os
+import re
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, exc, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app import models, seed
+from app.api.deps import get_db
+from app.core import security
+from app.core.config import settings
+from app.core.metrics import TimedQueuePool
+from app.db import session as db_session_module
+from app.db import timeouts
+from app.db.base import Base
+from app.main import app
+from tests.pooler import TransactionPooler
+
+TEST_POSTGRES_URL = os.environ.get("TEST_POSTGRES_URL")
+AS_OF = date(2024, 6, 15)
+# Statements that set or depend on state outliving the transaction
+SESSION_STATE = re.compile(r"^\s*(SET\s+(?!LOCAL\b)|RESET\b|PREPARE\b|LISTEN\b|DISCARD\b)|pg_advisory_lock\(", re.I)
+
+requires_postgres = [
+    pytest.mark.postgres,
+    pytest.mark.skipif(not TEST_POSTGRES_URL, reason="TEST_POSTGRES_URL is not set"),
+]
+
+
+@pytest.fixture
+def pooler_settings(monkeypatch):
+    monkeypatch.setattr(settings, "DB_TRANSACTION_POOLER", True)
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", None)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", None)
+    monkeypatch.setattr(settings, "DB_STATEMENT_TIMEOUT_MS", 250)
+    monkeypatch.setattr(settings, "DB_IDLE_IN_TRANSACTION_TIMEOUT_MS", 60_000)
+    return settings
+
+
+@pytest.fixture(scope="module")
+def seeded_postgres():
+    engine = create_engine(TEST_POSTGRES_URL, poolclass=NullPool)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with sessionmaker(bind=engine)() as db:
+        seed.seed(db, seed.parse_args(["--owners", "2", "--rooms-per-pg", "4", "--months", "3",
+                                       "--email-prefix", "pooler"]), AS_OF)
+    yield TEST_POSTGRES_URL
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def pooler(seeded_postgres):
+    with TransactionPooler(seeded_postgres, pool_size=2) as pooler:
+        yield pooler
+
+
+@pytest.fixture
+def app_engine(pooler, pooler_settings):
+    """The app's engine as configured for a pooler, connected through the test pooler."""
+    engine = db_session_module.make_engine(make_url(pooler.url))
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def statements(app_engine):
+    captured = []
+    event.listen(app_engine, "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: captured.append(statement))
+    return captured
+
+
+@pytest.fixture
+def pooled_client(app_engine):
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=app_engine)
+
+    def get_pooled_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    with SessionLocal() as db:
+        owner = db.query(models.User).filter(models.User.email == "pooler1@seed.local").one()
+    app.dependency_overrides[get_db] = get_pooled_db
+    with TestClient(app) as client:
+        client.headers["Authorization"] = f"Bearer {security.create_access_token(owner.id)}"
+        yield client
+    app.dependency_overrides.clear()
+
+
+class TestPoolSettings:
+    """Test the per-worker pool chosen from the settings."""
+
+    def test_default_pool(self, monkeypatch):
+        monkeypatch.setattr(settings, "DB_TRANSACTION_POOLER", False)
+        monkeypatch.setattr(settings, "DB_POOL_SIZE", None)
+        monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", None)
+
+        options = db_session_module.pool_options()
+
+        assert options["poolclass"] is TimedQueuePool
+        assert options["pool_size"] + options["max_overflow"] > 0
+
+    def test_transaction_pooler_defaults_to_null_pool(self, pooler_settings):
+        assert db_session_module.pool_options() == {"poolclass": NullPool}
+
+    def test_small_pool_behind_pooler(self, pooler_settings):
+        pooler_settings.DB_POOL_SIZE = 2
+
+        options = db_session_module.pool_options()
+
+        assert options == {"poolclass": TimedQueuePool, "pool_size": 2, "max_overflow": 0}
+
+    def test_timeouts_are_transaction_local(self, pooler_settings):
+        assert timeouts.timeout_statements() == [
+            "SET LOCAL statement_timeout = 250",
+            "SET LOCAL idle_in_transaction_session_timeout = 60000",
+        ]
+        pooler_settings.DB_STATEMENT_TIMEOUT_MS = 0
+        pooler_settings.DB_IDLE_IN_TRANSACTION_TIMEOUT_MS = 0
+        assert timeouts.timeout_statements() == []
+
+    def test_sqlite_engine_has_no_timeouts(self, pooler_settings, tmp_path):
+        engine = db_session_module.make_engine(make_url(f"sqlite:///{tmp_path / 'x.db'}"))
+
+        with engine.connect() as conn:
+            assert conn.exec_driver_sql("SELECT 1").scalar() == 1
+        assert isinstance(engine.pool, NullPool)
+
+
+@pytest.mark.usefixtures("seeded_postgres")
+class TestBehindTransactionPooler:
+    """Test the app through a transaction-mode pooler."""
+
+    pytestmark = requires_postgres
+
+    def test_endpoints_work_across_server_connections(self, pooler, pooled_client, statements):
+        month = AS_OF.replace(day=1).isoformat()
+        for _ in range(3):
+            assert pooled_client.get("/api/v1/pgs/stats", params={"curr_month": month}).status_code == 200
+            assert pooled_client.get("/api/v1/tenants/").status_code == 200
+            assert pooled_client.get("/api/v1/rents/", params={"curr_month": month}).status_code == 200
+        # Streams rows from a server-side cursor, which lives inside the transaction
+        streamed = pooled_client.get("/api/v1/tenants/", params={"stream": 1})
+        assert streamed.status_code == 200 and streamed.json()
+        response = pooled_client.post("/api/v1/rents/generate", params={"target_month": "2024-07-01"})
+        assert response.status_code == 200
+
+        assert len(set(pooler.assignments)) == 2
+        assert pooler.server_connections == 2
+        assert statements
+        assert not [statement for statement in statements if SESSION_STATE.search(statement)]
+
+    def test_timeouts_do_not_outlive_the_transaction(self, pooler, app_engine):
+        with app_engine.connect() as conn:
+            assert conn.exec_driver_sql("SHOW statement_timeout").scalar() == "250ms"
+            assert conn.exec_driver_sql("SHOW idle_in_transaction_session_timeout").scalar() == "1min"
+
+        # Another client without the settings, on each of the pooler's server connections
+        plain = create_engine(pooler.url, poolclass=NullPool)
+        seen = {}
+        for _ in range(4):
+            with plain.connect() as conn:
+                seen[conn.exec_driver_sql("SELECT pg_backend_pid()").scalar()] = conn.exec_driver_sql(
+                    "SHOW statement_timeout").scalar()
+        assert len(seen) == 2 and set(seen.values()) == {"0"}
+
+    def test_statement_timeout_applies(self, app_engine):
+        with app_engine.connect() as conn:
+            with pytest.raises(exc.OperationalError, match="statement timeout"):
+                conn.execute(text("SELECT pg_sleep(1)"))
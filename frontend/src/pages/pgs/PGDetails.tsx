@@ -172,20 +172,13 @@ export const PGDetails = () => {
         try {
             const today = new Date();
             const monthStart = `${today.getFullYear()}-${String(today.getMonth() + 1).padStart(2, '0')}-01`;
-            await api.post('/rents/generate');
-            const rentsRes = await api.get('/rents/', { params: { curr_month: monthStart } });
-            const existingRent = rentsRes.data.find((r: any) => r.tenant_id === selectedTenantForRent.id);
-            if (existingRent) {
-                await api.put(`/rents/${existingRent.id}`, {
-                    amount_paid: parseFloat(rentAmount),
-                    payment_date: new Date().toISOString().split('T')[0],
-                    status: 'paid'
-                });
-                alert(t('rent.recorded_success', { name: selectedTenantForRent.name }));
-                setShowRentModal(false);
-            } else {
-                alert(t('rent.generation_failed'));
-            }
+            await api.post(`/tenants/${selectedTenantForRent.id}/payments`, {
+                month: monthStart,
+                amount: parseFloat(rentAmount),
+                payment_date: today.toISOString().split('T')[0]
+            });
+            alert(t('rent.recorded_success', { name: selectedTenantForRent.name }));
+            setShowRentModal(false);
         } catch (error) {
             console.error("Failed to receive rent", error);
             alert(t('rent.record_failed'));